@@ -0,0 +1,311 @@
+import numpy as np
+import pandas as pd
+import numericvalues as nval
+
+# Analytic separators accepted in the account codes; `_` is normalized to `.`
+ANALYTIC_SEP = "."
+ANALYTIC_SEP_ALIASES = ("_",)
+
+
+def canonical_account_code(code) -> str:
+    """
+    Canonical form of an account code, used both for the account column
+    of the data and for the codes in the fields settings:
+    - the numbers stored by Excel as floats lose the `.0` (401.0 or "401.0" -> "401"),
+    - the whitespace is removed ("401 " -> "401"),
+    - the analytic separator `_` becomes `.` ("401_01" -> "401.01"),
+    - the leading zeros of the synthetic account are removed ("0401" -> "401").
+    """
+    if isinstance(code, (bool, np.bool_)):
+        return str(code)
+
+    if isinstance(code, (int, np.integer)):
+        return str(int(code))
+
+    if isinstance(code, (float, np.floating)):
+        if np.isnan(code):
+            return "nan"
+        if float(code).is_integer():
+            return str(int(code))
+        code = repr(float(code))
+
+    text = "".join(str(code).split())
+
+    for alias in ANALYTIC_SEP_ALIASES:
+        text = text.replace(alias, ANALYTIC_SEP)
+
+    synthetic, sep, analytic = text.partition(ANALYTIC_SEP)
+
+    if synthetic.isdigit():
+        if len(synthetic) > 1:
+            synthetic = synthetic.lstrip("0") or "0"
+
+        # A number stored as text by Excel, ex. "401.0"
+        if analytic.isdigit() and (analytic.strip("0") == ""):
+            sep = ""
+            analytic = ""
+
+    return f"{synthetic}{sep}{analytic}"
+
+
+def canonicalize_account_codes(codes: pd.Series) -> pd.Series:
+    """
+    Canonical form (see `canonical_account_code`) of all the values
+    of an account column, as strings. Each distinct value is converted once.
+    """
+    labels, uniques = pd.factorize(codes, use_na_sentinel=False)
+    canonical = np.array(
+        [canonical_account_code(code) for code in uniques], dtype=object
+    )
+
+    return pd.Series(canonical[labels], index=codes.index, name=codes.name, dtype="str")
+
+
+def is_canonical_column(codes: pd.Series) -> bool:
+    """
+    Check (without scanning the values) if an account column
+    was already converted to strings, ex. by `normalize_account_columns`,
+    or to categorical strings, ex. by `compactframes.compact_frame`.
+    """
+    if isinstance(codes.dtype, pd.CategoricalDtype):
+        return isinstance(codes.dtype.categories.dtype, pd.StringDtype)
+
+    return isinstance(codes.dtype, pd.StringDtype)
+
+
+def normalize_account_columns(
+    frames: list[pd.DataFrame], account_col_names: list[str]
+) -> None:
+    """
+    Load stage: replace, in place, the account columns of the data frames
+    with their canonical form. The frames without the column are skipped.
+    """
+    seen = set()
+
+    for df in frames:
+        if id(df) in seen:
+            continue
+        seen.add(id(df))
+
+        for account_col_name in account_col_names:
+            if account_col_name in df.columns.values.tolist():
+                df[account_col_name] = canonicalize_account_codes(df[account_col_name])
+
+
+def canonicalize_codes_list(accounting_codes: str, fields_sep: str) -> str:
+    """
+    Canonical form of the codes of a multi formula setting, ex. "0401, 411_1".
+    """
+    return fields_sep.join(
+        canonical_account_code(code) for code in accounting_codes.split(fields_sep)
+    )
+
+
+def canonicalize_term(term: str, label_sep: str, sheet_sep: str) -> str:
+    """
+    Canonical form of the account code of a micro formula term, ex. `sc@0401` -> `sc@401`.
+    """
+    if label_sep not in term:
+        return term
+
+    sheet_prefix = ""
+
+    if sheet_sep in term:
+        sheet_name, term = term.split(sheet_sep, 1)
+        sheet_prefix = f"{sheet_name}{sheet_sep}"
+
+    value_col_name, accounting_code = term.split(label_sep, 1)
+
+    return f"{sheet_prefix}{value_col_name}{label_sep}{canonical_account_code(accounting_code)}"
+
+
+def canonicalize_program_terms(node, label_sep: str, sheet_sep: str):
+    """
+    Returns a copy of a parsed micro formula, with the account code
+    of each term in canonical form (see `canonicalize_term`).
+    The copy is built without recursion, for any nesting depth.
+    """
+
+    def copy_node(item):
+        if isinstance(item, list):
+            return list(item)
+        if isinstance(item, dict):
+            return {**item, "args": list(item["args"])}
+        return canonicalize_term(item, label_sep, sheet_sep)
+
+    program = copy_node(node)
+    # The copied nodes whose items are not copied yet
+    stack = [program] if isinstance(program, (list, dict)) else []
+
+    while len(stack) > 0:
+        current = stack.pop()
+        items = current["args"] if isinstance(current, dict) else current
+
+        for idx, item in enumerate(items):
+            items[idx] = copy_node(item)
+            if isinstance(item, (list, dict)):
+                stack.append(items[idx])
+
+    return program
+
+
+def build_code_index(codes: pd.Series) -> pd.Index:
+    """
+    Hash index of an account column: the positions of the rows
+    of an account code are found in O(1), see `code_positions`.
+    """
+    return pd.Index(codes.to_numpy(dtype=object))
+
+
+def get_code_index(code_indexes: dict, df: pd.DataFrame, account_col_name: str) -> pd.Index:
+    """
+    Returns the index of the account column of the data frame, built once
+    and kept in `code_indexes` (ex. for all the fields of a request).
+    """
+    key = (id(df), account_col_name)
+
+    if key not in code_indexes:
+        code_indexes[key] = build_code_index(df[account_col_name])
+
+    return code_indexes[key]
+
+
+def code_positions(code_index: pd.Index, accounting_code: str) -> np.ndarray:
+    """
+    Returns the positions of the rows with the account code (empty if missing,
+    more than one if the code is duplicated).
+    """
+    if code_index.is_unique:
+        position = code_index.get_indexer([accounting_code])[0]
+        return np.array([position] if position >= 0 else [], dtype="int64")
+
+    positions = code_index.get_indexer_for([accounting_code])
+    return positions[positions >= 0]
+
+
+# ========= Account hierarchy rollups
+
+
+def code_ancestors(code: str) -> list[str]:
+    """
+    The ancestors of a canonical account code, the nearest first:
+    the analytic levels, then, for a numeric synthetic account,
+    the synthetic levels down to the class ("4423.01" -> "4423", "442", "44", "4").
+    """
+    parts = code.split(ANALYTIC_SEP)
+    ancestors = [ANALYTIC_SEP.join(parts[:idx]) for idx in range(len(parts) - 1, 0, -1)]
+
+    synthetic = parts[0]
+
+    if synthetic.isdigit():
+        ancestors.extend(synthetic[:length] for length in range(len(synthetic) - 1, 0, -1))
+
+    return ancestors
+
+
+def build_rollup_index(codes: pd.Series) -> dict:
+    """
+    Account tree of the canonical codes of an account column: for each
+    ancestor code without a row of its own, the rows that roll up to it.
+    A row rolls up to its ancestors up to its nearest ancestor present in the data,
+    so a synthetic account and its analytic accounts are never counted twice.
+
+    Returns:
+    ----------
+    A dictionary with the keys:
+        - `codes` (dict[str, int]): the label of each rollup code
+        - `rows` (np.ndarray[int64]): positions of the rows
+        - `labels` (np.ndarray[int64]): the rollup code label of each row position
+    """
+    code_labels, unique_codes = pd.factorize(codes)
+    present = set(unique_codes.tolist())
+
+    rollup_codes: dict[str, int] = {}
+    pair_code_labels = []
+    pair_rollup_labels = []
+
+    for code_label, code in enumerate(unique_codes.tolist()):
+        for ancestor in code_ancestors(code):
+            if ancestor in present:
+                break
+            pair_code_labels.append(code_label)
+            pair_rollup_labels.append(rollup_codes.setdefault(ancestor, len(rollup_codes)))
+
+    pair_code_labels = np.array(pair_code_labels, dtype="int64")
+
+    # The rows of each code (more than one if the code is duplicated), in the order of the data
+    order = np.argsort(code_labels, kind="stable")
+    counts = np.bincount(code_labels[code_labels >= 0], minlength=len(unique_codes))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1])) if len(counts) > 0 else counts
+
+    pair_counts = counts[pair_code_labels]
+    group_starts = np.repeat(np.cumsum(pair_counts) - pair_counts, pair_counts)
+    offsets = np.arange(int(pair_counts.sum()), dtype="int64") - group_starts
+
+    return {
+        "codes": rollup_codes,
+        "rows": order[np.repeat(starts[pair_code_labels], pair_counts) + offsets],
+        "labels": np.repeat(np.array(pair_rollup_labels, dtype="int64"), pair_counts),
+    }
+
+
+def rollup_totals(rollup_index: dict, values: pd.Series) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Totals of a value column for all the rollup codes, in one vectorized pass.
+
+    Returns:
+    ----------
+    A tuple of arrays, by rollup code label:
+        - the sums of the numeric values (float64)
+        - if any of the values is missing (bool)
+        - if any of the values is not numeric (bool)
+    """
+    labels = rollup_index["labels"]
+    n_codes = len(rollup_index["codes"])
+
+    cells = nval.read_cells(values.iloc[rollup_index["rows"]])
+    missing = cells.isna().to_numpy(dtype=bool)
+    numeric = pd.to_numeric(cells, errors="coerce").to_numpy(dtype="float64")
+    text = np.isnan(numeric) & ~missing
+
+    totals = np.bincount(labels, weights=np.where(np.isnan(numeric), 0.0, numeric), minlength=n_codes)
+    has_missing = np.bincount(labels, weights=missing, minlength=n_codes) > 0
+    has_text = np.bincount(labels, weights=text, minlength=n_codes) > 0
+
+    return (totals, has_missing, has_text)
+
+
+def get_rollup_index(rollups: dict | None, df: pd.DataFrame, account_col_name: str) -> dict:
+    """
+    Returns the rollup index of the account column (see `build_rollup_index`),
+    built once and kept in `rollups` (ex. for all the fields of a request), if given.
+    """
+    if rollups is None:
+        return build_rollup_index(df[account_col_name])
+
+    key = (id(df), account_col_name)
+
+    if key not in rollups:
+        rollups[key] = build_rollup_index(df[account_col_name])
+
+    return rollups[key]
+
+
+def get_rollup_totals(
+    rollups: dict | None, df: pd.DataFrame, account_col_name: str, value_col_name: str
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns the rollup totals of the value column (see `rollup_totals`),
+    computed once and kept in `rollups`, if given.
+    """
+    rollup_index = get_rollup_index(rollups, df, account_col_name)
+
+    if rollups is None:
+        return rollup_totals(rollup_index, df[value_col_name])
+
+    key = (id(df), account_col_name, value_col_name)
+
+    if key not in rollups:
+        rollups[key] = rollup_totals(rollup_index, df[value_col_name])
+
+    return rollups[key]
@@ -0,0 +1,61 @@
+"""
+Parse and evaluation time of long and deeply nested micro formulas,
+from 1k to 100k terms: the time per term stays flat (linear scaling).
+
+Run from the root of the repository:
+    python benchmarks/bench_long_formulas.py
+"""
+import os
+import sys
+import time
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import constants as cnst
+import formulaparser as fp
+import microcalc
+
+SIZES = (1_000, 10_000, 100_000)
+SUPLIM_CHARS = cnst.MICRO_CALC_FIELDS_SPLIT_SEP + cnst.MICRO_CALC_SUPLIM_CHARS
+
+
+def flat_formula(n_terms: int) -> str:
+    return " + ".join(f"sc@{401 + idx % 50} * 2" for idx in range(n_terms // 2))
+
+
+def nested_formula(n_terms: int) -> str:
+    depth = n_terms // 2
+    return "(" * depth + "sc@401" + " - sc@402)" * depth
+
+
+def measure(formula: str, df: pd.DataFrame) -> tuple[float, float]:
+    started = time.perf_counter()
+    program = fp.parse_formula(formula, SUPLIM_CHARS)
+    parsed = time.perf_counter()
+    microcalc.compute_micro_program(
+        df,
+        "cont",
+        program,
+        cnst.MICRO_CALC_FIELDS_SPLIT_SEP,
+        True,
+        True,
+        term_memo=microcalc.new_term_memo(),
+    )
+    return (parsed - started, time.perf_counter() - parsed)
+
+
+if __name__ == "__main__":
+    df = pd.DataFrame(
+        {"cont": [str(401 + idx) for idx in range(50)], "sc": [float(idx) for idx in range(50)]}
+    )
+
+    print(f"{'shape':>8} {'terms':>8} {'parse s':>9} {'eval s':>9} {'us/term':>8}")
+
+    for name, make_formula in (("flat", flat_formula), ("nested", nested_formula)):
+        for n_terms in SIZES:
+            parse_seconds, eval_seconds = measure(make_formula(n_terms), df)
+            per_term = (parse_seconds + eval_seconds) / n_terms * 1e6
+            print(
+                f"{name:>8} {n_terms:>8} {parse_seconds:>9.3f} {eval_seconds:>9.3f} {per_term:>8.2f}"
+            )
@@ -0,0 +1,89 @@
+"""
+Throughput of `dbsink.ResultSink` on a local SQLite file: the results
+written in batches of `executemany`, in one transaction per run,
+compared with the row by row insert and commit.
+
+Run from the root of the repository:
+    python benchmarks/bench_result_sink.py
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dbsink
+
+ROW_COUNTS = (10_000, 100_000)
+BATCH_SIZES = (100, 1_000, 10_000)
+# Rows of the row by row insert; the commit of each row is slow
+ROW_BY_ROW_COUNT = 2_000
+ERROR_TEXT = "Formula de calcul nu poate fi aplicată: valoarea lipsește pentru contul 401. " * 2
+
+
+def make_records(n_rows: int) -> list[dict]:
+    # One result in 5 with an error, as the fields of a company with missing accounts
+    return [
+        {"id": idx, "value": None, "error": ERROR_TEXT}
+        if idx % 5 == 0
+        else {"id": idx, "value": idx * 1.25, "error": None}
+        for idx in range(n_rows)
+    ]
+
+
+def measure_sink(path: str, records: list[dict], batch_size: int) -> float:
+    sink = dbsink.ResultSink(path, batch_size=batch_size)
+
+    started = time.perf_counter()
+    count, global_error = sink.write(iter(records), run_key="bench")
+    elapsed = time.perf_counter() - started
+
+    assert (count, global_error) == (len(records), None)
+
+    return elapsed
+
+
+def measure_row_by_row(path: str, records: list[dict]) -> float:
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS rfc_results_rows"
+        " (run_key TEXT NOT NULL, field_id TEXT NOT NULL, value, error TEXT,"
+        " PRIMARY KEY (run_key, field_id))"
+    )
+    connection.commit()
+
+    started = time.perf_counter()
+    for record in records:
+        connection.execute(
+            "INSERT OR REPLACE INTO rfc_results_rows VALUES (?, ?, ?, ?)",
+            ("bench", str(record["id"]), record["value"], record["error"]),
+        )
+        connection.commit()
+    elapsed = time.perf_counter() - started
+
+    connection.close()
+
+    return elapsed
+
+
+if __name__ == "__main__":
+    print(f"{'writer':>12} {'rows':>8} {'batch':>7} {'seconds':>9} {'rows/s':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_rows in ROW_COUNTS:
+            records = make_records(n_rows)
+
+            for batch_size in BATCH_SIZES:
+                path = os.path.join(tmp_dir, f"sink_{n_rows}_{batch_size}.sqlite")
+                seconds = measure_sink(path, records, batch_size)
+                print(
+                    f"{'sink':>12} {n_rows:>8} {batch_size:>7} {seconds:>9.3f} {n_rows / seconds:>10.0f}"
+                )
+
+        records = make_records(ROW_BY_ROW_COUNT)
+        seconds = measure_row_by_row(os.path.join(tmp_dir, "rows.sqlite"), records)
+        print(
+            f"{'row by row':>12} {ROW_BY_ROW_COUNT:>8} {1:>7} {seconds:>9.3f} {ROW_BY_ROW_COUNT / seconds:>10.0f}"
+        )
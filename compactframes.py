@@ -0,0 +1,131 @@
+import pandas as pd
+import accountcodes as acc
+
+# Float types of the value columns of the compact frames: float64 keeps the values
+# as they are read, float32 halves their memory, at about 7 significant digits
+# (ex. 1234567.89 is read back as 1234567.9, see `numericvalues.read_cells`)
+FLOAT_DTYPES = ("float64", "float32")
+
+
+def frame_memory(df: pd.DataFrame) -> int:
+    """
+    Memory footprint of a data frame, in bytes, including the strings.
+    """
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def compact_account_column(codes: pd.Series) -> pd.Series:
+    """
+    Store a canonical account column as categorical (each distinct code kept once),
+    when it takes less memory than the strings, ex. for the codes repeated
+    on many rows; otherwise the column is returned as it is.
+    """
+    if not isinstance(codes.dtype, pd.StringDtype):
+        return codes
+
+    categorical = codes.astype("category")
+
+    if categorical.memory_usage(deep=True, index=False) < codes.memory_usage(deep=True, index=False):
+        return categorical
+
+    return codes
+
+
+def compact_frame(
+    df: pd.DataFrame,
+    account_col_names: list[str],
+    value_col_names: list[str],
+    float_dtype: str = "float64",
+) -> tuple[pd.DataFrame, dict]:
+    """
+    Memory-lean copy of a data frame, for the computations of a template:
+    only the account columns and the value columns used by the fields are kept,
+    the account codes are stored as categorical (see `compact_account_column`)
+    and the float value columns as `float_dtype`.
+    The integer and the text (or mixed) columns keep their types.
+
+    The data frame is not modified: it is released when the caller drops it.
+
+    Parameters:
+    ----------
+    df (pd.DataFrame):
+        Data, with the account columns already in canonical form
+        (see `accountcodes.normalize_account_columns`).
+
+    account_col_names (list[str]):
+        Names of the account columns used by the fields.
+
+    value_col_names (list[str]):
+        Names of the value columns used by the fields.
+
+    float_dtype (str):
+        One of `FLOAT_DTYPES`.
+
+    Returns:
+    ----------
+    A tuple:
+        - the compact data frame (pd.DataFrame)
+        - memory report (dict): `bytes_before`, `bytes_after`, `columns_before`, `columns_after`
+
+    Raises ValueError for an unknown `float_dtype`.
+    """
+    if float_dtype not in FLOAT_DTYPES:
+        raise ValueError(f"Unknown float dtype `{float_dtype}`, expected one of {FLOAT_DTYPES}.")
+
+    kept = [
+        (col_name in account_col_names) or (col_name in value_col_names)
+        for col_name in df.columns.values.tolist()
+    ]
+    compact = df.loc[:, kept].copy(deep=False)
+
+    for col_idx, col_name in enumerate(compact.columns.values.tolist()):
+        values = compact.iloc[:, col_idx]
+
+        if col_name in account_col_names:
+            if acc.is_canonical_column(values):
+                compact.isetitem(col_idx, compact_account_column(values))
+
+        elif pd.api.types.is_float_dtype(values) and (values.dtype != float_dtype):
+            compact.isetitem(col_idx, values.astype(float_dtype))
+
+    report = {
+        "bytes_before": frame_memory(df),
+        "bytes_after": frame_memory(compact),
+        "columns_before": len(df.columns),
+        "columns_after": len(compact.columns),
+    }
+
+    return (compact, report)
+
+
+def compact_frames(
+    frames: list[pd.DataFrame],
+    account_col_names: list[str],
+    value_col_names: list[str],
+    float_dtype: str = "float64",
+) -> tuple[list[pd.DataFrame], list[dict]]:
+    """
+    Compact copies (see `compact_frame`) of the data frames of a request;
+    a data frame given more than once (ex. the first sheet, also used
+    by the terms without a sheet name) is compacted once.
+
+    Returns:
+    ----------
+    A tuple:
+        - the compact data frames (list[pd.DataFrame]), in the order of `frames`
+        - the memory reports, with the key `frame` (position in `frames`) added
+    """
+    compacted = {}
+    compact = []
+    reports = []
+
+    for frame_idx, df in enumerate(frames):
+        if id(df) not in compacted:
+            compacted[id(df)], report = compact_frame(
+                df, account_col_names, value_col_names, float_dtype
+            )
+            reports.append({"frame": frame_idx, **report})
+
+        compact.append(compacted[id(df)])
+
+    return (compact, reports)
@@ -0,0 +1,291 @@
+import json
+import constants as cnst
+import microcalc
+import accountcodes as acc
+import errorcodes as errcd
+
+# Version of the compiled template format;
+# change it when the structure of the compiled fields changes
+TEMPLATE_FORMAT_VERSION = 4
+
+# Template variants, selected by the `special_rfc` flag
+NORMAL_VARIANT = "normal"
+SPECIAL_VARIANT = "special"
+
+
+def split_special_jsn_vals(
+    dictio: dict[str, str], separator: str
+) -> tuple[dict[str, str], dict[str, str]]:
+    """
+    Take a field settings dictionary and build, in a single pass, its two variants:
+    for each used key whose value is a string containing the separator,
+    the normal variant keeps the string slice BEFORE the first separator and
+    the special variant keeps the slice AFTER it (up to the next separator).
+    The other values are the same in both variants.
+
+    The input dictionary is not modified, and the keys not used
+    for computations (ex. `key`) are not copied.
+
+    Parameters:
+    ----------
+    dictio (dict):
+        Field settings dictionary.
+
+    separator (str):
+        A string separator used to split the string values of the dictionary.
+
+    Returns:
+    ----------
+    A tuple with the normal and the special variants (dict).
+    If no value contains the separator, both items are the same dictionary.
+    """
+    normal = {}
+    special = {}
+    is_split = False
+
+    for key in cnst.FIELD_SETTINGS_KEYS:
+        if key not in dictio:
+            continue
+
+        val = dictio[key]
+
+        if isinstance(val, str) and (separator in val):
+            val_slices = val.split(separator, 2)
+            normal[key] = val_slices[0]
+            special[key] = val_slices[1]
+            is_split = True
+        else:
+            normal[key] = val
+            special[key] = val
+
+    if not is_split:
+        return (normal, normal)
+
+    return (normal, special)
+
+
+def compile_field(procedure: str, obj: dict) -> dict:
+    """
+    Validate and pre-parse the settings of a single field.
+
+    Parameters:
+    ----------
+    procedure (str):
+        First level API key of the field, ex. `micro_calculator`.
+
+    obj (dict):
+        Field settings object.
+
+    The accounting codes (of the formula terms or of the multi formulas settings)
+    are converted to their canonical form, as the account columns of the data
+    (see `accountcodes.canonical_account_code`).
+
+    Returns:
+    ----------
+    A dictionary with the field id, procedure, the cleaned settings,
+    the parsed formula (for micro formulas) and the settings error
+    (its record `{"code", "params"}`, see `errorcodes.to_record`, or None).
+
+    Raises KeyError, AttributeError, TypeError for the settings that
+    cannot be used at all (missing keys, non-string values).
+    """
+    field = {
+        "id": obj[cnst.ID],
+        "procedure": procedure,
+        "account_col_name": obj[cnst.ACC_COL_NAME].replace(" ", ""),
+    }
+
+    if procedure in (cnst.MICRO_CALC, cnst.MICRO_CALC_FLEXI):
+        field["micro_formula"] = obj[cnst.MICRO_FORMULA]  # do not replace whitespace
+        field["program"], error = microcalc.compile_micro_formula(
+            field["micro_formula"],
+            cnst.MICRO_CALC_FIELDS_SPLIT_SEP,
+            cnst.MICRO_CALC_SUPLIM_CHARS,
+            cnst.MICRO_CALC_SHEET_SEP,
+        )
+        # Records keep the compiled templates serializable as JSON
+        field["error"] = errcd.to_record(error)
+
+        if field["program"] is not None:
+            field["program"] = acc.canonicalize_program_terms(
+                field["program"], cnst.MICRO_CALC_FIELDS_SPLIT_SEP, cnst.MICRO_CALC_SHEET_SEP
+            )
+
+    else:
+        field["account_code"] = obj[cnst.ACC_CODE].replace(" ", "")
+        field["value_col_name"] = obj[cnst.VAL_COL_NAME].replace(" ", "")
+        field["error"] = errcd.to_record(
+            cnst.SETTINGS_CHECKS_MAP[procedure](
+                field["account_col_name"],
+                field["account_code"],
+                field["value_col_name"],
+                cnst.MULTI_FORMULAS_FIELDS_SPLIT_SEP,
+            )
+        )
+
+        if field["error"] is None:
+            field["account_code"] = acc.canonicalize_codes_list(
+                field["account_code"], cnst.MULTI_FORMULAS_FIELDS_SPLIT_SEP
+            )
+
+    return field
+
+
+def compile_template(jsn_inp_obj: dict) -> tuple[dict, str | None]:
+    """
+    Validate and pre-parse all the fields settings of a company,
+    before any data file is read. The input object is not modified.
+
+    Both variants of the settings are compiled in the same pass: the normal
+    one and the special RFC one (see `split_special_jsn_vals`), so the
+    same template serves both values of the `special_rfc` flag.
+    Without the `special_rfc` key, the values are used as they are
+    and both variants are the same.
+
+    The compiled template is a JSON serializable dictionary
+    and can be applied to many data files.
+
+    Parameters:
+    ----------
+    jsn_inp_obj (dict):
+        Fields settings, as read from the JSON file.
+
+    Returns:
+    ----------
+    A tuple:
+        - template (dict) with the keys `version`, `exact_arithm`, `special_rfc`
+        and `variants` (the `normal` and `special` lists of compiled fields,
+        in the order of the settings); see `get_template_fields`
+        - global error (str) or None
+    """
+    normal_fields = []
+    special_fields = []
+    jsn_inp_obj_keys = jsn_inp_obj.keys()
+    has_special_variant = cnst.SPECIAL_RFC in jsn_inp_obj_keys
+
+    for item in jsn_inp_obj_keys:
+        if item not in cnst.PROCEDURES_MAP.keys():
+            continue
+
+        objs_list = jsn_inp_obj[item]
+
+        # Check if is non empty list
+        if (not isinstance(objs_list, list)) or (len(objs_list) == 0):
+            return (
+                {},
+                (
+                    "Setările câmpurilor necesare pentru calcule lipsesc din baza de date"
+                    " sau sunt returnate în format incorect de către server."
+                ),
+            )
+
+        for obj in objs_list:
+            if not isinstance(obj, dict):
+                return (
+                    {},
+                    (
+                        "Serverul returnează anumite obiecte cu setările de câmpuri"
+                        " care nu sunt în formatul necesar pentru calcule (dict format error in json)."
+                    ),
+                )
+
+            try:
+                # If it's a SPECIAL RFC case, the normal variant keeps the string slice before the separator,
+                # the special variant keeps the slice AFTER the separator.
+                if has_special_variant:
+                    normal_obj, special_obj = split_special_jsn_vals(
+                        obj, cnst.SPECIAL_RFC_SPLIT_SEP
+                    )
+                else:
+                    normal_obj, special_obj = (obj, obj)
+
+                normal_field = compile_field(item, normal_obj)
+                special_field = (
+                    normal_field
+                    if special_obj is normal_obj
+                    else compile_field(item, special_obj)
+                )
+
+            except KeyError:
+                return (
+                    {},
+                    (
+                        "Serverul returnează anumite obiecte cu setările de câmpuri din care"
+                        " lipsesc chei obligatorii pentru efectuare de calcule (dict key errors in json)."
+                    ),
+                )
+            except (AttributeError, TypeError):
+                return (
+                    {},
+                    (
+                        "Serverul returnează anumite obiecte în care setările unor câmpuri"
+                        " nu sunt în formatul necesar pentru calcule (type error in json, string expected)."
+                    ),
+                )
+            except Exception:
+                return (
+                    {},
+                    (
+                        "Serverul returnează anumite obiecte cu setările de câmpuri"
+                        " care nu sunt sub în formatul necesar pentru calcule (dict format error in json)."
+                    ),
+                )
+
+            normal_fields.append(normal_field)
+            special_fields.append(special_field)
+
+    template = {
+        "version": TEMPLATE_FORMAT_VERSION,
+        "exact_arithm": True if jsn_inp_obj.get(cnst.EXACT_ARITHM) else False,
+        "special_rfc": True if jsn_inp_obj.get(cnst.SPECIAL_RFC) else False,
+        "variants": {
+            NORMAL_VARIANT: normal_fields,
+            SPECIAL_VARIANT: special_fields,
+        },
+    }
+
+    return (template, None)
+
+
+def get_template_fields(template: dict, special_rfc: bool | None = None) -> list[dict]:
+    """
+    Returns the compiled fields of the template variant selected by `special_rfc`,
+    or by the flag of the compiled settings if `special_rfc` is None.
+    """
+    if special_rfc is None:
+        special_rfc = template["special_rfc"]
+
+    return template["variants"][SPECIAL_VARIANT if special_rfc else NORMAL_VARIANT]
+
+
+def dump_template(template: dict) -> str:
+    """
+    Serialize a compiled template to a JSON string.
+    """
+    return json.dumps(template, ensure_ascii=False)
+
+
+def load_template(serialized: str) -> tuple[dict, str | None]:
+    """
+    Deserialize a compiled template created by `dump_template`.
+
+    Returns:
+    ----------
+    A tuple:
+        - template (dict)
+        - error (str) or None, ex. for a template compiled by another version.
+    """
+    try:
+        template = json.loads(serialized)
+    except Exception:
+        return ({}, "Setările compilate ale câmpurilor nu pot fi citite.")
+
+    if (not isinstance(template, dict)) or (
+        template.get("version") != TEMPLATE_FORMAT_VERSION
+    ):
+        return (
+            {},
+            "Setările compilate ale câmpurilor au fost create de o versiune diferită a aplicației.",
+        )
+
+    return (template, None)
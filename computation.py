@@ -1,44 +1,578 @@
+import os
+from typing import IO
+import pandas as pd
 import constants as cnst
+import compiler as cmpl
 import inputs as inp
+import templatecache as tcache
+import resultcache as rcache
+import microcalc
+import vectorcalc as vcalc
+import accountcodes as acc
+import numericvalues as nval
+import compactframes as cfr
+import dbsource as dbs
+import dbsink
+import errorcodes as errcd
 
 
-def filter_special_jsn_vals(dictio: dict[str, str], separator: str, after_sep: bool):
+def iter_computed_fields(
+    field_names_path: str,
+    data_file_path: str | list[str],
+    sheet_names: list[str] | str | None = None,
+    use_result_cache: bool = False,
+    profile: dict | None = None,
+    compact: str | None = None,
+    error_format: str = errcd.TEXT_ERRORS,
+):
     """
-    Take a dictionary, iterate over its keys, check if the coresp.
-    value is a string, then check if the input separator is in that string,
-    in which case split the string using the separator. If after_sep is True,
-    return the second element, else return the first element.
+    Takes paths to:
+    1) a json file with objects and their field names
+    2) a xls/csv file with data
+    and yields an object with computation result and error
+    for each input object, as soon as it is computed.
+
+    If a global error is encountered, a single object with
+    the `global_error` key is yielded and the generator stops.
 
     Parameters:
     ----------
-    dictio (dict):
-        A dictionary to iterate through.
+    field_names_path (str):
+        Path to JSON file containing the names
+        of the indicators to compute | Can be sys.argv[1]
+
+    data_file_path (str | list[str]):
+        Path to data file (extensions: .csv, .xls, xlsx), or paths to many data files
+
+    sheet_names (list[str] | str | None):
+        Sheets to read from the .xls/.xlsx files, or "*" for all the sheets.
+        If None and a single file is given, only the first sheet is read.
+
+    use_result_cache (bool):
+        If True, the results already computed for the same data and field
+        definitions are returned from the results cache (see `resultcache`)
+        and only the other fields are computed.
+
+    profile (dict | None):
+        If given, it is filled with the counters of the computation,
+        see `iter_template_results`.
+
+    compact (str | None):
+        If given, `float64` or `float32`: the data is kept in memory-lean form
+        while the fields are computed, see `iter_template_results`.
+
+    error_format (str):
+        `text` (the localized texts) or `code` (the records `{"code", "params"}`)
+        for the errors of the fields, see `iter_template_results`.
+
+    Yields:
+    ----------
+    Dictionaries with each field id, value and computation error,
+    or a single dictionary with the global error.
+    """
+    # ===== Read the input json coresp. to id_firm =====
+
+    jsn_inp_obj, jsn_inp_reading_error = inp.read_db_fields_json(field_names_path)
+
+    # Check for errors of reading the input json
+    if len(jsn_inp_reading_error) > 0:
+        yield {"global_error": jsn_inp_reading_error}
+        return
+
+    settings_error = check_settings(jsn_inp_obj)
+
+    if settings_error is not None:
+        yield {"global_error": settings_error}
+        return
+
+    # ===== Validate and pre-parse the fields settings, before reading the data =====
+
+    template, template_error = tcache.get_compiled_template(jsn_inp_obj)
+
+    if template_error is not None:
+        yield {"global_error": template_error}
+        return
+
+    # ===== Read the input data file as pandas dataFrame =====
+
+    if isinstance(data_file_path, str) and (sheet_names is None):
+        df, df_inp_reading_error = inp.read_data_file(data_file_path)
+        sheets = None
+    else:
+        df, df_inp_reading_error, sheets = read_sheets_namespace(data_file_path, sheet_names)
+
+    results = iter_template_results(
+        template,
+        df,
+        df_inp_reading_error,
+        sheets,
+        rcache.get_default_cache() if use_result_cache else None,
+        profile,
+        compact,
+        error_format,
+    )
+
+    # Only the compact copy of the data is kept while the fields are computed
+    del df, sheets
+
+    yield from results
+
+
+def read_sheets_namespace(
+    data_file_path: str | list[str], sheet_names: list[str] | str | None
+) -> tuple[pd.DataFrame, str, dict[str, pd.DataFrame] | None]:
+    """
+    Read the sheets of the data files in a single pass.
+
+    Returns:
+    ----------
+    A tuple:
+        - the first sheet, used by the terms without a sheet name (pd.DataFrame)
+        - error (str)
+        - all the sheets by name (dict) or None
+    """
+    file_paths = [data_file_path] if isinstance(data_file_path, str) else data_file_path
+
+    sheets, error = inp.read_data_sheets(file_paths, sheet_names)
+
+    if len(error) > 0:
+        return (pd.DataFrame(), error, None)
+
+    return (next(iter(sheets.values())), error, sheets)
+
+
+def get_account_col_names(template: dict) -> list[str]:
+    """
+    Returns the names of the account columns used by the fields of the template.
+    """
+    return list(
+        dict.fromkeys(
+            field["account_col_name"]
+            for variant in template["variants"].values()
+            for field in variant
+        )
+    )
+
+
+def normalize_frames(template: dict, frames: list[pd.DataFrame]) -> list[dict]:
+    """
+    Load stage of the data frames, in place: the account codes in canonical form,
+    as the codes of the compiled settings (see `accountcodes.normalize_account_columns`),
+    and the amounts stored as text converted to numbers.
+
+    Returns:
+    ----------
+    The diagnostics of the converted columns, see `numericvalues.normalize_value_columns`.
+    """
+    account_col_names = get_account_col_names(template)
+    acc.normalize_account_columns(frames, account_col_names)
+
+    return nval.normalize_value_columns(frames, account_col_names)
+
+
+def iter_program_terms(program):
+    """
+    Yields the terms of a parsed micro formula (ex. `sc@401`, `balanta!sc@401`, `2`),
+    walked without recursion, for any nesting depth.
+    """
+    stack = [program]
+
+    while len(stack) > 0:
+        node = stack.pop()
+
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, dict):
+            stack.extend(reversed(node["args"]))
+        else:
+            yield node
+
+
+def iter_field_cells(field: dict):
+    """
+    Yields the (sheet name or None, value column name, account code) tuples
+    of the data cells used by a compiled field without settings errors.
+    """
+    if "program" not in field:
+        for value_col_name in field["value_col_name"].split(cnst.MULTI_FORMULAS_FIELDS_SPLIT_SEP):
+            for accounting_code in field["account_code"].split(cnst.MULTI_FORMULAS_FIELDS_SPLIT_SEP):
+                yield (None, value_col_name, accounting_code)
+        return
+
+    for term in iter_program_terms(field["program"]):
+        if cnst.MICRO_CALC_FIELDS_SPLIT_SEP not in term:
+            continue
+
+        sheet_name = None
+
+        if cnst.MICRO_CALC_SHEET_SEP in term:
+            sheet_name, term = term.split(cnst.MICRO_CALC_SHEET_SEP, 1)
+
+        value_col_name, accounting_code = term.split(cnst.MICRO_CALC_FIELDS_SPLIT_SEP, 1)
+
+        yield (sheet_name, value_col_name, accounting_code)
+
+
+def get_value_col_names(template: dict) -> list[str]:
+    """
+    Returns the names of the value columns used by the fields of the template:
+    the columns of the micro formulas terms (of any sheet) and of the multi formulas settings.
+    """
+    return list(
+        dict.fromkeys(
+            value_col_name
+            for variant in template["variants"].values()
+            for field in variant
+            if field["error"] is None
+            for _, value_col_name, _ in iter_field_cells(field)
+        )
+    )
+
+
+def get_account_codes(template: dict) -> dict[str, set[str]]:
+    """
+    Returns the account codes (canonical) used by the fields of the template
+    from the data without a sheet name, by account column name.
+    """
+    codes_by_col: dict[str, set[str]] = {}
+
+    for variant in template["variants"].values():
+        for field in variant:
+            if field["error"] is not None:
+                continue
+
+            codes = codes_by_col.setdefault(field["account_col_name"], set())
+
+            for sheet_name, _, accounting_code in iter_field_cells(field):
+                if sheet_name is None:
+                    codes.add(accounting_code)
+
+    return codes_by_col
+
+
+def find_rollup_codes(
+    fields: list[dict],
+    df: pd.DataFrame,
+    sheets: dict[str, pd.DataFrame] | None,
+    term_memo: dict,
+) -> list[dict]:
+    """
+    The account codes of the micro formulas terms without a row of their own
+    in the data, that get the total of the rows under them in the account tree
+    (see `accountcodes.build_rollup_index`), ex. `sc@401` when the data has only
+    `401.01` and `401.02`. A typo in a code (ex. `sc@40`) resolves the same way,
+    so these codes are reported with the ids of the fields using them.
+    The indexes of the account columns are read from (and kept in) `term_memo`.
+
+    Returns:
+    ----------
+    A list of dictionaries with the keys `sheet` (None for the main data),
+    `account_col_name`, `code` and `fields` (the ids of the fields).
+    """
+    resolved = {}
+
+    for field in fields:
+        if (field["error"] is not None) or ("program" not in field):
+            continue
+
+        account_col_name = field["account_col_name"]
+
+        for sheet_name, _, accounting_code in iter_field_cells(field):
+            if sheet_name is None:
+                frame = df
+            elif (sheets is not None) and (sheet_name in sheets):
+                frame = sheets[sheet_name]
+            else:
+                continue
+
+            if account_col_name not in frame.columns.values.tolist():
+                continue
+
+            code_index = acc.get_code_index(term_memo["code_indexes"], frame, account_col_name)
 
-    separator (str):
-        A string separator used to split the string values of the dictionary.
+            if len(acc.code_positions(code_index, accounting_code)) > 0:
+                continue
 
-    after_sep (bool):
-        A boolean to specify if the filtered and returned slice of the string
-        is that AFTER the first encounter of the separator
-        (if False, the string slice before the separator is filtered and returned.)
+            rollup_codes = acc.get_rollup_index(term_memo["rollups"], frame, account_col_name)["codes"]
+
+            if accounting_code not in rollup_codes:
+                continue
+
+            entry = resolved.setdefault(
+                (sheet_name, account_col_name, accounting_code),
+                {"sheet": sheet_name, "account_col_name": account_col_name, "code": accounting_code, "fields": []},
+            )
+
+            if field["id"] not in entry["fields"]:
+                entry["fields"].append(field["id"])
+
+    return list(resolved.values())
+
+
+def check_settings(jsn_inp_obj) -> str | None:
+    """
+    Check if the fields settings object is a non empty dictionary.
 
     Returns:
     ----------
-    A dictionary with changed string values, in case the separator
-    is found in the string value.
+    The global error (str) or None.
+    """
+    if (not isinstance(jsn_inp_obj, dict)) or (len(jsn_inp_obj) < 1):
+        return (
+            "Pentru această firmă nu au fost create anterior câmpurile necesare pentru a introduce valori în RFC."
+            " Dacă nu acesta este cazul, atunci a apărut o eroare privind formatul datelor pe server"
+            " (json format not a dictionary)"
+        )
+
+    return None
+
+
+def iter_fields_results(
+    jsn_inp_obj: dict,
+    df: pd.DataFrame,
+    df_inp_reading_error: str = "",
+    sheets: dict[str, pd.DataFrame] | None = None,
+):
+    """
+    Takes the fields settings object and the data as DataFrame
+    and yields an object with computation result and error
+    for each field object, as soon as it is computed.
+
+    Parameters:
+    ----------
+    jsn_inp_obj (dict):
+        Fields settings, as read from the JSON file.
+
+    df (pd.DataFrame):
+        Data to compute the fields from.
+
+    df_inp_reading_error (str):
+        Error returned while reading the data, if any.
+
+    sheets (dict[str, pd.DataFrame] | None):
+        All the sheets read, addressable by name in the micro formulas terms.
+
+    Yields:
+    ----------
+    Dictionaries with each field id, value and computation error,
+    or a single dictionary with the global error.
+    """
+    template, template_error = tcache.get_compiled_template(jsn_inp_obj)
+
+    if template_error is not None:
+        yield {"global_error": template_error}
+        return
+
+    yield from iter_template_results(template, df, df_inp_reading_error, sheets)
+
+
+def iter_template_results(
+    template: dict,
+    df: pd.DataFrame,
+    df_inp_reading_error: str = "",
+    sheets: dict[str, pd.DataFrame] | None = None,
+    result_cache: rcache.ResultCache | None = None,
+    profile: dict | None = None,
+    compact: str | None = None,
+    error_format: str = errcd.TEXT_ERRORS,
+    data_size: int | None = None,
+):
+    """
+    Takes a template compiled by `compiler.compile_template` and the data
+    as DataFrame and yields an object with computation result and error
+    for each field, as soon as it is computed.
+
+    Parameters:
+    ----------
+    template (dict):
+        Compiled fields settings.
+
+    df (pd.DataFrame):
+        Data to compute the fields from.
+
+    df_inp_reading_error (str):
+        Error returned while reading the data, if any.
+
+    sheets (dict[str, pd.DataFrame] | None):
+        All the sheets read, addressable by name in the micro formulas terms.
+
+    result_cache (rcache.ResultCache | None):
+        Cache of the fields results, keyed by the data content and the field definition.
+
+    profile (dict | None):
+        If given, it is filled with the counters of the computation:
+        `fields` (computed from the data), `term_memo_hits`, `term_memo_misses`
+        (terms reused / looked up in the data), `result_cache_hits`, `result_cache_misses`,
+        `numeric_columns` (the text columns converted to numbers, see `numericvalues.normalize_value_columns`),
+        `rollup_codes` (the codes of the terms resolved to the total of their subtree,
+        see `find_rollup_codes`),
+        `memory` (with `compact`, the memory footprint of each data frame before and after,
+        see `compactframes.compact_frames`).
+
+    compact (str | None):
+        If given, the fields are computed from memory-lean copies of the data,
+        with only the columns used by the fields, the account codes as categorical
+        and the float value columns as `compact` (`float64` or `float32`),
+        see `compactframes.compact_frame`. The given data frames keep all their columns.
+
+    error_format (str):
+        Format of the errors of the fields: `text` for the localized texts, `code` for
+        the structured records `{"code", "params"}` (see `errorcodes.FieldError`),
+        their text being rendered on request by `errorcodes.render_error`.
+        Each distinct error is rendered once and the identical errors of many fields
+        share the same object in memory (see `errorcodes.ErrorTable`); each result
+        still holds its own error, written once by the output of the error codes
+        (see `outputs.iter_error_references`).
+
+    data_size (int | None):
+        Size (rows x columns) of the whole data, when `df` holds only the rows
+        needed by the fields (see `dbsource.read_table`); by default the size of `df`.
+
+    Yields:
+    ----------
+    Dictionaries with each field id, value and computation error,
+    or a single dictionary with the global error.
     """
-    for key in dictio.keys():
-        if isinstance(dictio[key], str) and (separator in dictio[key]):
-            if after_sep:
-                dictio[key] = dictio[key].split(separator)[1]
-                # dictio.update({key: val.split(sep)[1]})
+    # Check for errors of reading the data file (.csv, .xls, .xlsx)
+    if len(df_inp_reading_error) > 0:
+        yield {"global_error": df_inp_reading_error}
+        return
+
+    # Check if Data Frame is a table with min. 1 row an 1 col (size > 2 is a must)
+    if (df.size if data_size is None else data_size) < 2:
+        yield {
+            "global_error": "Datele din fișierul încărcat nu au minim un rând și minim o coloană."
+        }
+        return
+
+    # =========== ACTUAL WORK ===============
+
+    errors = errcd.ErrorTable(error_format)
+    exact_arithm = template["exact_arithm"]
+    fields = cmpl.get_template_fields(template)
+
+    frames = [df] + (list(sheets.values()) if sheets is not None else [])
+    numeric_columns = normalize_frames(template, frames)
+    memory = []
+
+    if compact is not None:
+        frames, memory = cfr.compact_frames(
+            frames, get_account_col_names(template), get_value_col_names(template), compact
+        )
+        df = frames[0]
+        sheets = dict(zip(sheets.keys(), frames[1:])) if sheets is not None else None
+
+    # Look up all the fields in the results cache at once
+    cache_keys = {}
+    cached_results = {}
+    new_results = {}
+
+    # The terms looked up in the data are shared by all the fields of the request
+    term_memo = microcalc.new_term_memo()
+
+    if profile is not None:
+        profile.update(
+            {
+                "fields": 0,
+                "term_memo_hits": 0,
+                "term_memo_misses": 0,
+                "result_cache_hits": 0,
+                "result_cache_misses": 0,
+                "numeric_columns": numeric_columns,
+                "rollup_codes": find_rollup_codes(fields, df, sheets, term_memo),
+                "memory": memory,
+            }
+        )
+
+    if result_cache is not None:
+        data_hash = rcache.hash_data(df, sheets)
+        for idx, field in enumerate(fields):
+            if field["error"] is None:
+                cache_key = rcache.field_cache_key(field, data_hash, exact_arithm)
+                if cache_key is not None:
+                    cache_keys[idx] = cache_key
+        cached_results = result_cache.get_many(list(cache_keys.values()))
+
+    for idx, field in enumerate(fields):
+        # Settings errors found while compiling, no need to look into the data
+        if field["error"] is not None:
+            yield {"id": field["id"], "value": None, "error": errors.output(field["error"])}
+            continue
+
+        cache_key = cache_keys.get(idx)
+
+        if cache_key in cached_results:
+            value, error = cached_results[cache_key]
+            if profile is not None:
+                profile["result_cache_hits"] += 1
+            yield {"id": field["id"], "value": value, "error": errors.output(error)}
+            continue
+
+        procedure = field["procedure"]
+
+        try:
+            if procedure in (cnst.MICRO_CALC, cnst.MICRO_CALC_FLEXI):
+                results = microcalc.compute_micro_program(
+                    df,
+                    field["account_col_name"],
+                    field["program"],
+                    cnst.MICRO_CALC_FIELDS_SPLIT_SEP,
+                    strict_data_query=False if procedure == cnst.MICRO_CALC_FLEXI else True,
+                    exact_arithm=exact_arithm,
+                    sheets=sheets,
+                    sheet_sep=cnst.MICRO_CALC_SHEET_SEP,
+                    term_memo=term_memo,
+                )
             else:
-                dictio[key] = dictio[key].split(separator)[0]
+                account_col_name = field["account_col_name"]
+                results = cnst.PROCEDURES_MAP[procedure](
+                    df,
+                    account_col_name,
+                    field["account_code"],
+                    field["value_col_name"],
+                    cnst.MULTI_FORMULAS_FIELDS_SPLIT_SEP,
+                    code_index=(
+                        acc.get_code_index(term_memo["code_indexes"], df, account_col_name)
+                        if account_col_name in df.columns.values.tolist()
+                        else None
+                    ),
+                )
+
+        except Exception:
+            yield {
+                "global_error": (
+                    "Serverul returnează anumite obiecte cu setările de câmpuri"
+                    " care nu sunt sub în formatul necesar pentru calcule (dict format error in json)."
+                )
+            }
+            return
+
+        if cache_key is not None:
+            new_results[cache_key] = (results[0], errcd.to_record(results[1]))
+
+        if profile is not None:
+            profile["fields"] += 1
+            profile["result_cache_misses"] += 1 if cache_key is not None else 0
+            profile["term_memo_hits"] = term_memo["hits"]
+            profile["term_memo_misses"] = term_memo["misses"]
 
-    return dictio
+        yield {"id": field["id"], "value": results[0], "error": errors.output(results[1])}
 
+    if result_cache is not None:
+        result_cache.put_many(new_results)
 
-def compute_fields(field_names_path: str, data_file_path: str):
+
+def compute_fields(
+    field_names_path: str,
+    data_file_path: str | list[str],
+    sheet_names: list[str] | str | None = None,
+    use_result_cache: bool = False,
+    profile: dict | None = None,
+    compact: str | None = None,
+    sink: dbsink.ResultSink | None = None,
+    run_key: str = "",
+    error_format: str = errcd.TEXT_ERRORS,
+):
     """
     Takes paths to:
     1) a json file with objects and their field names
@@ -52,178 +586,574 @@ def compute_fields(field_names_path: str, data_file_path: str):
         Path to JSON file containing the names
         of the indicators to compute | Can be sys.argv[1]
 
-    data_file_path (str):
-        Path to data file (extensions: .csv, .xls, xlsx)
+    data_file_path (str | list[str]):
+        Path to data file (extensions: .csv, .xls, xlsx), or paths to many data files
+
+    sheet_names (list[str] | str | None):
+        Sheets to read from the .xls/.xlsx files, or "*" for all the sheets.
+        If None and a single file is given, only the first sheet is read.
+
+    use_result_cache (bool):
+        If True, the results already computed for the same data and field
+        definitions are returned from the results cache (see `resultcache`)
+        and only the other fields are computed.
+
+    profile (dict | None):
+        If given, it is filled with the counters of the computation,
+        see `iter_template_results`.
+
+    compact (str | None):
+        If given, `float64` or `float32`: the data is kept in memory-lean form
+        while the fields are computed, see `iter_template_results`.
+
+    sink (dbsink.ResultSink | None):
+        If given, the results are also written to its database table,
+        in a single transaction, under the key `run_key` (see `dbsink.ResultSink.write`).
+
+    run_key (str):
+        Key of the results in the database table, ex. the company and the period.
+
+    error_format (str):
+        `text` or `code`, see `iter_template_results`. The database table
+        always gets the texts of the errors.
 
     Returns:
     ----------
     A list of dictionaries with each field id, value and computation error.
     """
-    # Initialize an object to accumulate errors
-    errors = []
+    results = collect_results(
+        iter_computed_fields(
+            field_names_path,
+            data_file_path,
+            sheet_names,
+            use_result_cache,
+            profile,
+            compact,
+            error_format,
+        )
+    )
 
-    # ===== Read the input json coresp. to id_firm =====
+    if sink is not None:
+        sink.write(results, run_key)
+
+    return results
 
+
+def iter_table_fields(
+    field_names_path: str,
+    source,
+    table_name: str,
+    use_result_cache: bool = False,
+    profile: dict | None = None,
+    compact: str | None = None,
+    order_by: str | None = "rowid",
+    error_format: str = errcd.TEXT_ERRORS,
+):
+    """
+    Version of `iter_computed_fields` with the data read from a SQLite table
+    (ex. the trial balances kept in SQLite) instead of a data file.
+    Only the rows of the account codes used by the fields are read, with a single
+    query (see `dbsource.read_table`); the results are the same as from the table
+    exported to a data file. The canonical account codes of a table stored once
+    by `dbsource.index_account_codes` spare each request the reading of all its codes.
+
+    Parameters:
+    ----------
+    field_names_path (str):
+        Path to JSON file containing the names
+        of the indicators to compute | Can be sys.argv[1]
+
+    source (str | dbpool.ConnectionPool | sqlite3.Connection):
+        Path of a SQLite file or a SQLite connection, see `dbpool.borrow_connection`;
+        the connections of a SQLite file are pooled and reused by the requests.
+
+    table_name (str):
+        Table with the data, with the same columns as the data files.
+
+    use_result_cache, profile, compact:
+        See `iter_computed_fields`.
+
+    order_by (str | None):
+        Column with the order of the rows, see `dbsource.read_table`.
+
+    error_format (str):
+        See `iter_computed_fields`.
+
+    Yields:
+    ----------
+    Dictionaries with each field id, value and computation error,
+    or a single dictionary with the global error.
+    """
     jsn_inp_obj, jsn_inp_reading_error = inp.read_db_fields_json(field_names_path)
 
-    # Check for errors of reading the input json
     if len(jsn_inp_reading_error) > 0:
-        errors.append({"global_error": jsn_inp_reading_error})
-        return errors
+        yield {"global_error": jsn_inp_reading_error}
+        return
 
-    # Check if the input json object is a dictionary and if it's empty
-    if (not isinstance(jsn_inp_obj, dict)) or (len(jsn_inp_obj) < 1):
-        errors.append(
-            {
-                "global_error": (
-                    "Pentru această firmă nu au fost create anterior câmpurile necesare pentru a introduce valori în RFC."
-                    " Dacă nu acesta este cazul, atunci a apărut o eroare privind formatul datelor pe server"
-                    " (json format not a dictionary)"
-                )
-            }
-        )
-        return errors
+    settings_error = check_settings(jsn_inp_obj)
 
-    # ===== Read the input data file as pandas dataFrame =====
+    if settings_error is not None:
+        yield {"global_error": settings_error}
+        return
 
-    df, df_inp_reading_error = inp.read_data_file(data_file_path)
+    template, template_error = tcache.get_compiled_template(jsn_inp_obj)
 
-    # Check for errors of reading the data file (.csv, .xls, .xlsx)
-    if len(df_inp_reading_error) > 0:
-        errors.append({"global_error": df_inp_reading_error})
-        return errors
+    if template_error is not None:
+        yield {"global_error": template_error}
+        return
 
-    # Check if Data Frame is a table with min. 1 row an 1 col (size > 2 is a must)
-    if df.size < 2:
-        errors.append(
-            {
-                "global_error": "Datele din fișierul încărcat nu au minim un rând și minim o coloană."
-            }
+    df, table_size, df_inp_reading_error = dbs.read_table(
+        source, table_name, get_account_codes(template), order_by
+    )
+
+    yield from iter_template_results(
+        template,
+        df,
+        df_inp_reading_error,
+        None,
+        rcache.get_default_cache() if use_result_cache else None,
+        profile,
+        compact,
+        error_format,
+        table_size,
+    )
+
+
+def compute_table_fields(
+    field_names_path: str,
+    source,
+    table_name: str,
+    use_result_cache: bool = False,
+    profile: dict | None = None,
+    compact: str | None = None,
+    order_by: str | None = "rowid",
+    error_format: str = errcd.TEXT_ERRORS,
+) -> list[dict]:
+    """
+    Version of `compute_fields` with the data read from a database table,
+    see `iter_table_fields`.
+
+    Returns:
+    ----------
+    A list of dictionaries with each field id, value and computation error.
+    """
+    return collect_results(
+        iter_table_fields(
+            field_names_path,
+            source,
+            table_name,
+            use_result_cache,
+            profile,
+            compact,
+            order_by,
+            error_format,
         )
-        return errors
+    )
 
-    # =========== ACTUAL WORK ===============
 
+def collect_results(records) -> list[dict]:
+    """
+    Collect the records yielded by `iter_computed_fields` or `iter_fields_results`
+    in a list. A global error discards all the results computed until then.
+    """
     final_results = []
-    jsn_inp_obj_keys = jsn_inp_obj.keys()
 
-    for item in jsn_inp_obj_keys:
-        if item not in cnst.PROCEDURES_MAP.keys():
-            continue
+    for record in records:
+        if "global_error" in record:
+            return [record]
 
-        objs_list = jsn_inp_obj[item]
-
-        # Check if is non empty list
-        if (not isinstance(objs_list, list)) or (len(objs_list) == 0):
-            errors.append(
-                {
-                    "global_error": (
-                        "Setările câmpurilor necesare pentru calcule lipsesc din baza de date"
-                        " sau sunt returnate în format incorect de către server."
-                    )
-                }
-            )
-            return errors
-
-        # If it's a SPECIAL RFC case, for each object in the list filter the values after a split separator for special cases:
-        # if special case, keep the string slice AFTER the separator, otherwise keep the slice before the separator.
-        if cnst.SPECIAL_RFC in jsn_inp_obj_keys:
-            try:
-                objs_list = [
-                    filter_special_jsn_vals(
-                        dictio=obj,
-                        separator=cnst.SPECIAL_RFC_SPLIT_SEP,
-                        after_sep=True if jsn_inp_obj[cnst.SPECIAL_RFC] else False,
-                    )
-                    for obj in objs_list
-                ]
-            except Exception:
-                errors.append(
-                    {
-                        "global_error": (
-                            "Serverul returnează anumite obiecte cu setările de câmpuri"
-                            " care nu sunt în formatul necesar pentru calcule (dict format error in json)."
-                        )
-                    }
-                )
-                return errors
+        final_results.append(record)
+
+    return final_results
+
+
+def compute_fields_from_objects(
+    jsn_inp_obj: dict,
+    data: pd.DataFrame | bytes | bytearray | memoryview | IO[bytes],
+    file_extension: str = "",
+):
+    """
+    In-process version of `compute_fields`, for callers that already hold
+    the fields settings and the data in memory: nothing is written to disk.
+
+    Parameters:
+    ----------
+    jsn_inp_obj (dict):
+        Fields settings, with the same structure as the JSON file.
+
+    data (pd.DataFrame | bytes | bytearray | memoryview | binary file-like object):
+        The data, as DataFrame or as the content of a .csv/.xls/.xlsx file.
+
+    file_extension (str):
+        Extension of the original data file (".csv", ".xls", ".xlsx"),
+        required when `data` is not a DataFrame.
+
+    Returns:
+    ----------
+    A list of dictionaries with each field id, value and computation error.
+    """
+    settings_error = check_settings(jsn_inp_obj)
+
+    if settings_error is not None:
+        return [{"global_error": settings_error}]
+
+    template, template_error = tcache.get_compiled_template(jsn_inp_obj)
+
+    if template_error is not None:
+        return [{"global_error": template_error}]
+
+    df, df_inp_reading_error = inp.read_data_buffer(data, file_extension)
+
+    return collect_results(
+        iter_template_results(template, df, df_inp_reading_error)
+    )
+
+
+def apply_template(
+    template: dict,
+    data_file_path: str | list[str],
+    sheet_names: list[str] | str | None = None,
+):
+    """
+    Compute the fields of a template compiled by `compiler.compile_template`
+    (ex. once per company) from a data file, without parsing the settings again.
+
+    Parameters:
+    ----------
+    template (dict):
+        Compiled fields settings.
+
+    data_file_path (str | list[str]):
+        Path to data file (extensions: .csv, .xls, xlsx), or paths to many data files
+
+    sheet_names (list[str] | str | None):
+        Sheets to read from the .xls/.xlsx files, or "*" for all the sheets.
+
+    Returns:
+    ----------
+    A list of dictionaries with each field id, value and computation error.
+    """
+    if isinstance(data_file_path, str) and (sheet_names is None):
+        df, df_inp_reading_error = inp.read_data_file(data_file_path)
+        sheets = None
+    else:
+        df, df_inp_reading_error, sheets = read_sheets_namespace(data_file_path, sheet_names)
+
+    return collect_results(
+        iter_template_results(template, df, df_inp_reading_error, sheets)
+    )
+
+
+def read_template_and_frames(
+    field_names_path: str,
+    data_file_paths: list[str],
+    frame_names: list[str],
+    max_workers: int | None = None,
+) -> tuple[dict, list[pd.DataFrame], str | None]:
+    """
+    Read and compile the fields settings, then read the data files in parallel,
+    for the computations over many data frames at once
+    (see `compute_consolidated`, `compute_time_series`).
+
+    Returns:
+    ----------
+    A tuple:
+        - compiled template (dict)
+        - data frames (list[pd.DataFrame]), in the order of the files
+        - global error (str) or None
+    """
+    jsn_inp_obj, jsn_inp_reading_error = inp.read_db_fields_json(field_names_path)
+
+    if len(jsn_inp_reading_error) > 0:
+        return ({}, [], jsn_inp_reading_error)
+
+    settings_error = check_settings(jsn_inp_obj)
+
+    if settings_error is not None:
+        return ({}, [], settings_error)
+
+    template, template_error = tcache.get_compiled_template(jsn_inp_obj)
+
+    if template_error is not None:
+        return ({}, [], template_error)
+
+    dfs, df_inp_reading_errors = inp.read_data_files(data_file_paths, max_workers)
+
+    for frame_name, df, df_inp_reading_error in zip(frame_names, dfs, df_inp_reading_errors):
+        if len(df_inp_reading_error) == 0 and df.size < 2:
+            df_inp_reading_error = "Datele din fișierul încărcat nu au minim un rând și minim o coloană."
+
+        if len(df_inp_reading_error) > 0:
+            return ({}, [], f"`{frame_name}`: {df_inp_reading_error}")
+
+    normalize_frames(template, dfs)
 
-        # For each Field Object from the input json file call the appropriate computing func
-        # collect results in a Generator
+    return (template, dfs, None)
 
-        specific_func = cnst.PROCEDURES_MAP[item]
+
+def get_frame_names(data_file_paths: list[str]) -> list[str]:
+    """
+    Default names of the data frames: the names of the data files without extension.
+    """
+    return [os.path.splitext(os.path.basename(path))[0] for path in data_file_paths]
+
+
+def iter_template_frames(template: dict, dfs: list[pd.DataFrame]):
+    """
+    Takes a compiled template and many data frames (ex. companies or periods)
+    aligned on the account column, and yields for each field a tuple:
+    field id, values (list[float | None]) and errors (list of None
+    or `errorcodes.FieldError`),
+    in the order of the data frames; each formula is evaluated once
+    for all the data frames (see `vectorcalc`).
+
+    If a global error is encountered, a single dictionary with
+    the `global_error` key is yielded and the generator stops.
+    """
+    exact_arithm = template["exact_arithm"]
+
+    # Code x frame matrices, built once per account column name
+    cubes = {}
+
+    for field in cmpl.get_template_fields(template):
+        if field["error"] is not None:
+            yield (field["id"], [None] * len(dfs), [errcd.to_error(field["error"])] * len(dfs))
+            continue
+
+        procedure = field["procedure"]
+        account_col_name = field["account_col_name"]
 
         try:
-            if item in [cnst.MICRO_CALC, cnst.MICRO_CALC_FLEXI]:
-                processing_collection = (
-                    {
-                        "id": obj[cnst.ID],
-                        "results": specific_func(
-                            df,
-                            obj[cnst.ACC_COL_NAME].replace(" ", ""),
-                            obj[cnst.MICRO_FORMULA],  # do not replace whitespace
-                            cnst.MICRO_CALC_FIELDS_SPLIT_SEP,
-                            cnst.MICRO_CALC_SUPLIM_CHARS,
-                            strict_data_query=False if item == cnst.MICRO_CALC_FLEXI else True,
-                        ),
-                    }
-                    for obj in objs_list
+            if account_col_name not in cubes:
+                cubes[account_col_name] = vcalc.build_cube(dfs, account_col_name)
+            cube = cubes[account_col_name]
+
+            if procedure in (cnst.MICRO_CALC, cnst.MICRO_CALC_FLEXI):
+                values, errors = vcalc.compute_micro_vector(
+                    cube,
+                    field["program"],
+                    cnst.MICRO_CALC_FIELDS_SPLIT_SEP,
+                    strict_data_query=False if procedure == cnst.MICRO_CALC_FLEXI else True,
+                    exact_arithm=exact_arithm,
+                    sheet_sep=cnst.MICRO_CALC_SHEET_SEP,
                 )
             else:
-                processing_collection = (
-                    {
-                        "id": obj[cnst.ID],
-                        "results": specific_func(
-                            df,
-                            obj[cnst.ACC_COL_NAME].replace(" ", ""),
-                            obj[cnst.ACC_CODE].replace(" ", ""),
-                            obj[cnst.VAL_COL_NAME].replace(" ", ""),
-                            cnst.MULTI_FORMULAS_FIELDS_SPLIT_SEP,
-                        ),
-                    }
-                    for obj in objs_list
+                values, errors = cnst.VECTOR_PROCEDURES_MAP[procedure](
+                    cube,
+                    field["account_code"],
+                    field["value_col_name"],
+                    cnst.MULTI_FORMULAS_FIELDS_SPLIT_SEP,
                 )
 
-            results = [
-                {
-                    "id": item["id"],
-                    "value": item["results"][0],
-                    "error": item["results"][1],
-                }
-                for item in processing_collection
-            ]
-
-            final_results.extend(results)
-
-        except KeyError:
-            errors.append(
-                {
-                    "global_error": (
-                        "Serverul returnează anumite obiecte cu setările de câmpuri din care"
-                        " lipsesc chei obligatorii pentru efectuare de calcule (dict key errors in json)."
-                    )
-                }
-            )
-            return errors
-        except (AttributeError, TypeError):
-            errors.append(
-                {
-                    "global_error": (
-                        "Serverul returnează anumite obiecte în care setările unor câmpuri"
-                        " nu sunt în formatul necesar pentru calcule (type error in json, string expected)."
-                    )
-                }
-            )
-            return errors
         except Exception:
-            errors.append(
-                {
-                    "global_error": (
-                        "Serverul returnează anumite obiecte cu setările de câmpuri"
-                        " care nu sunt sub în formatul necesar pentru calcule (dict format error in json)."
-                    )
-                }
-            )
-            return errors
+            yield {
+                "global_error": (
+                    "Serverul returnează anumite obiecte cu setările de câmpuri"
+                    " care nu sunt sub în formatul necesar pentru calcule (dict format error in json)."
+                )
+            }
+            return
 
-    return final_results
+        yield (field["id"], values, errors)
+
+
+def compute_consolidated(
+    field_names_path: str,
+    data_file_paths: list[str],
+    company_names: list[str] | None = None,
+    error_format: str = errcd.TEXT_ERRORS,
+):
+    """
+    Group consolidation: compute the fields of the same settings for the data files
+    of many companies, and their consolidated (summed) values.
+
+    The data files are aligned on the account column in a single matrix
+    (account code x company) per value column, and each formula is evaluated once
+    for all the companies (see `vectorcalc`), instead of once per company.
+
+    Parameters:
+    ----------
+    field_names_path (str):
+        Path to JSON file containing the names
+        of the indicators to compute
+
+    data_file_paths (list[str]):
+        Paths to the data files of the companies (extensions: .csv, .xls, xlsx)
+
+    company_names (list[str] | None):
+        Names of the companies, in the order of the data files;
+        by default, the names of the data files without extension.
+
+    error_format (str):
+        `text` or `code`, for the consolidated errors and the errors
+        of the companies, see `iter_template_results`.
+
+    Returns:
+    ----------
+    A list of dictionaries with each field id, consolidated value and error,
+    and the `companies` list with the value and error of each company;
+    or a list with a single dictionary with the global error.
+    """
+    if company_names is None:
+        company_names = get_frame_names(data_file_paths)
+
+    template, dfs, global_error = read_template_and_frames(
+        field_names_path, data_file_paths, company_names
+    )
+
+    if global_error is not None:
+        return [{"global_error": global_error}]
+
+    error_table = errcd.ErrorTable(error_format)
+
+    return collect_results(
+        item
+        if isinstance(item, dict)
+        else consolidate_record(item[0], company_names, item[1], item[2], error_table)
+        for item in iter_template_frames(template, dfs)
+    )
+
+
+def consolidate_record(
+    field_id,
+    company_names: list[str],
+    values: list[float | None],
+    errors: list,
+    error_table: errcd.ErrorTable | None = None,
+) -> dict:
+    """
+    Build the result of a field for a group of companies: the consolidated value
+    is the sum of the values of all the companies, rounded to 2 decimals,
+    or None if any company has no value. The errors are output by `error_table`
+    (by default as texts).
+    """
+    if error_table is None:
+        error_table = errcd.ErrorTable()
+
+    missing = [name for name, value in zip(company_names, values) if value is None]
+
+    if len(missing) > 0:
+        value = None
+        error = errcd.FieldError(
+            "consolidated_values_missing",
+            companies=", ".join(f"`{name}`" for name in missing),
+        )
+    else:
+        value = round(sum(values), 2)
+        error = None
+
+    return {
+        "id": field_id,
+        "value": value,
+        "error": error_table.output(error),
+        "companies": [
+            {"company": name, "value": company_value, "error": error_table.output(company_error)}
+            for name, company_value, company_error in zip(company_names, values, errors)
+        ],
+    }
+
+
+def compute_time_series(
+    field_names_path: str,
+    data_files: str | list[str],
+    period_names: list[str] | None = None,
+    deltas: bool = False,
+    max_workers: int | None = None,
+    error_format: str = errcd.TEXT_ERRORS,
+):
+    """
+    Compute the fields of the same settings for an ordered set of period files
+    (ex. the monthly trial balances of a year) in a single pass:
+    the files are read in parallel, aligned on the account column
+    (account code x period matrices per value column) and each formula
+    is evaluated once for all the periods.
+
+    Parameters:
+    ----------
+    field_names_path (str):
+        Path to JSON file containing the names
+        of the indicators to compute
+
+    data_files (str | list[str]):
+        Paths to the period data files, in chronological order,
+        or a folder whose data files are taken in the order of their names.
+
+    period_names (list[str] | None):
+        Names of the periods, in the order of the files;
+        by default, the names of the data files without extension.
+
+    deltas (bool):
+        If True, each series also has the period-over-period differences.
+
+    max_workers (int | None):
+        Maximum number of threads reading the files.
+
+    error_format (str):
+        `text` or `code`, for the `errors` series, see `iter_template_results`.
+
+    Returns:
+    ----------
+    A list of dictionaries with each field id, the `periods` names and
+    the `values` and `errors` series (and `deltas`, None for the first period
+    and for the periods without values); or a list with a single dictionary
+    with the global error.
+    """
+    if isinstance(data_files, str):
+        data_file_paths, listing_error = inp.list_data_files(data_files)
+
+        if len(listing_error) > 0:
+            return [{"global_error": listing_error}]
+    else:
+        data_file_paths = data_files
+
+    if period_names is None:
+        period_names = get_frame_names(data_file_paths)
+
+    template, dfs, global_error = read_template_and_frames(
+        field_names_path, data_file_paths, period_names, max_workers
+    )
+
+    if global_error is not None:
+        return [{"global_error": global_error}]
+
+    error_table = errcd.ErrorTable(error_format)
+
+    return collect_results(
+        item
+        if isinstance(item, dict)
+        else series_record(item[0], period_names, item[1], item[2], deltas, error_table)
+        for item in iter_template_frames(template, dfs)
+    )
+
+
+def series_record(
+    field_id,
+    period_names: list[str],
+    values: list[float | None],
+    errors: list,
+    deltas: bool = False,
+    error_table: errcd.ErrorTable | None = None,
+) -> dict:
+    """
+    Build the time series result of a field; the errors are output
+    by `error_table` (by default as texts).
+    """
+    if error_table is None:
+        error_table = errcd.ErrorTable()
+
+    record = {
+        "id": field_id,
+        "periods": period_names,
+        "values": values,
+        "errors": [error_table.output(error) for error in errors],
+    }
+
+    if deltas:
+        record["deltas"] = [None] + [
+            round(current - previous, 2)
+            if (current is not None) and (previous is not None)
+            else None
+            for previous, current in zip(values[:-1], values[1:])
+        ]
+
+    return record
@@ -1,14 +1,19 @@
 from typing import Callable
 import microcalc
 import multiformulas
+import vectorcalc
+import errorcodes as errcd
 
 SPECIAL_RFC_SPLIT_SEP = ":"
 MICRO_CALC_FIELDS_SPLIT_SEP = "@"
 MICRO_CALC_SUPLIM_CHARS = "._"
+MICRO_CALC_SHEET_SEP = "!"
+ALL_SHEETS = "*"
 MULTI_FORMULAS_FIELDS_SPLIT_SEP = ","
 
 # first level API keys
 SPECIAL_RFC = "special_rfc"
+EXACT_ARITHM = "exact_arithm"
 MICRO_CALC = "micro_calculator"
 MICRO_CALC_FLEXI = "micro_calculator_flexi"
 SINGLE_CELL = "single_cell"
@@ -25,6 +30,9 @@ ACC_COL_NAME = "account_col_name"
 ACC_CODE = "account_code"
 VAL_COL_NAME = "value_col_name"
 
+# API objects keys used for computations
+FIELD_SETTINGS_KEYS = (ID, ACC_COL_NAME, MICRO_FORMULA, ACC_CODE, VAL_COL_NAME)
+
 # API keys mapping to computing functions
 PROCEDURES_MAP: dict[str, Callable[..., tuple[float | None, str | None]]] = {
     MICRO_CALC: microcalc.compute_micro,
@@ -33,3 +41,17 @@ PROCEDURES_MAP: dict[str, Callable[..., tuple[float | None, str | None]]] = {
     AMRSC: multiformulas.sum_many_rows_same_col,
     SSRTC: multiformulas.subtract_two_single_values, # type: ignore
 }
+
+# API keys mapping to settings validation functions (run before reading any data)
+SETTINGS_CHECKS_MAP: dict[str, Callable[..., errcd.FieldError | None]] = {
+    SINGLE_CELL: multiformulas.check_single_value_settings,
+    AMRSC: multiformulas.check_sum_settings,
+    SSRTC: multiformulas.check_subtract_settings,
+}
+
+# API keys mapping to the computing functions for many data frames at once (group consolidation)
+VECTOR_PROCEDURES_MAP: dict[str, Callable[..., tuple[list, list]]] = {
+    SINGLE_CELL: vectorcalc.get_single_value_vector,
+    AMRSC: vectorcalc.sum_many_rows_same_col_vector,
+    SSRTC: vectorcalc.subtract_two_single_values_vector,
+}
@@ -0,0 +1,154 @@
+import os
+import sys
+import sqlite3
+import threading
+import contextlib
+
+# Max. number of idle connections kept by a pool
+DEFAULT_POOL_SIZE = 4
+
+
+def driver_paramstyle(connection) -> str:
+    """
+    DB-API parameter style (`paramstyle` of the driver module) of a connection,
+    ex. "qmark" for sqlite3, "pyformat" for psycopg2.
+    """
+    driver = sys.modules.get(type(connection).__module__.split(".")[0])
+
+    return getattr(driver, "paramstyle", "qmark")
+
+
+def placeholder(paramstyle: str, position: int) -> str:
+    """
+    Query parameter marker of the positional parameter `position` (from 1).
+
+    Raises ValueError for the named parameter styles.
+    """
+    if paramstyle == "qmark":
+        return "?"
+    if paramstyle in ("format", "pyformat"):
+        return "%s"
+    if paramstyle == "numeric":
+        return f":{position}"
+
+    raise ValueError(f"Unsupported DB-API paramstyle `{paramstyle}`.")
+
+
+class ConnectionPool:
+    """
+    Pool of DB-API connections, reused by the requests (ex. of a service)
+    instead of opening a connection for each one.
+
+    A connection is used by a single request at a time; a connection
+    that fails is closed instead of being returned to the pool.
+
+    Parameters:
+    ----------
+    connect (callable):
+        Opens a new connection, ex. `lambda: sqlite3.connect(path)`.
+
+    max_size (int):
+        Max. number of idle connections kept; the connections returned
+        to a full pool are closed.
+    """
+
+    def __init__(self, connect, max_size: int = DEFAULT_POOL_SIZE):
+        self._connect = connect
+        self.max_size = max_size
+        self._idle = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @contextlib.contextmanager
+    def connection(self):
+        """
+        Context manager lending a connection of the pool, or a new one.
+        """
+        connection = None
+
+        with self._lock:
+            if len(self._idle) > 0:
+                connection = self._idle.pop()
+
+        if connection is None:
+            connection = self._connect()
+
+        try:
+            yield connection
+        except BaseException:
+            connection.close()
+            raise
+
+        with self._lock:
+            if (not self._closed) and (len(self._idle) < self.max_size):
+                self._idle.append(connection)
+                return
+
+        connection.close()
+
+    def close(self):
+        """
+        Close the idle connections; the lent ones are closed when returned.
+        """
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+
+        for connection in idle:
+            connection.close()
+
+
+def sqlite_pool(
+    db_path: str, read_only: bool = True, max_size: int = DEFAULT_POOL_SIZE
+) -> ConnectionPool:
+    """
+    Pool of connections to a SQLite file, usable from any thread.
+    A read-only pool never creates the file: a missing file is an error.
+    """
+
+    def connect():
+        if read_only:
+            return sqlite3.connect(
+                f"file:{db_path}?mode=ro", uri=True, timeout=10, check_same_thread=False
+            )
+        return sqlite3.connect(db_path, timeout=10, check_same_thread=False)
+
+    return ConnectionPool(connect, max_size)
+
+
+_sqlite_pools: dict[tuple[str, bool], ConnectionPool] = {}
+_sqlite_pools_lock = threading.Lock()
+
+
+def get_sqlite_pool(db_path: str, read_only: bool = True) -> ConnectionPool:
+    """
+    Returns the pool of the process for a SQLite file, created once
+    and shared by all the requests.
+    """
+    key = (os.path.abspath(db_path), read_only)
+
+    with _sqlite_pools_lock:
+        if key not in _sqlite_pools:
+            _sqlite_pools[key] = sqlite_pool(key[0], read_only)
+
+        return _sqlite_pools[key]
+
+
+@contextlib.contextmanager
+def borrow_connection(source, read_only: bool = True):
+    """
+    Context manager lending a connection of a data source:
+    - a path of a SQLite file (str): a connection of its pool, see `get_sqlite_pool`
+    - a `ConnectionPool`: one of its connections
+    - a DB-API connection: the connection itself, left open
+    """
+    if isinstance(source, str):
+        with get_sqlite_pool(source, read_only).connection() as connection:
+            yield connection
+
+    elif isinstance(source, ConnectionPool):
+        with source.connection() as connection:
+            yield connection
+
+    else:
+        yield source
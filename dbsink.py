@@ -0,0 +1,139 @@
+from typing import Iterable
+import dbpool
+import dbsource as dbs
+import errorcodes as errcd
+
+# Default table of the results
+DEFAULT_RESULTS_TABLE = "rfc_results"
+
+# Number of results written by a single `executemany`
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _to_builtin(val):
+    """
+    Convert the numpy scalars (ex. the sum of an integer column) for the database driver.
+    """
+    if hasattr(val, "item"):
+        return val.item()
+    return val
+
+
+class ResultSink:
+    """
+    Writes the results of the fields to a SQLite table, one row per field,
+    keyed by the run (ex. company and period) and the field id:
+    the results of a run computed again replace the old ones
+    (upsert, `INSERT ... ON CONFLICT`, SQLite 3.24+).
+
+    The results of a run are written in a single transaction, in batches
+    of `executemany`; a global error writes nothing. The connections are
+    borrowed for each run (see `dbpool.borrow_connection`), so a sink can
+    be used for all the requests of a service or of a batch.
+
+    Parameters:
+    ----------
+    target (str | dbpool.ConnectionPool | sqlite3.Connection):
+        Path of a SQLite file (created if missing) or a SQLite connection.
+
+    table_name (str):
+        Table of the results, created if missing, with the columns
+        `run_key`, `field_id`, `value`, `error`. The column `value` has no type:
+        it keeps, with the dynamic typing of SQLite, the numbers as numbers
+        and the text values (ex. a cell read by `single_cell`) as text.
+
+    batch_size (int):
+        Number of results written by a single `executemany`.
+    """
+
+    def __init__(
+        self,
+        target,
+        table_name: str = DEFAULT_RESULTS_TABLE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        self.target = target
+        self.table_name = table_name
+        self.batch_size = batch_size
+
+    def _upsert_sql(self, paramstyle: str) -> str:
+        table = dbs.quote_identifier(self.table_name)
+        markers = ", ".join(dbpool.placeholder(paramstyle, position) for position in range(1, 5))
+
+        return (
+            f"INSERT INTO {table} (run_key, field_id, value, error) VALUES ({markers})"
+            " ON CONFLICT (run_key, field_id)"
+            " DO UPDATE SET value = excluded.value, error = excluded.error"
+        )
+
+    def write(self, records: Iterable[dict], run_key: str = "") -> tuple[int, str | None]:
+        """
+        Write the result records `{"id", "value", "error"}` as soon as they are received,
+        ex. from the generator returned by `computation.iter_computed_fields`.
+        The errors are stored as text, also those given as records `{"code", "params"}`.
+
+        Parameters:
+        ----------
+        records (Iterable[dict]):
+            Result records, or a single record with the `global_error` key.
+
+        run_key (str):
+            Key of the run, stored with each result.
+
+        Returns:
+        ----------
+        A tuple:
+            - the number of results written (int)
+            - the global error (str) or None; the transaction is rolled back
+            and nothing is written
+        """
+        count = 0
+        global_error = None
+
+        with dbpool.borrow_connection(self.target, read_only=False) as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {dbs.quote_identifier(self.table_name)}"
+                " (run_key TEXT NOT NULL, field_id TEXT NOT NULL, value, error TEXT,"
+                " PRIMARY KEY (run_key, field_id))"
+            )
+            connection.commit()
+
+            upsert_sql = self._upsert_sql(dbpool.driver_paramstyle(connection))
+            batch = []
+
+            try:
+                for record in records:
+                    if "global_error" in record:
+                        global_error = record["global_error"]
+                        break
+
+                    batch.append(
+                        (
+                            run_key,
+                            str(record["id"]),
+                            _to_builtin(record["value"]),
+                            errcd.render_error(record["error"]),
+                        )
+                    )
+
+                    if len(batch) == self.batch_size:
+                        cursor.executemany(upsert_sql, batch)
+                        count += len(batch)
+                        batch = []
+
+                if global_error is None:
+                    if len(batch) > 0:
+                        cursor.executemany(upsert_sql, batch)
+                        count += len(batch)
+                    connection.commit()
+
+            except BaseException:
+                connection.rollback()
+                raise
+
+            if global_error is not None:
+                connection.rollback()
+                count = 0
+
+        return (count, global_error)
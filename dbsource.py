@@ -0,0 +1,355 @@
+import json
+import pandas as pd
+import accountcodes as acc
+import dbpool
+
+# Suffix of the table with the canonical account codes of a data table,
+# see `index_account_codes`
+CODES_TABLE_SUFFIX = "_rfc_codes"
+
+
+def quote_identifier(name: str) -> str:
+    """
+    SQL identifier (table or column name), quoted as in the SQL standard.
+    """
+    return '"' + name.replace('"', '""') + '"'
+
+
+def quote_literal(text: str) -> str:
+    """
+    SQL string literal, as in the SQL standard.
+    """
+    return "'" + text.replace("'", "''") + "'"
+
+
+def codes_table_name(table_name: str) -> str:
+    """
+    Name of the table with the canonical account codes of a data table.
+    """
+    return f"{table_name}{CODES_TABLE_SUFFIX}"
+
+
+def select_stored_codes(stored_codes: list, codes: set[str]) -> list:
+    """
+    The account codes stored in the table (as they are stored, ex. 401.0 or "0401")
+    whose canonical form is one of `codes` or is under one of them in the account tree,
+    ex. "401.01" for "401" (the rollups of the codes without a row of their own,
+    see `accountcodes.build_rollup_index`).
+    """
+    selected = []
+    # The ancestors of a code are its prefixes
+    prefixes = tuple(codes)
+
+    for stored_code in stored_codes:
+        if stored_code is None:
+            continue
+
+        code = acc.canonical_account_code(stored_code)
+
+        if not code.startswith(prefixes):
+            continue
+
+        if (code in codes) or any(ancestor in codes for ancestor in acc.code_ancestors(code)):
+            selected.append(stored_code)
+
+    return selected
+
+
+def create_account_index(connection, table_name: str, account_col_name: str):
+    """
+    Create (if missing) the index of the account column of a table,
+    used by the query of `read_table`. The index is not committed:
+    the transaction of the connection belongs to the caller.
+    """
+    connection.cursor().execute(
+        f"CREATE INDEX IF NOT EXISTS {quote_identifier(f'{table_name}_{account_col_name}')}"
+        f" ON {quote_identifier(table_name)} ({quote_identifier(account_col_name)})"
+    )
+
+
+def index_account_codes(
+    target, table_name: str, account_col_names: list[str]
+) -> tuple[int, str | None]:
+    """
+    Store, once for all the requests, the canonical account codes of a data table
+    (see `accountcodes.canonical_account_code`), so `read_table` finds the rows
+    of the codes used by the fields with a single indexed query, instead of reading
+    and converting all the account codes of the table for each request.
+
+    The table `codes_table_name(table_name)` gets, for each account code stored
+    in the account columns (as it is stored, ex. 401.0 or "0401"), a row with its
+    canonical code and a row with each of its ancestors in the account tree,
+    indexed by column and code; the account columns are indexed too
+    (see `create_account_index`). The codes of a column are stored again
+    when this function is called again (ex. after the table is loaded).
+
+    The triggers created on the data table discard the stored codes of a column
+    when rows are inserted or their account codes updated: `read_table` then reads
+    the account codes from the data table until the codes are stored again.
+    The changes are committed.
+
+    Parameters:
+    ----------
+    target (str | dbpool.ConnectionPool | sqlite3.Connection):
+        The SQLite database, opened for writing, see `dbpool.borrow_connection`.
+
+    table_name (str):
+        Table with the data.
+
+    account_col_names (list[str]):
+        Names of the account columns to index.
+
+    Returns:
+    ----------
+    A tuple:
+        - the number of distinct account codes stored (int)
+        - error (str) or None; nothing is written
+    """
+    count = 0
+    error = None
+
+    table = quote_identifier(table_name)
+    codes_table = quote_identifier(codes_table_name(table_name))
+
+    try:
+        with dbpool.borrow_connection(target, read_only=False) as connection:
+            paramstyle = dbpool.driver_paramstyle(connection)
+            markers = ", ".join(
+                dbpool.placeholder(paramstyle, position) for position in range(1, 4)
+            )
+            cursor = connection.cursor()
+
+            try:
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {codes_table}"
+                    " (account_col_name TEXT NOT NULL, code TEXT NOT NULL, stored_code)"
+                )
+                cursor.execute(
+                    "CREATE INDEX IF NOT EXISTS"
+                    f" {quote_identifier(f'{codes_table_name(table_name)}_code')}"
+                    f" ON {codes_table} (account_col_name, code)"
+                )
+
+                for account_col_name in account_col_names:
+                    create_account_index(connection, table_name, account_col_name)
+
+                    # The stored codes of the column are discarded by the changes of its codes
+                    discard = (
+                        f"BEGIN DELETE FROM {codes_table}"
+                        f" WHERE account_col_name = {quote_literal(account_col_name)}; END"
+                    )
+                    column = quote_identifier(account_col_name)
+                    trigger_prefix = f"{codes_table_name(table_name)}_{account_col_name}"
+                    insert_trigger = quote_identifier(f"{trigger_prefix}_insert")
+                    update_trigger = quote_identifier(f"{trigger_prefix}_update")
+                    cursor.execute(
+                        f"CREATE TRIGGER IF NOT EXISTS {insert_trigger}"
+                        f" AFTER INSERT ON {table} {discard}"
+                    )
+                    cursor.execute(
+                        f"CREATE TRIGGER IF NOT EXISTS {update_trigger}"
+                        f" AFTER UPDATE OF {column} ON {table} {discard}"
+                    )
+
+                    cursor.execute(
+                        f"DELETE FROM {codes_table}"
+                        f" WHERE account_col_name = {dbpool.placeholder(paramstyle, 1)}",
+                        (account_col_name,),
+                    )
+                    cursor.execute(
+                        f"SELECT DISTINCT {column} FROM {table} WHERE {column} IS NOT NULL"
+                    )
+                    stored_codes = [row[0] for row in cursor.fetchall()]
+
+                    rows = []
+
+                    for stored_code in stored_codes:
+                        code = acc.canonical_account_code(stored_code)
+
+                        for tree_code in [code] + acc.code_ancestors(code):
+                            rows.append((account_col_name, tree_code, stored_code))
+
+                    cursor.executemany(
+                        f"INSERT INTO {codes_table} (account_col_name, code, stored_code)"
+                        f" VALUES ({markers})",
+                        rows,
+                    )
+                    count += len(stored_codes)
+
+                connection.commit()
+
+            except BaseException:
+                connection.rollback()
+                raise
+
+    except Exception:
+        count = 0
+        error = (
+            f"Codurile contabile ale tabelului `{table_name}` nu pot fi salvate în baza de date."
+            " Verificați denumirea tabelului și a coloanelor și conexiunea la baza de date."
+        )
+
+    return (count, error)
+
+
+def stored_codes_condition(
+    cursor,
+    table_name: str,
+    account_col_name: str,
+    codes: set[str],
+    has_codes_table: bool,
+    paramstyle: str,
+    params: list,
+) -> str | None:
+    """
+    Condition of the query of `read_table` selecting the rows of the account codes
+    `codes` (canonical) and of the codes under them in the account tree;
+    its parameters are appended to `params`. None if no row is needed.
+
+    The codes stored by `index_account_codes` are joined to the JSON array of `codes`,
+    unpacked by `json_each` (SQLite 3.38+, or older builds with JSON1). A column without
+    stored codes (not indexed, or changed since) has its distinct codes read and converted
+    (see `select_stored_codes`), then passed as a JSON array with their stored types.
+    """
+    column = quote_identifier(account_col_name)
+    codes_table = quote_identifier(codes_table_name(table_name))
+    is_indexed = False
+
+    if has_codes_table:
+        cursor.execute(
+            f"SELECT 1 FROM {codes_table}"
+            f" WHERE account_col_name = {dbpool.placeholder(paramstyle, 1)} LIMIT 1",
+            (account_col_name,),
+        )
+        is_indexed = len(cursor.fetchall()) > 0
+
+    if is_indexed:
+        col_marker = dbpool.placeholder(paramstyle, len(params) + 1)
+        codes_marker = dbpool.placeholder(paramstyle, len(params) + 2)
+        params.extend([account_col_name, json.dumps(sorted(codes))])
+
+        return (
+            f"{column} IN (SELECT stored_code FROM {codes_table}"
+            f" WHERE account_col_name = {col_marker}"
+            f" AND code IN (SELECT value FROM json_each({codes_marker})))"
+        )
+
+    cursor.execute(f"SELECT DISTINCT {column} FROM {quote_identifier(table_name)}")
+    stored_codes = select_stored_codes([row[0] for row in cursor.fetchall()], codes)
+
+    if len(stored_codes) == 0:
+        return None
+
+    codes_marker = dbpool.placeholder(paramstyle, len(params) + 1)
+    params.append(json.dumps(stored_codes))
+
+    return f"{column} IN (SELECT value FROM json_each({codes_marker}))"
+
+
+def read_table(
+    source,
+    table_name: str,
+    codes_by_col: dict[str, set[str]],
+    order_by: str | None = "rowid",
+) -> tuple[pd.DataFrame, int, str]:
+    """
+    Read from a SQLite table only the rows needed by the fields:
+    the rows of the account codes used (in canonical form) and the rows under them
+    in the account tree, with all the columns of the table. The fields computed from
+    these rows have the same results as from the whole table, exported to a file.
+
+    The rows are read with a single query (see `stored_codes_condition`); with the
+    canonical codes stored by `index_account_codes`, only the rows needed are visited.
+    Nothing is written to the database, so the transaction of a connection
+    passed by the caller is left as it is.
+
+    Parameters:
+    ----------
+    source (str | dbpool.ConnectionPool | sqlite3.Connection):
+        The SQLite database, see `dbpool.borrow_connection`.
+
+    table_name (str):
+        Table with the data, one row per account code, as the data files.
+
+    codes_by_col (dict[str, set[str]]):
+        The canonical account codes used by the fields, by account column name.
+
+    order_by (str | None):
+        Column with the order of the rows (by default the SQLite `rowid`), as in the
+        exported files; the first row of a duplicated code is the first in this order.
+        None keeps the order returned by the database.
+
+    Returns:
+    ----------
+    A tuple:
+        - the data read (pd.DataFrame); the values keep the types stored in the database
+        - the size of the whole table (int): its number of columns times its number
+        of rows, counted up to 2, enough for the size check of
+        `computation.iter_template_results` (the rows read can be fewer)
+        - error (str)
+    """
+    df = pd.DataFrame()
+    table_size = 0
+    error = ""
+
+    table = quote_identifier(table_name)
+    order = f" ORDER BY {quote_identifier(order_by)}" if order_by is not None else ""
+
+    try:
+        with dbpool.borrow_connection(source) as connection:
+            paramstyle = dbpool.driver_paramstyle(connection)
+            cursor = connection.cursor()
+
+            cursor.execute(f"SELECT * FROM {table} WHERE 1 = 0")
+            col_names = [description[0] for description in cursor.description]
+            cursor.fetchall()
+
+            cursor.execute(f"SELECT COUNT(*) FROM (SELECT 1 FROM {table} LIMIT 2)")
+            table_size = cursor.fetchone()[0] * len(col_names)
+
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+                f" AND name = {dbpool.placeholder(paramstyle, 1)}",
+                (codes_table_name(table_name),),
+            )
+            has_codes_table = len(cursor.fetchall()) > 0
+
+            conditions = []
+            params = []
+
+            for account_col_name, codes in codes_by_col.items():
+                if account_col_name not in col_names:
+                    continue
+
+                condition = stored_codes_condition(
+                    cursor,
+                    table_name,
+                    account_col_name,
+                    codes,
+                    has_codes_table,
+                    paramstyle,
+                    params,
+                )
+
+                if condition is not None:
+                    conditions.append(condition)
+
+            rows = []
+
+            if len(conditions) > 0:
+                cursor.execute(
+                    f"SELECT * FROM {table} WHERE {' OR '.join(conditions)}{order}", params
+                )
+                rows = cursor.fetchall()
+
+            df = pd.DataFrame.from_records(rows, columns=col_names)
+
+    except Exception:
+        df = pd.DataFrame()
+        table_size = 0
+        error = (
+            f"Tabelul `{table_name}` nu poate fi citit din baza de date."
+            " Verificați denumirea tabelului și conexiunea la baza de date."
+        )
+
+    return (df, table_size, error)
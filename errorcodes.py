@@ -0,0 +1,385 @@
+# Formats of the errors of the results:
+# - the localized text of the error (the default),
+# - the structured record of the error `{"code", "params"}`, see `FieldError.to_record`
+TEXT_ERRORS = "text"
+CODE_ERRORS = "code"
+
+ERROR_FORMATS = (TEXT_ERRORS, CODE_ERRORS)
+
+# Code of the errors given as text (ex. by the callers written for the older versions)
+TEXT = "text"
+
+# Code of the many errors of a field (ex. of many terms of a micro formula), one per line
+MANY = "many"
+
+# Localized text of the errors, by code; the parameters are filled in by `str.format`
+MESSAGES = {
+    TEXT: "{text}",
+    # ===== settings (found while compiling, before reading any data)
+    "formula_syntax": (
+        "Expresia introdusă în câmpul micro-calculator de la setări nu este conformă cu regulile"
+        " de construire a formulelor de calcul."
+        " Verificați dacă formula introdusă respectă regulile precizate."
+        " Detalii returnate de sistem: `{details}`"
+    ),
+    "formula_invalid": (
+        "Expresia introdusă în câmpul micro-calculator de la setări nu este conformă cu regulile"
+        " de construire a formulelor de calcul."
+        " Verificați dacă formula introdusă respectă regulile precizate."
+    ),
+    "settings_values_not_text": (
+        "Unele din valorile `{account_col_name}`, `{account_code}`, `{value_col_name}`"
+        " definite pentru acest câmp nu sunt înregistrate în baza de date în format string"
+        " sau sunt înregistrate ca nule."
+    ),
+    "single_cell_many_codes": (
+        "Pentru operațiunea `O singură valoare`, nu este permisă folosirea separatorului de"
+        "valori multiple `{separator}` alături de contul contabil `{code}`, care trebuie să fie unic."
+    ),
+    "single_cell_many_columns": (
+        "Pentru operațiunea `O singură valoare`, nu este permisă folosirea separatorului de"
+        "valori multiple `{separator}` alături de numele coloanei `{column}`, care trebuie să fie unică."
+    ),
+    "sum_codes_too_few": (
+        "Pentru acest câmp a cărui valoare e calculată prin operația aritmetică de adunare"
+        " trebuie precizate MINIM 2 conturi contabile corespunzând valorilor care trebuie adunate."
+    ),
+    "subtract_settings_values_not_text": (
+        "Unele din valorile `{account_col_name}`, `{account_code}`, `{value_col_name}`"
+        " precizate pentru acest câmp nu sunt înregistrate în baza de date în format string"
+        " sau sunt înregistrate ca nule."
+    ),
+    "subtract_codes_too_many": (
+        "Pentru acest câmp a cărui valoare e calculată prin operația aritmetică de scădere"
+        " trebuie precizate MAXIM 2 conturi contabile corespunzând valorilor cu care se face operația de scădere."
+    ),
+    "subtract_columns_too_many": (
+        "Pentru acest câmp a cărui valoare e calculată prin operația aritmetică de scădere"
+        " trebuie precizate MAXIM 2 nume de coloane în care se găsesc cei 2 termeni ai scăderii."
+    ),
+    "subtract_terms_too_few": (
+        "Pentru acest câmp a cărui valoare e calculată prin operația aritmetică de scădere a 2 termeni"
+        " trebuie precizate fie 2 conturi contabile și 1 nume de coloană,"
+        " fie 1 cont contabil și 2 nume de coloane"
+    ),
+    # ===== microcalc
+    "code_missing": (
+        "Codul contabil `{code}`,"
+        " din expresia introdusă la setări, nu există în fișierul încărcat sau are altă denumire."
+    ),
+    "term_column_missing": (
+        "Coloana `{column}`,"
+        " din expresia introdusă la setări, nu există în fișierul încărcat sau are altă denumire."
+    ),
+    "rollup_values_missing": (
+        "Unele din valorile conturilor cuprinse în contul `{code}`,"
+        " corespunzătoare termenului `{term}` din setările firmei și coloanei `{column}`,"
+        " lipsesc din fișierul încărcat."
+    ),
+    "rollup_values_not_numeric": (
+        "Unele din valorile conturilor cuprinse în contul `{code}`,"
+        " corespunzătoare termenului `{term}` din setările firmei și coloanei `{column}`,"
+        " nu pot fi transformate în valori numerice."
+    ),
+    "term_read_failed": (
+        "A apărut o eroare la citirea valorii corespunzătoare termenului `{term}` din setările firmei,"
+        " respectiv coloanei `{column}` și contului contabil `{code}`"
+        " din fișierul încărcat."
+    ),
+    "term_value_missing": (
+        "Valoarea corespunzătoare termenului `{term}` din setările firmei, respectiv"
+        " coloanei `{column}` și contului contabil `{code}`"
+        " lipsește din fișierul încărcat sau nu poate fi transformată în valoare numerică."
+    ),
+    "term_value_not_numeric": (
+        "Valoarea corespunzătoare termenului `{term}` din setările firmei, respectiv"
+        " coloanei `{column}` și contului contabil `{code}`"
+        " nu poate fi transformată în valoare numerică."
+    ),
+    "sheet_missing": (
+        "Foaia de calcul `{sheet}`, din termenul `{term}` introdus la setări,"
+        " nu există în fișierul încărcat sau are altă denumire."
+    ),
+    "sheet_account_column_missing": (
+        "Coloana `{column}`, necesară pentru calcule,"
+        " nu există în foaia de calcul `{sheet}` din fișierul încărcat sau are altă denumire."
+    ),
+    "term_separator_missing": (
+        "Operatorul de legătură `{separator}` nu apare în interiorul"
+        " termenului `{term}` introdus la setări."
+        " Operatorul este necesar pentru a identifica în fișierul cu date"
+        " corespondența dintre coloana cu valori numerice și denumirea contului contabil."
+    ),
+    "formula_incomplete": (
+        "Formula introdusă în câmpul de setări nu conține operatori aritmetici"
+        "  și/sau suficienți termeni necesari efectuării de calcule."
+    ),
+    "formula_too_deep": (
+        "Nivelul de adâncime al formulei introduse este prea mare,"
+        " a depășit memoria alocată de server. Formula introdusă trebuie să aibă"
+        " un număr rezonabil de paranteze, operatori aritmetici și termeni sau valori."
+    ),
+    "division_by_zero": (
+        "În formula introdusă în câmpul de setări apare explicit o împărțire la zero SAU"
+        " numitorul folosit într-o operație de împărțire din formula introdusă la setări"
+        " are valoarea zero în celula din fișierul cu date ce corespunde numitorului indicat în formulă."
+    ),
+    "neighbour_operators": (
+        "Formula introdusă în câmpul de setări conține doi operatori aritmetici"
+        " situați unul lângă altul. Un operator trebuie să aibă atât la stânga cât și la dreapta lui"
+        " fie un indicator către o celulă din fișierul cu date, fie o valoare numerică."
+    ),
+    "operator_position": (
+        "Poziția unuia din operatorii aritmetici din formula introdusă la setări este incorectă."
+        " Un operator trebuie să aibă atât la stânga cât și la dreapta lui"
+        " fie un indicator către o celulă din fișierul cu date, fie o valoare numerică."
+    ),
+    "unary_operator": (
+        "Operatorii unari pot fi doar semnele `+` și `-`, sistemul a detectat alt tip de expresie"
+        " în poziție de operator unar."
+    ),
+    "computation_failed": (
+        "A aparut o eroare în procesarea calculelor conform expresiei introduse."
+        " în câmpul micro-calculator de la setări."
+    ),
+    # ===== multiformulas
+    "column_missing": (
+        "Coloana `{column}`,"
+        " necesară pentru calcule, nu există în fișierul încărcat sau are altă denumire."
+    ),
+    "account_column_not_text": (
+        "Coloana `{column}`,"
+        " necesară pentru calcule, conține caractere care nu pot fi transformate în format string/text."
+    ),
+    "cell_value_missing": (
+        "Valoarea corespunzătoare rândului cu codul contabil `{code}`"
+        " și coloanei `{column}` lipsește din fișierul încărcat"
+    ),
+    "cell_value_not_numeric": (
+        "Valoarea corespunzătoare rândului cu codul contabil `{code}`"
+        " și coloanei `{column}` lipsește din fișierul încărcat sau nu este în format numeric."
+    ),
+    "cell_value_unreadable": (
+        "Valoarea corespunzătoare rândului cu codul contabil `{code}`"
+        " și coloanei `{column}` din fișierul încărcat are un format care nu poate fi procesat."
+    ),
+    "sum_values_missing": (
+        "Unele din valorile corespunzătoare rândurilor cu codurile contabile `{codes}`"
+        " și coloanei `{column}` lipsesc din fișierul încărcat."
+    ),
+    "sum_values_not_numeric": (
+        "Unele din valorile corespunzătoare rândurilor cu codurile contabile `{codes}`"
+        " și coloanei `{column}` din fișierul încărcat nu sunt în format numeric."
+    ),
+    "sum_values_unreadable": (
+        "Unele din valorile corespunzătoare rândurilor cu codurile contabile `{codes}`"
+        " și coloanei `{column}` din fișierul încărcat nu pot fi procesate."
+    ),
+    "sum_not_numeric": (
+        "Operația de adunare a valorilor corespunzătoare rândurilor cu codurile contabile `{codes}`"
+        " și coloanei `{column}` din fișierul încărcat nu a produs un rezultat numeric."
+    ),
+    "term_cell_missing": (
+        "Valoarea corespunzătoare rândului cu codul contabil `{code}` și coloanei `{column}`,"
+        " lipsește din fișierul încărcat."
+    ),
+    "term_cell_not_numeric": (
+        "Valoarea corespunzătoare rândului cu codul contabil `{code}` și coloanei `{column}`,"
+        " din fișierul încărcat nu este în format numeric."
+    ),
+    "term_cell_column_missing": (
+        "Coloana `{column}` corespunzătoare rândului cu contul contabil `{code}`,"
+        " necesară pentru calcule, nu există în fișierul încărcat sau are altă denumire."
+    ),
+    "subtract_values_unreadable": (
+        "Unele din valorile corespunzătoare rândurilor cu codurile contabile `{code_first}`, `{code_second}`"
+        " și coloanelor `{column_first}`, `{column_second}` din fișierul încărcat nu pot fi procesate."
+    ),
+    "subtract_values_missing": (
+        "Unele din valorile corespunzătoare rândului cu codul contabil `{code_first}`"
+        " și coloanei `{column_first}` sau rândului cu codul contabil `{code_second}`"
+        " și coloanei `{column_second}` lipsesc din fișierul încărcat sau nu sunt în format numeric."
+    ),
+    "subtract_values_not_numeric": (
+        "Unele din valorile corespunzătoare rândului cu codul contabil `{code_first}`"
+        " și coloanei `{column_first}` sau rândului cu codul contabil `{code_second}`"
+        " și coloanei `{column_second}` din fișierul încărcat nu sunt în format numeric."
+    ),
+    # ===== computation (consolidation)
+    "consolidated_values_missing": (
+        "Valoarea consolidată nu poate fi calculată deoarece lipsesc valorile firmelor: {companies}."
+    ),
+}
+
+
+def _freeze(val):
+    """
+    Hashable form of a parameter (the lists of codes become tuples).
+    """
+    if isinstance(val, (list, tuple)):
+        return tuple(_freeze(item) for item in val)
+    return val
+
+
+class FieldError:
+    """
+    Error of a field as a code and its parameters (ex. the column and the account code),
+    built without formatting any text. The localized text (see `MESSAGES`)
+    is rendered only when it is requested, once per error.
+
+    Two errors with the same code and parameters are equal, so the identical errors
+    of many fields can share a single error (see `ErrorTable`).
+
+    Parameters:
+    ----------
+    code (str):
+        Code of the error, a key of `MESSAGES`.
+
+    params:
+        Parameters of the text of the error.
+    """
+
+    __slots__ = ("code", "params", "_key", "_text")
+
+    def __init__(self, code: str, /, **params):
+        self.code = code
+        self.params = params
+        self._key = None
+        self._text = None
+
+    def key(self) -> tuple:
+        """
+        Hashable form of the code and the parameters.
+        """
+        if self._key is None:
+            if self.code == MANY:
+                self._key = (MANY, tuple(error.key() for error in self.params["errors"]))
+            else:
+                self._key = (
+                    self.code,
+                    tuple((name, _freeze(val)) for name, val in self.params.items()),
+                )
+        return self._key
+
+    def render(self) -> str:
+        """
+        Localized text of the error.
+        """
+        if self._text is None:
+            if self.code == MANY:
+                self._text = "\n".join(error.render() for error in self.params["errors"])
+            else:
+                self._text = MESSAGES[self.code].format(**self.params)
+        return self._text
+
+    def to_record(self) -> dict:
+        """
+        Structured record of the error `{"code", "params"}`, serializable as JSON.
+        """
+        if self.code == MANY:
+            return {
+                "code": MANY,
+                "params": {"errors": [error.to_record() for error in self.params["errors"]]},
+            }
+        return {"code": self.code, "params": dict(self.params)}
+
+    def __eq__(self, other):
+        return isinstance(other, FieldError) and (self.key() == other.key())
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __str__(self):
+        return self.render()
+
+    def __repr__(self):
+        return f"FieldError({self.code!r}, {self.params!r})"
+
+
+def join_errors(errors: list) -> FieldError | None:
+    """
+    A single error from the errors of a field (None if there is none),
+    rendered one per line.
+    """
+    if len(errors) == 0:
+        return None
+    if len(errors) == 1:
+        return errors[0]
+    return FieldError(MANY, errors=tuple(errors))
+
+
+def to_error(error) -> FieldError | None:
+    """
+    The error as `FieldError`, from a `FieldError`, a record `{"code", "params"}`,
+    a text (ex. a settings error) or None.
+    """
+    if (error is None) or isinstance(error, FieldError):
+        return error
+
+    if isinstance(error, str):
+        return FieldError(TEXT, text=error)
+
+    if error["code"] == MANY:
+        return FieldError(MANY, errors=tuple(to_error(item) for item in error["params"]["errors"]))
+
+    return FieldError(error["code"], **error["params"])
+
+
+def to_record(error) -> dict | None:
+    """
+    Structured record `{"code", "params"}` of the error, see `to_error`.
+    """
+    error = to_error(error)
+    return error.to_record() if error is not None else None
+
+
+def render_error(error) -> str | None:
+    """
+    Localized text of the error, see `to_error`.
+    """
+    if (error is None) or isinstance(error, str):
+        return error
+    return to_error(error).render()
+
+
+class ErrorTable:
+    """
+    Converts the errors of the results of a request to the output format: each distinct
+    error is rendered (or converted to its record) only once, and the identical errors
+    of many fields share the same text or record object in memory.
+
+    The results still hold each its own error; the output written with the error codes
+    has the distinct errors once, referenced by the results (see `outputs.iter_error_references`).
+
+    Parameters:
+    ----------
+    error_format (str):
+        `text` for the localized texts, `code` for the records `{"code", "params"}`.
+    """
+
+    def __init__(self, error_format: str = TEXT_ERRORS):
+        if error_format not in ERROR_FORMATS:
+            raise ValueError(f"Unknown error format `{error_format}`, expected one of {ERROR_FORMATS}.")
+
+        self.error_format = error_format
+        self._outputs = {}
+
+    def output(self, error):
+        """
+        The error in the output format (None if there is no error).
+        """
+        if (error is None) or ((self.error_format == TEXT_ERRORS) and isinstance(error, str)):
+            return error
+
+        error = to_error(error)
+        key = error.key()
+
+        if key not in self._outputs:
+            self._outputs[key] = (
+                error.render() if self.error_format == TEXT_ERRORS else error.to_record()
+            )
+
+        return self._outputs[key]
+
+    def __len__(self):
+        return len(self._outputs)
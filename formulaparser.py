@@ -0,0 +1,316 @@
+# Version of the parser output; part of the compiled templates cache key
+PARSER_VERSION = 3
+
+TERM_INIT_CHARS = frozenset(
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+)
+WHITESPACE_CHARS = frozenset(" \t\n\r")
+
+# Binding power of the binary operators; operators with the same
+# binding power are left associative and are collected in a single flat list.
+# The comparisons return 1 (true) or 0 (false).
+BINARY_BP = {
+    "<": 1,
+    ">": 1,
+    "<=": 1,
+    ">=": 1,
+    "=": 1,
+    "<>": 1,
+    "+": 2,
+    "-": 2,
+    "*": 3,
+    "/": 3,
+}
+
+# Operators of 2 chars, matched before the 1 char ones
+TWO_CHAR_OPS = frozenset(("<=", ">=", "<>"))
+
+UNARY_OPS = frozenset("+-")
+UNARY_BP = 4
+
+LPAR = "("
+RPAR = ")"
+ARG_SEP = ","
+
+# Functions: name -> (min. number of arguments, max. number of arguments or None)
+FUNCTIONS = {
+    "max": (1, None),
+    "min": (1, None),
+    "abs": (1, 1),
+    "if": (3, 3),
+}
+
+# Token kinds
+TERM = "term"
+OP = "op"
+INVALID = "invalid"
+END = "end"
+
+
+class FormulaParseError(Exception):
+    """
+    The formula does not respect the micro formula grammar.
+
+    The message, shown to the user in the settings error, keeps the layout
+    of the pyparsing errors of the former grammar (`microcalc.parse_field`):
+    `Expected ..., found ...  (at char N), (line:L, col:C)`. The expected element
+    is named in words (ex. `term` instead of `W:(0-9A-Za-z, ...)`, `` `)` ``
+    instead of `Unbalanced parentheses or expression syntax error`), and the
+    position is where the formula stops matching the grammar, which may differ
+    from the position reported by the backtracking of pyparsing.
+    """
+
+    def __init__(self, src: str, loc: int, expected: str):
+        self.src = src
+        self.loc = loc
+        self.expected = expected
+
+        line = src.count("\n", 0, loc) + 1
+        col = loc - (src.rfind("\n", 0, loc) + 1) + 1
+        found = "end of text" if loc >= len(src) else repr(src[loc])
+
+        super().__init__(
+            f"Expected {expected}, found {found}  (at char {loc}), (line:{line}, col:{col})"
+        )
+
+
+def tokenize(src: str, suplimentary_chars: str) -> list[tuple[str, str, int]]:
+    """
+    Split the formula in tokens: terms (an ASCII letter or digit followed by
+    letters, digits or suplimentary chars), operators, parentheses,
+    functions arguments separators and invalid chars.
+
+    Returns:
+    ----------
+    A list of tuples (kind, text, position in src), ending with an END token.
+    """
+    term_chars = TERM_INIT_CHARS | frozenset(suplimentary_chars)
+    tokens = []
+    src_len = len(src)
+    pos = 0
+
+    while pos < src_len:
+        char = src[pos]
+
+        if char in WHITESPACE_CHARS:
+            pos += 1
+
+        elif char in TERM_INIT_CHARS:
+            start = pos
+            pos += 1
+            while pos < src_len and src[pos] in term_chars:
+                pos += 1
+            tokens.append((TERM, src[start:pos], start))
+
+        elif src[pos : pos + 2] in TWO_CHAR_OPS:
+            tokens.append((OP, src[pos : pos + 2], pos))
+            pos += 2
+
+        elif (char in BINARY_BP) or (char in (LPAR, RPAR, ARG_SEP)):
+            tokens.append((OP, char, pos))
+            pos += 1
+
+        else:
+            # Reported by the parser, which knows what was expected at this position
+            tokens.append((INVALID, char, pos))
+            pos += 1
+
+    tokens.append((END, "", src_len))
+
+    return tokens
+
+
+# Kinds of the pending constructs on the parser stack
+_EXPR = 0
+_UNARY = 1
+_GROUP = 2
+_CALL = 3
+
+
+class _Parser:
+    """
+    Pratt parser over the tokens of a formula.
+
+    The parser does not recurse: the constructs being parsed (chains of
+    binary operations, unary operations, parentheses, function calls)
+    are kept on an explicit stack, so the nesting depth of a formula
+    is not limited by the recursion limit of python.
+    """
+
+    def __init__(self, src: str, tokens: list[tuple[str, str, int]]):
+        self.src = src
+        self.tokens = tokens
+        self.idx = 0
+
+    def peek(self) -> tuple[str, str, int]:
+        return self.tokens[self.idx]
+
+    def advance(self) -> tuple[str, str, int]:
+        token = self.tokens[self.idx]
+        self.idx += 1
+        return token
+
+    def parse_expr(self, min_bp: int) -> str | list:
+        # An expression: [_EXPR, min. binding power, left operand, chain items, chain level]
+        stack = [[_EXPR, min_bp, None, None, None]]
+
+        while True:
+            value = self.parse_prefix(stack)
+
+            # Pass the operand to the pending constructs, until one needs another operand
+            while True:
+                frame = stack[-1]
+                kind = frame[0]
+
+                if kind == _EXPR:
+                    if frame[3] is None:
+                        frame[2] = value
+                    else:
+                        frame[3].append(value)
+
+                    if self.continue_expr(frame, stack):
+                        break
+                    value = frame[2]
+
+                elif kind == _UNARY:
+                    value = [frame[1], value]
+
+                elif kind == _GROUP:
+                    kind, text, loc = self.advance()
+                    if not (kind == OP and text == RPAR):
+                        raise FormulaParseError(self.src, loc, "`)`")
+                    # Parentheses only group, they do not add a nesting level
+
+                else:
+                    frame[2].append(value)
+                    if self.continue_call(frame, stack):
+                        break
+                    value = {"fn": frame[1], "args": frame[2]}
+
+                stack.pop()
+
+                if len(stack) == 0:
+                    return value
+
+    def continue_expr(self, frame: list, stack: list) -> bool:
+        """
+        Continue the chain of binary operations of the expression after an operand.
+        Returns True if an operand of higher binding power was started on the stack,
+        False if the expression is complete (its value is `frame[2]`).
+        """
+        _, min_bp, _, items, level = frame
+
+        while True:
+            kind, text, _ = self.peek()
+
+            if items is not None:
+                # Collect all the operators of the same level in a flat list
+                if (kind == OP) and (BINARY_BP.get(text) == level):
+                    self.advance()
+                    items.append(text)
+                    stack.append([_EXPR, level + 1, None, None, None])
+                    return True
+
+                frame[2] = items
+                frame[3] = items = None
+                continue
+
+            if (kind != OP) or (text not in BINARY_BP) or (BINARY_BP[text] < min_bp):
+                return False
+
+            frame[4] = level = BINARY_BP[text]
+            frame[3] = items = [frame[2]]
+
+    def continue_call(self, frame: list, stack: list) -> bool:
+        """
+        Continue the arguments of a function call after an argument.
+        Returns True if the next argument was started on the stack,
+        False if the call is complete.
+        """
+        fn_name, args = frame[1], frame[2]
+        kind, text, loc = self.advance()
+
+        if kind == OP and text == ARG_SEP:
+            stack.append([_EXPR, 0, None, None, None])
+            return True
+
+        if not (kind == OP and text == RPAR):
+            raise FormulaParseError(self.src, loc, "`,` or `)`")
+
+        min_args, max_args = FUNCTIONS[fn_name]
+
+        if (len(args) < min_args) or ((max_args is not None) and (len(args) > max_args)):
+            expected_args = (
+                f"{min_args}" if min_args == max_args else f"at least {min_args}"
+            )
+            raise FormulaParseError(
+                self.src, loc, f"{expected_args} arguments for `{fn_name}`"
+            )
+
+        return False
+
+    def parse_prefix(self, stack: list) -> str:
+        """
+        Parse the prefixes of an operand (unary operators, left parentheses,
+        function names), pushing them on the stack, up to the first term.
+        """
+        while True:
+            kind, text, loc = self.advance()
+
+            if kind == TERM:
+                next_kind, next_text, _ = self.peek()
+                if next_kind == OP and next_text == LPAR:
+                    self.start_call(text, loc, stack)
+                    continue
+                return text
+
+            if kind == OP and text in UNARY_OPS:
+                stack.append([_UNARY, text])
+                stack.append([_EXPR, UNARY_BP, None, None, None])
+                continue
+
+            if kind == OP and text == LPAR:
+                stack.append([_GROUP])
+                stack.append([_EXPR, 0, None, None, None])
+                continue
+
+            raise FormulaParseError(self.src, loc, "term")
+
+    def start_call(self, name: str, name_loc: int, stack: list):
+        fn_name = name.lower()
+
+        if fn_name not in FUNCTIONS:
+            raise FormulaParseError(
+                self.src, name_loc, f"function name ({', '.join(FUNCTIONS)})"
+            )
+
+        self.advance()  # the left parenthesis
+        stack.append([_CALL, fn_name, []])
+        stack.append([_EXPR, 0, None, None, None])
+
+
+def parse_formula(src: str, suplimentary_chars: str) -> list:
+    """
+    Parse the string with input formula and returns
+    a nested list of lists with terms and operations,
+    in the same format as `microcalc.parse_field`:
+    - a term is a string, ex. `sc@401`, `0.19`,
+    - an unary operation is a list [operator, operand],
+    - a chain of binary operations with the same precedence is a flat list
+    [operand, operator, operand, operator, operand ...],
+    - a function call, ex. `max(sc@401, 0)`, is a dictionary
+    {"fn": name in lowercase, "args": [operand, ...]},
+    - the whole result is wrapped in a list of length 1.
+
+    Raises FormulaParseError if the formula does not respect the grammar.
+    """
+    tokens = tokenize(src, suplimentary_chars)
+    parser = _Parser(src, tokens)
+
+    result = parser.parse_expr(0)
+
+    kind, _, loc = parser.peek()
+    if kind != END:
+        raise FormulaParseError(src, loc, "end of text")
+
+    return [result]
@@ -1,6 +1,27 @@
+import io
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO
+import numpy as np
 import pandas as pd
+import accountcodes as acc
+import numericvalues as nval
+
+# Version of the binary snapshot format for trial balances
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Extensions of the data files read by `read_data_file`
+DATA_FILE_EXTENSIONS = (".csv", ".xls", ".xlsx", ".npy")
+
+# Estimated time (seconds) of reading and normalizing 1 MB of a data file, by extension:
+# the .xlsx files (zipped XML) are about 10 times slower than the .csv files
+LOAD_SECONDS_PER_MB = {
+    ".csv": 0.25,
+    ".xls": 1.2,
+    ".xlsx": 2.7,
+    ".npy": 0.05,
+}
 
 
 def read_db_fields_json(file_path: str):
@@ -35,29 +56,18 @@ def read_db_fields_json(file_path: str):
         return (field_names, error)
 
 
-def read_data_file(file_path: str) -> tuple[pd.DataFrame, str]:
+def _read_data_source(source, file_extension: str) -> tuple[pd.DataFrame, str]:
     """
-    Read .csv, .xls, .xlsx file and transform it to DataFrame.
-
-    Parameters:
-    ----------
-    file_path (str):
-        Path to file. Ex.: "https://example.com/folder/filename";
-        when in the same folder as the py script: "filename".
-
-    Returns:
-    ----------
-    A tuple:
-        - df (pd.DataFrame)
-        - error (str)
+    Read a .csv, .xls, .xlsx source (path or binary file-like object)
+    or a .npy snapshot (path, see `read_data_snapshot`)
+    and transform it to DataFrame, choosing the reader by the file extension.
     """
-    _, file_extension = os.path.splitext(file_path)
     df = pd.DataFrame()
     error = ""
 
     if file_extension == ".xls":
         try:
-            df = pd.read_excel(file_path, engine="xlrd")
+            df = pd.read_excel(source, engine="xlrd")
         except Exception:
             error = (
                 "Fișierul încărcat nu poate fi citit."
@@ -67,7 +77,7 @@ def read_data_file(file_path: str) -> tuple[pd.DataFrame, str]:
 
     elif file_extension == ".xlsx":
         try:
-            df = pd.read_excel(file_path, engine="openpyxl")
+            df = pd.read_excel(source, engine="openpyxl")
         except Exception:
             error = (
                 "Fișierul încărcat nu poate fi citit."
@@ -75,9 +85,12 @@ def read_data_file(file_path: str) -> tuple[pd.DataFrame, str]:
                 " și încercați din nou să îl încărcați în sistem."
             )
 
+    elif file_extension == ".npy" and isinstance(source, str):
+        df, error = read_data_snapshot(source)
+
     elif file_extension == ".csv":
         try:
-            df = pd.read_csv(file_path, sep=None, engine="python")
+            df = pd.read_csv(source, sep=None, engine="python")
         except Exception:
             error = (
                 "Fișierul încărcat nu poate fi citit."
@@ -89,6 +102,368 @@ def read_data_file(file_path: str) -> tuple[pd.DataFrame, str]:
         error = (
             "Fișierul încărcat nu este într-un format compatibil."
             " Pentru a putea fi procesat, fișierul trebuie să aibă una din extensiile:"
-            " .csv, .xls sau .xlsx."
+            " .csv, .xls, .xlsx sau .npy (instantaneu al datelor)."
+        )
+    return (df, error)
+
+
+def read_data_file(file_path: str) -> tuple[pd.DataFrame, str]:
+    """
+    Read .csv, .xls, .xlsx file or .npy snapshot and transform it to DataFrame.
+
+    Parameters:
+    ----------
+    file_path (str):
+        Path to file. Ex.: "https://example.com/folder/filename";
+        when in the same folder as the py script: "filename".
+
+    Returns:
+    ----------
+    A tuple:
+        - df (pd.DataFrame)
+        - error (str)
+    """
+    _, file_extension = os.path.splitext(file_path)
+
+    return _read_data_source(file_path, file_extension)
+
+
+
+def list_data_files(dir_path: str) -> tuple[list[str], str]:
+    """
+    List the data files of a folder (ex. the monthly trial balances of a year),
+    ordered by file name.
+
+    Returns:
+    ----------
+    A tuple:
+        - file paths (list[str])
+        - error (str)
+    """
+    try:
+        file_names = sorted(os.listdir(dir_path))
+    except Exception:
+        return ([], f"Folderul `{dir_path}` cu fișierele de date nu poate fi citit.")
+
+    file_paths = [
+        os.path.join(dir_path, file_name)
+        for file_name in file_names
+        if os.path.splitext(file_name)[1] in DATA_FILE_EXTENSIONS
+        and os.path.isfile(os.path.join(dir_path, file_name))
+    ]
+
+    if len(file_paths) == 0:
+        return ([], f"Folderul `{dir_path}` nu conține fișiere de date.")
+
+    return (file_paths, "")
+
+
+def file_size_mb(file_path: str) -> float:
+    """
+    Size of a file in MB, 0.0 if it cannot be read.
+    """
+    try:
+        return os.path.getsize(file_path) / 1_000_000
+    except OSError:
+        return 0.0
+
+
+def estimate_load_seconds(file_path: str) -> float:
+    """
+    Estimated time (seconds) of reading and normalizing a data file,
+    from its size and its format (see `LOAD_SECONDS_PER_MB`).
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+
+    return file_size_mb(file_path) * LOAD_SECONDS_PER_MB.get(extension, LOAD_SECONDS_PER_MB[".xlsx"])
+
+
+def read_data_files(
+    file_paths: list[str], max_workers: int | None = None
+) -> tuple[list[pd.DataFrame], list[str]]:
+    """
+    Read many data files in parallel threads (the parsing of .xlsx files
+    and the disk reads release the GIL for a good part of the time).
+    The files are started in decreasing order of their estimated reading time
+    (see `estimate_load_seconds`), so a large .xlsx file is not read last.
+
+    Parameters:
+    ----------
+    file_paths (list[str]):
+        Paths to the data files.
+
+    max_workers (int | None):
+        Maximum number of reading threads; by default, one per file, up to 8.
+
+    Returns:
+    ----------
+    A tuple, in the order of the files:
+        - the DataFrames (list[pd.DataFrame])
+        - the reading errors (list[str]), empty strings for the files read
+    """
+    if max_workers is None:
+        max_workers = min(8, max(1, len(file_paths)))
+
+    order = sorted(
+        range(len(file_paths)), key=lambda idx: estimate_load_seconds(file_paths[idx]), reverse=True
+    )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {idx: executor.submit(read_data_file, file_paths[idx]) for idx in order}
+        results = [futures[idx].result() for idx in range(len(file_paths))]
+
+    return ([df for df, _ in results], [error for _, error in results])
+
+
+def read_data_sheets(
+    file_paths: list[str], sheet_names: list[str] | str | None = None
+) -> tuple[dict[str, pd.DataFrame], str]:
+    """
+    Read all or the selected sheets of one or many .xls/.xlsx files,
+    each workbook being parsed only once.
+    Other supported files (.csv, .npy) are read as a single sheet.
+
+    Each sheet is returned as a separate DataFrame, under a name that can be
+    used in the micro formulas terms (ex. `balanta!sc@401`): the sheet name without
+    whitespace, prefixed by the workbook file name and `.` when reading many files.
+
+    Parameters:
+    ----------
+    file_paths (list[str]):
+        Paths to the data files.
+
+    sheet_names (list[str] | str | None):
+        Names of the sheets to read; "*" or None to read all the sheets.
+
+    Returns:
+    ----------
+    A tuple:
+        - sheets (dict[str, pd.DataFrame]), in the order of files and sheets
+        - error (str)
+    """
+    sheets: dict[str, pd.DataFrame] = {}
+    error = ""
+
+    for file_path in file_paths:
+        file_stem, file_extension = os.path.splitext(os.path.basename(file_path))
+
+        if file_extension in (".xls", ".xlsx"):
+            try:
+                with pd.ExcelFile(
+                    file_path, engine="xlrd" if file_extension == ".xls" else "openpyxl"
+                ) as workbook:
+                    selected = [
+                        name
+                        for name in workbook.sheet_names
+                        if (sheet_names is None)
+                        or (sheet_names == "*")
+                        or (name in sheet_names)
+                    ]
+                    file_sheets = workbook.parse(sheet_name=selected)
+            except Exception:
+                error = (
+                    "Fișierul încărcat nu poate fi citit."
+                    " Exportați încă o dată datele din baza de date originală"
+                    " și încercați din nou să îl încărcați în sistem."
+                )
+                return ({}, error)
+
+        else:
+            df, error = read_data_file(file_path)
+            if len(error) > 0:
+                return ({}, error)
+            file_sheets = {file_stem: df}
+
+        for name, df in file_sheets.items():
+            sheet_key = "".join(str(name).split())
+            if len(file_paths) > 1 and file_extension in (".xls", ".xlsx"):
+                sheet_key = f"{file_stem}.{sheet_key}"
+            sheets[sheet_key] = df
+
+    if len(sheets) == 0:
+        error = "Foile de calcul selectate nu există în fișierele încărcate."
+
+    return (sheets, error)
+
+def read_data_buffer(
+    data: pd.DataFrame | bytes | bytearray | memoryview | IO[bytes],
+    file_extension: str = "",
+) -> tuple[pd.DataFrame, str]:
+    """
+    Read data already held in memory, without writing it to disk.
+
+    Parameters:
+    ----------
+    data (pd.DataFrame | bytes | bytearray | memoryview | binary file-like object):
+        A DataFrame is used as it is (shallow copy, the caller's frame is not modified).
+        `bytes` are wrapped without copying; other bytes-like objects are copied once.
+        File-like objects are passed directly to the pandas readers.
+
+    file_extension (str):
+        Extension of the original file (".csv", ".xls", ".xlsx"),
+        required for every input except a DataFrame.
+
+    Returns:
+    ----------
+    A tuple:
+        - df (pd.DataFrame)
+        - error (str)
+    """
+    if isinstance(data, pd.DataFrame):
+        return (data.copy(deep=False), "")
+
+    if isinstance(data, bytes):
+        # BytesIO shares the buffer of an immutable bytes object
+        source = io.BytesIO(data)
+    elif isinstance(data, (bytearray, memoryview)):
+        source = io.BytesIO(bytes(data))
+    else:
+        source = data
+
+    return _read_data_source(source, file_extension)
+
+
+def snapshot_file_path(snapshot_path: str) -> str:
+    """
+    Path of the .npy file of a snapshot: ".npy" is added if missing, as `np.save` does,
+    so the file and its metadata (see `_snapshot_meta_path`) are named from the same path.
+    """
+    return snapshot_path if snapshot_path.endswith(".npy") else f"{snapshot_path}.npy"
+
+
+def _snapshot_meta_path(snapshot_path: str) -> str:
+    return f"{snapshot_file_path(snapshot_path)}.json"
+
+
+def export_data_snapshot(
+    df: pd.DataFrame, account_col_name: str, snapshot_path: str
+) -> str:
+    """
+    Export the normalized trial balance as a binary snapshot that can be
+    memory-mapped by `read_data_snapshot`:
+    - `snapshot_path` (.npy): the float64 value columns, stored column-major
+    so that each column is contiguous in the mapped file,
+    - the .npy path + ".json": the format version, the account codes
+    (in canonical form, in rows order) and the names of the value columns.
+
+    The data is normalized as when it is loaded for the computations
+    (see `accountcodes.normalize_account_columns`, `numericvalues.normalize_value_columns`):
+    the amounts stored as text (ex. "1.234,56") are kept as numbers, and the few
+    texts of a column of amounts that are not amounts (ex. "n/a") become NaN.
+    Only the text columns that do not hold amounts (ex. the account names) are left out.
+
+    Parameters:
+    ----------
+    df (pd.DataFrame):
+        Data read from the original file; it is not modified.
+
+    account_col_name (str):
+        Name of the column containing the accounting codes.
+
+    snapshot_path (str):
+        Path of the .npy file to create; ".npy" is added if missing (see `snapshot_file_path`).
+
+    Returns:
+    ----------
+    error (str)
+    """
+    error = ""
+
+    if account_col_name not in df.columns.values.tolist():
+        error = (
+            f"Coloana `{account_col_name}`,"
+            f" necesară pentru calcule, nu există în fișierul încărcat sau are altă denumire."
+        )
+        return error
+
+    df = df.copy(deep=False)
+    acc.normalize_account_columns([df], [account_col_name])
+    converted_columns = set(
+        col_diagnostics["column"]
+        for col_diagnostics in nval.normalize_value_columns([df], [account_col_name])
+    )
+
+    value_columns = []
+    values = []
+
+    for col_name in df.columns.values.tolist():
+        if col_name == account_col_name:
+            continue
+
+        # Skip the text columns, ex. account descriptions
+        if (not pd.api.types.is_numeric_dtype(df[col_name])) and (col_name not in converted_columns):
+            continue
+
+        value_columns.append(str(col_name))
+        values.append(pd.to_numeric(df[col_name], errors="coerce").to_numpy(dtype="float64"))
+
+    meta = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "account_col_name": account_col_name,
+        "account_codes": df[account_col_name].tolist(),
+        "value_columns": value_columns,
+    }
+
+    try:
+        matrix = np.empty((len(df), len(value_columns)), dtype="float64", order="F")
+        for col_idx, col_values in enumerate(values):
+            matrix[:, col_idx] = col_values
+
+        np.save(snapshot_file_path(snapshot_path), matrix, allow_pickle=False)
+
+        with open(_snapshot_meta_path(snapshot_path), "w", encoding="utf-8") as file:
+            json.dump(meta, file, ensure_ascii=False)
+    except Exception:
+        error = "Instantaneul datelor nu a putut fi salvat pe server."
+
+    return error
+
+
+def read_data_snapshot(snapshot_path: str) -> tuple[pd.DataFrame, str]:
+    """
+    Open a snapshot created by `export_data_snapshot`.
+
+    The value columns are memory-mapped read-only and used by the DataFrame
+    without copying, so the load time does not depend on the file size and
+    several processes opening the same snapshot share the same physical pages.
+
+    Parameters:
+    ----------
+    snapshot_path (str):
+        Path to the .npy file, as given to `export_data_snapshot`.
+
+    Returns:
+    ----------
+    A tuple:
+        - df (pd.DataFrame)
+        - error (str)
+    """
+    df = pd.DataFrame()
+    error = ""
+
+    try:
+        with open(_snapshot_meta_path(snapshot_path), "r", encoding="utf-8") as file:
+            meta = json.load(file)
+
+        if meta.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError
+
+        matrix = np.load(snapshot_file_path(snapshot_path), mmap_mode="r", allow_pickle=False)
+
+        if matrix.shape != (len(meta["account_codes"]), len(meta["value_columns"])):
+            raise ValueError
+
+        df = pd.DataFrame(matrix, columns=meta["value_columns"], copy=False)
+        df.insert(
+            0,
+            meta["account_col_name"],
+            pd.Series(meta["account_codes"], dtype="object"),
         )
+    except Exception:
+        df = pd.DataFrame()
+        error = (
+            "Instantaneul datelor nu poate fi citit."
+            " Exportați încă o dată datele din fișierul original."
+        )
+
     return (df, error)
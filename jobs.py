@@ -0,0 +1,200 @@
+import asyncio
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import computation as cmp
+
+# Job statuses
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+# Marks the end of the records stream of a job
+_END_OF_STREAM = None
+
+
+class JobRunner:
+    """
+    Asyncio job runner around `computation.iter_computed_fields`.
+
+    Reading the data files and computing the fields run in a thread pool,
+    off the event loop, so many uploads can be processed concurrently
+    while the event loop keeps answering status, streaming and cancel requests.
+    The results are available per field id as soon as each field is computed.
+    """
+
+    def __init__(self, max_workers: int | None = None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._jobs: dict[int, dict] = {}
+        self._ids = itertools.count(1)
+
+    def submit(
+        self,
+        field_names_path: str,
+        data_file_path: str | list[str],
+        sheet_names: list[str] | str | None = None,
+        compact: str | None = None,
+    ) -> int:
+        """
+        Schedule a new job. Must be called from a running event loop.
+
+        With `compact` (`float64` or `float32`), the data of the job is kept
+        in memory-lean form (see `computation.iter_template_results`)
+        and its memory footprint is reported by `status`.
+
+        Returns:
+        ----------
+        The job id (int).
+        """
+        loop = asyncio.get_running_loop()
+        job_id = next(self._ids)
+
+        job = {
+            "id": job_id,
+            "status": PENDING,
+            "records": [],
+            "global_error": None,
+            "cancel_event": threading.Event(),
+            "queue": asyncio.Queue(),
+            "future": None,
+            "profile": {},
+        }
+        self._jobs[job_id] = job
+
+        job["future"] = loop.run_in_executor(
+            self._executor,
+            self._run_job,
+            loop,
+            job,
+            field_names_path,
+            data_file_path,
+            sheet_names,
+            compact,
+        )
+
+        return job_id
+
+    def _run_job(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        job: dict,
+        field_names_path: str,
+        data_file_path: str | list[str],
+        sheet_names: list[str] | str | None,
+        compact: str | None,
+    ):
+        """
+        Runs in a worker thread: computes the fields one by one and publishes
+        each record to the job, stopping early when the job is cancelled.
+        """
+        if job["cancel_event"].is_set():
+            job["status"] = CANCELLED
+            loop.call_soon_threadsafe(job["queue"].put_nowait, _END_OF_STREAM)
+            return
+
+        job["status"] = RUNNING
+
+        try:
+            for record in cmp.iter_computed_fields(
+                field_names_path,
+                data_file_path,
+                sheet_names,
+                profile=job["profile"],
+                compact=compact,
+            ):
+                if job["cancel_event"].is_set():
+                    job["status"] = CANCELLED
+                    break
+
+                if "global_error" in record:
+                    job["global_error"] = record["global_error"]
+                else:
+                    job["records"].append(record)
+
+                loop.call_soon_threadsafe(job["queue"].put_nowait, record)
+
+            else:
+                job["status"] = FAILED if job["global_error"] is not None else DONE
+
+        except Exception:
+            job["status"] = FAILED
+            job["global_error"] = "A apărut o eroare în funcționarea serverului."
+
+        finally:
+            loop.call_soon_threadsafe(job["queue"].put_nowait, _END_OF_STREAM)
+
+    def status(self, job_id: int) -> dict:
+        """
+        Returns the job status, the number of fields computed so far
+        and the memory footprint of the data files (with `compact`, see `submit`).
+        """
+        job = self._jobs[job_id]
+
+        return {
+            "id": job_id,
+            "status": job["status"],
+            "computed_fields": len(job["records"]),
+            "global_error": job["global_error"],
+            "memory": job["profile"].get("memory", []),
+        }
+
+    def partial_results(self, job_id: int) -> dict:
+        """
+        Returns the records computed so far, by field id.
+        """
+        return {record["id"]: record for record in list(self._jobs[job_id]["records"])}
+
+    async def stream(self, job_id: int):
+        """
+        Async generator yielding each record of the job as soon as it is computed.
+        Should have a single consumer per job.
+        """
+        queue = self._jobs[job_id]["queue"]
+
+        while True:
+            record = await queue.get()
+            if record is _END_OF_STREAM:
+                return
+            yield record
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Ask the job to stop; the field being computed is finished first.
+
+        Returns:
+        ----------
+        False if the job had already ended, otherwise True.
+        """
+        job = self._jobs[job_id]
+
+        if job["status"] in (DONE, CANCELLED, FAILED):
+            return False
+
+        job["cancel_event"].set()
+        return True
+
+    async def wait(self, job_id: int) -> list[dict]:
+        """
+        Wait for the job to end and return the results list,
+        in the same format as `computation.compute_fields`.
+        """
+        job = self._jobs[job_id]
+        await job["future"]
+
+        if job["global_error"] is not None:
+            return [{"global_error": job["global_error"]}]
+
+        return list(job["records"])
+
+    def forget(self, job_id: int):
+        """
+        Drop an ended job and its results from memory.
+        """
+        del self._jobs[job_id]
+
+    def shutdown(self, wait: bool = True):
+        for job in self._jobs.values():
+            job["cancel_event"].set()
+        self._executor.shutdown(wait=wait)
@@ -2,6 +2,9 @@ import os
 import sys
 import json
 import computation as cmp
+import outputs as out
+import dbsink
+import errorcodes as errcd
 
 
 if __name__ == "__main__":
@@ -13,16 +16,96 @@ if __name__ == "__main__":
             (
                 "Ai uitat sa adaugi in linia de comanda"
                 " fisierul JSON ce contine numele campurilor/indicatorilor ca argv[1]"
-                " si fisierul csv/xls/xlsx cu datele de analizat ca argv[2]."
+                " si fisierul csv/xls/xlsx (sau instantaneul npy) cu datele de analizat ca argv[2]."
             )
         )
 
         sys.exit(1)
 
-    rfc_fields = cmp.compute_fields(field_names_path, data_file_path)
+    # Optional output format as argv[3]: json (default), json-stream, jsonl or sqlite
+    output_format = sys.argv[3] if len(sys.argv) > 3 else out.JSON_FORMAT
+
+    if output_format not in out.OUTPUT_FORMATS:
+        print(
+            (
+                f"Formatul de iesire `{output_format}` nu este recunoscut."
+                f" Formatele acceptate ca argv[3] sunt: {', '.join(out.OUTPUT_FORMATS)}."
+            )
+        )
+
+        sys.exit(1)
+
+    # Optional errors format as argv[4]: text (default) or code, the records
+    # `{"code", "params"}` of the errors, shorter than their texts
+    error_format = sys.argv[4] if len(sys.argv) > 4 else errcd.TEXT_ERRORS
+
+    if error_format not in errcd.ERROR_FORMATS:
+        print(
+            (
+                f"Formatul erorilor `{error_format}` nu este recunoscut."
+                f" Formatele acceptate ca argv[4] sunt: {', '.join(errcd.ERROR_FORMATS)}."
+            )
+        )
+
+        sys.exit(1)
+
+    # The sqlite output always stores the texts of the errors (see `dbsink.ResultSink`)
+    if (output_format == out.SQLITE_FORMAT) and (error_format != errcd.TEXT_ERRORS):
+        print(
+            (
+                f"Formatul erorilor `{error_format}` nu poate fi folosit cu formatul de iesire"
+                f" `{out.SQLITE_FORMAT}`, care salveaza textele erorilor."
+                f" Folositi formatul `{errcd.TEXT_ERRORS}` sau alt format de iesire."
+            )
+        )
+
+        sys.exit(1)
 
     jsn_out_name, jsn_out_extension = os.path.splitext(field_names_path)
+
+    if output_format == out.JSONL_FORMAT:
+        jsn_out_extension = ".jsonl"
+    elif output_format == out.SQLITE_FORMAT:
+        jsn_out_extension = ".sqlite"
+
     jsn_out_path = "".join([jsn_out_name, "_output", jsn_out_extension])
 
-    with open(jsn_out_path, "w", encoding="utf-8") as j_file:
-        json.dump(obj=rfc_fields, fp=j_file, skipkeys=True, ensure_ascii=False)
+    if output_format == out.SQLITE_FORMAT:
+        # The results of each data file are kept under its name, in the `rfc_results` table
+        _, global_error = dbsink.ResultSink(jsn_out_path).write(
+            cmp.iter_computed_fields(field_names_path, data_file_path),
+            os.path.basename(data_file_path),
+        )
+
+        if global_error is not None:
+            print(global_error)
+            sys.exit(1)
+
+    elif output_format == out.JSON_FORMAT:
+        rfc_fields = cmp.compute_fields(
+            field_names_path, data_file_path, error_format=error_format
+        )
+
+        # With the error codes, the distinct errors are written once, in a table
+        # referenced by the results (see `outputs.error_table_output`)
+        if error_format == errcd.CODE_ERRORS:
+            rfc_fields = out.error_table_output(rfc_fields)
+
+        with open(jsn_out_path, "w", encoding="utf-8") as j_file:
+            json.dump(obj=out.nan_to_none(rfc_fields), fp=j_file, skipkeys=True, ensure_ascii=False)
+
+    else:
+        # The records are written as they are computed: a global error found after
+        # some results is the last record, after the partial results (the json output
+        # and the sqlite output keep only the global error)
+        # (with the error codes, each distinct error is a record written before
+        # the first result referencing it, see `outputs.iter_error_references`)
+        records = cmp.iter_computed_fields(
+            field_names_path, data_file_path, error_format=error_format
+        )
+
+        if error_format == errcd.CODE_ERRORS:
+            records = out.iter_error_references(records)
+
+        with open(jsn_out_path, "w", encoding="utf-8") as j_file:
+            out.write_results_stream(records, j_file, output_format)
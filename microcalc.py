@@ -1,6 +1,10 @@
+from decimal import Decimal
 from typing import Callable, Optional
-import pyparsing as pp
 import pandas as pd
+import formulaparser as fp
+import accountcodes as acc
+import errorcodes as errcd
+import numericvalues as nval
 
 
 class NeighbourOpsError(Exception):
@@ -22,7 +26,13 @@ def parse_field(src: str, suplimentary_chars: str):
     """
     Parse the string with input formula and returns
     a nested list of lists with terms and operations.
+
+    Reference pyparsing grammar of the micro formulas; the computations use
+    `formulaparser.parse_formula`, which accepts the same language and
+    returns the same result, without the pyparsing import and grammar build cost.
     """
+    import pyparsing as pp
+
     pp.ParserElement.enable_packrat()
 
     base_expr = pp.Word(pp.alphanums, pp.alphanums + suplimentary_chars)
@@ -55,56 +65,92 @@ def parse_field(src: str, suplimentary_chars: str):
 # ========= Values retriever from dataframe
 
 
+def find_code_rows(
+    df: pd.DataFrame,
+    account_col_name: str,
+    accounting_code: str,
+    code_index: pd.Index | None = None,
+):
+    """
+    Returns the positions of the rows with the accounting code, found in O(1)
+    in the index of the account column (see `accountcodes.build_code_index`),
+    or by scanning the column if no index is given.
+    """
+    if code_index is not None:
+        return acc.code_positions(code_index, accounting_code)
+
+    return (df[account_col_name] == accounting_code).to_numpy().nonzero()[0]
+
+
+
 def query_strict(
     df: pd.DataFrame,
     account_col_name: str,
     value_col_name: str,
     accounting_code: str,
     term: str,
-) -> tuple[float | None, str | None]:
+    code_index: pd.Index | None = None,
+    rollups: dict | None = None,
+) -> tuple[float | None, errcd.FieldError | None]:
     val = None
     error = None
     # ===== DATAFRAME input
-    if not accounting_code in df[account_col_name].tolist():
-        error = (
-            f"Codul contabil `{accounting_code}`,"
-            f" din expresia introdusă la setări, nu există în fișierul încărcat sau are altă denumire."
-        )
+    positions = find_code_rows(df, account_col_name, accounting_code, code_index)
+
+    # A code without a row of its own, but with rows of its analytic
+    # (or lower synthetic) accounts, gets their total
+    rollup_label = (
+        acc.get_rollup_index(rollups, df, account_col_name)["codes"].get(accounting_code)
+        if len(positions) == 0
+        else None
+    )
+
+    if (len(positions) == 0) and (rollup_label is None):
+        error = errcd.FieldError("code_missing", code=accounting_code)
         return (val, error)
 
     if not value_col_name in df.columns.values.tolist():
-        error = (
-            f"Coloana `{value_col_name}`,"
-            f" din expresia introdusă la setări, nu există în fișierul încărcat sau are altă denumire."
+        error = errcd.FieldError("term_column_missing", column=value_col_name)
+        return (val, error)
+
+    if rollup_label is not None:
+        totals, has_missing, has_text = acc.get_rollup_totals(
+            rollups, df, account_col_name, value_col_name
         )
+
+        if has_missing[rollup_label]:
+            error = errcd.FieldError(
+                "rollup_values_missing", code=accounting_code, term=term, column=value_col_name
+            )
+        elif has_text[rollup_label]:
+            error = errcd.FieldError(
+                "rollup_values_not_numeric", code=accounting_code, term=term, column=value_col_name
+            )
+        else:
+            val = float(totals[rollup_label])
+
         return (val, error)
 
     try:
-        val = df.loc[df[account_col_name] == accounting_code, value_col_name].item()
+        val = nval.read_cells(df[value_col_name].iloc[positions]).item()
 
     except Exception:
-        error = (
-            f"A apărut o eroare la citirea valorii corespunzătoare termenului `{term}` din setările firmei,"
-            f" respectiv coloanei `{value_col_name}` și contului contabil `{accounting_code}`"
-            f" din fișierul încărcat."
+        error = errcd.FieldError(
+            "term_read_failed", term=term, column=value_col_name, code=accounting_code
         )
     else:
         try:
             # Check if the value is missing (i.e, is NaN in pandas, or nan in numpy - which is float)
             if pd.isna(val):
                 val = None
-                error = (
-                    f"Valoarea corespunzătoare termenului `{term}` din setările firmei, respectiv"
-                    f" coloanei `{value_col_name}` și contului contabil `{accounting_code}`"
-                    f" lipsește din fișierul încărcat sau nu poate fi transformată în valoare numerică."
+                error = errcd.FieldError(
+                    "term_value_missing", term=term, column=value_col_name, code=accounting_code
                 )
             else:
                 val = float(val)
         except Exception:
-            error = (
-                f"Valoarea corespunzătoare termenului `{term}` din setările firmei, respectiv"
-                f" coloanei `{value_col_name}` și contului contabil `{accounting_code}`"
-                f" nu poate fi transformată în valoare numerică."
+            error = errcd.FieldError(
+                "term_value_not_numeric", term=term, column=value_col_name, code=accounting_code
             )
 
     return (val, error)
@@ -116,21 +162,42 @@ def query_flexi(
     value_col_name: str,
     accounting_code: str,
     term: str,
-) -> tuple[float, str | None]:
+    code_index: pd.Index | None = None,
+    rollups: dict | None = None,
+) -> tuple[float, errcd.FieldError | None]:
     val = 0.0
     error = None
     # ===== DATAFRAME input
-    if (value_col_name in df.columns.values.tolist()) and (
-        accounting_code in df[account_col_name].tolist()
-    ):
+    positions = find_code_rows(df, account_col_name, accounting_code, code_index)
+
+    # A code without a row of its own gets the total of its analytic
+    # (or lower synthetic) accounts, the missing values counting as 0.0
+    if (len(positions) == 0) and (value_col_name in df.columns.values.tolist()):
+        rollup_label = acc.get_rollup_index(rollups, df, account_col_name)["codes"].get(
+            accounting_code
+        )
+
+        if rollup_label is not None:
+            totals, _, has_text = acc.get_rollup_totals(
+                rollups, df, account_col_name, value_col_name
+            )
+
+            if has_text[rollup_label]:
+                error = errcd.FieldError(
+                    "rollup_values_not_numeric", code=accounting_code, term=term, column=value_col_name
+                )
+            else:
+                val = float(totals[rollup_label])
+
+            return (val, error)
+
+    if (value_col_name in df.columns.values.tolist()) and (len(positions) > 0):
         try:
-            val = df.loc[df[account_col_name] == accounting_code, value_col_name].item()
+            val = nval.read_cells(df[value_col_name].iloc[positions]).item()
 
         except Exception:
-            error = (
-                f"A apărut o eroare la citirea valorii corespunzătoare termenului `{term}` din setările firmei,"
-                f" respectiv coloanei `{value_col_name}` și contului contabil `{accounting_code}`"
-                f" din fișierul încărcat."
+            error = errcd.FieldError(
+                "term_read_failed", term=term, column=value_col_name, code=accounting_code
             )
         else:
             try:
@@ -138,53 +205,138 @@ def query_flexi(
                 if pd.isna(val):
                     val = 0.0
             except Exception:
-                error = (
-                    f"Valoarea corespunzătoare termenului `{term}` din setările firmei, respectiv"
-                    f" coloanei `{value_col_name}` și contului contabil `{accounting_code}`"
-                    f" nu poate fi transformată în valoare numerică."
+                error = errcd.FieldError(
+                    "term_value_not_numeric", term=term, column=value_col_name, code=accounting_code
                 )
 
     return (val, error)
 
 
+def new_term_memo() -> dict:
+    """
+    Returns an empty memo of the terms values, to share between the formulas
+    computed from the same data (ex. all the fields of a request),
+    so each term is looked up in the DataFrame only once.
+    The memo also keeps the indexes of the account columns
+    and their rollups (see `accountcodes.build_rollup_index`).
+    """
+    return {"values": {}, "hits": 0, "misses": 0, "code_indexes": {}, "rollups": {}}
+
+
 def get_val_from_df(
     term: str,
     term_sep: str,
     df: pd.DataFrame,
     account_col_name: str,
     strict_data_query: bool,
-) -> tuple[float | None, str | None]:
+    sheets: dict[str, pd.DataFrame] | None = None,
+    sheet_sep: str = "!",
+    term_memo: dict | None = None,
+) -> tuple[float | None, errcd.FieldError | None]:
+    """
+    Same as `query_term`, but the value and error of each term
+    are read from the memo (see `new_term_memo`), if given.
+    """
+    if term_memo is None:
+        return query_term(
+            term, term_sep, df, account_col_name, strict_data_query, sheets, sheet_sep
+        )
+
+    code_indexes = term_memo["code_indexes"]
+
+    memo_key = (term, account_col_name, strict_data_query)
+    memo_values = term_memo["values"]
+
+    if memo_key in memo_values:
+        term_memo["hits"] += 1
+        return memo_values[memo_key]
+
+    term_memo["misses"] += 1
+    memo_values[memo_key] = query_term(
+        term,
+        term_sep,
+        df,
+        account_col_name,
+        strict_data_query,
+        sheets,
+        sheet_sep,
+        code_indexes,
+        term_memo["rollups"],
+    )
+
+    return memo_values[memo_key]
+
+
+def query_term(
+    term: str,
+    term_sep: str,
+    df: pd.DataFrame,
+    account_col_name: str,
+    strict_data_query: bool,
+    sheets: dict[str, pd.DataFrame] | None = None,
+    sheet_sep: str = "!",
+    code_indexes: dict | None = None,
+    rollups: dict | None = None,
+) -> tuple[float | None, errcd.FieldError | None]:
     """
     Parse a string label, split in 2 segments:
     - first segment is the column name in df where the value resides,
     - second segment is the string value found in `account_col_name` column
     and get the value from dataframe found where column name meets the row
     where the second segment is found.
+
+    A label prefixed by a sheet name and the sheet separator, ex. `balanta!sc@401`,
+    is searched in the coresp. DataFrame from `sheets` instead of `df`.
+
+    The rows of the accounting codes are found in the indexes of the account
+    columns kept in `code_indexes` (see `accountcodes.get_code_index`), if given.
+
+    An accounting code without a row of its own, ex. `401` when the data has only
+    `401.01` and `401.02`, gets the total of the rows under it in the account tree,
+    from the rollups kept in `rollups` (see `accountcodes.get_rollup_totals`), if given.
     """
     val = None
     error = None
 
+    if sheet_sep in term:
+        sheet_name, term_in_sheet = term.split(sheet_sep, 1)
+
+        if (sheets is None) or (sheet_name not in sheets):
+            error = errcd.FieldError("sheet_missing", sheet=sheet_name, term=term)
+            return (val, error)
+
+        df = sheets[sheet_name]
+
+        if account_col_name not in df.columns.values.tolist():
+            error = errcd.FieldError(
+                "sheet_account_column_missing", column=account_col_name, sheet=sheet_name
+            )
+            return (val, error)
+
+        term = term_in_sheet
+
     try:
         term_segments = term.split(term_sep, 1)
         value_col_name = term_segments[0]
         accounting_code = term_segments[1]
     except Exception:
-        error = (
-            f"Operatorul de legătură `{term_sep}` nu apare în interiorul"
-            f" termenului `{term}` introdus la setări."
-            f" Operatorul este necesar pentru a identifica în fișierul cu date"
-            f" corespondența dintre coloana cu valori numerice și denumirea contului contabil."
-        )
+        error = errcd.FieldError("term_separator_missing", separator=term_sep, term=term)
         return (val, error)
 
+    code_index = (
+        acc.get_code_index(code_indexes, df, account_col_name)
+        if code_indexes is not None
+        else None
+    )
+
     # Get data from df
     if strict_data_query:
         val, error = query_strict(
-            df, account_col_name, value_col_name, accounting_code, term
+            df, account_col_name, value_col_name, accounting_code, term, code_index, rollups
         )
     else:
         val, error = query_flexi(
-            df, account_col_name, value_col_name, accounting_code, term
+            df, account_col_name, value_col_name, accounting_code, term, code_index, rollups
         )
 
     return (val, error)
@@ -209,6 +361,63 @@ def div(a: float, b: float):
     return round(a / b, 2)
 
 
+# Exact arithm: full float64 precision, the result is rounded once at the end
+
+
+def add_exact(a: float, b: float):
+    return a + b
+
+
+def subtr_exact(a: float, b: float):
+    return a - b
+
+
+def mult_exact(a: float, b: float):
+    return a * b
+
+
+def div_exact(a: float, b: float):
+    return a / b
+
+
+# Comparisons: 1.0 if true, 0.0 if false; only numbers can be compared
+
+
+def _check_numbers(a, b):
+    if isinstance(a, str) or isinstance(b, str):
+        raise TypeError("Only numbers can be compared")
+
+
+def lt(a: float, b: float):
+    _check_numbers(a, b)
+    return 1.0 if a < b else 0.0
+
+
+def gt(a: float, b: float):
+    _check_numbers(a, b)
+    return 1.0 if a > b else 0.0
+
+
+def le(a: float, b: float):
+    _check_numbers(a, b)
+    return 1.0 if a <= b else 0.0
+
+
+def ge(a: float, b: float):
+    _check_numbers(a, b)
+    return 1.0 if a >= b else 0.0
+
+
+def eq(a: float, b: float):
+    _check_numbers(a, b)
+    return 1.0 if a == b else 0.0
+
+
+def ne(a: float, b: float):
+    _check_numbers(a, b)
+    return 1.0 if a != b else 0.0
+
+
 def unary_minus(x: float):
     if x == 0.0:
         return x
@@ -249,178 +458,249 @@ def compute_arithm(
     df: pd.DataFrame,
     account_col_name: str,
     strict_data_query: bool,
+    sheets: dict[str, pd.DataFrame] | None = None,
+    sheet_sep: str = "!",
+    term_memo: dict | None = None,
 ):
     """
     Traverse the parser result and compute the arithmetic expressions.
+
+    The traversal does not recurse: each sub-list or function call in progress
+    is a step generator (see `arithm_steps`) kept on an explicit stack,
+    so the depth of the formula is limited only by the memory,
+    not by the recursion limit of python.
+    """
+    errors: list[errcd.FieldError] = []
+
+    def compute_term(term: str):
+        if term.replace(".", "", 1).isdigit():
+            return float(term)
+
+        value, data_error = get_val_from_df(
+            term,
+            label_sep,
+            df,
+            account_col_name,
+            strict_data_query,
+            sheets,
+            sheet_sep,
+            term_memo,
+        )
+
+        if data_error is not None:
+            errors.append(data_error)
+
+        return value
+
+    stack = [node_steps(ls, operators, compute_term)]
+    value = None
+
+    while True:
+        try:
+            # resume the innermost node with the value of its last sub-node
+            sub_node = stack[-1].send(value)
+        except StopIteration as stop:
+            stack.pop()
+            value = stop.value
+
+            if len(stack) == 0:
+                return (value, errors)
+
+            continue
+
+        stack.append(node_steps(sub_node, operators, compute_term))
+        value = None
+
+
+def node_steps(
+    node: list | dict,
+    operators: dict[str, Callable[..., float]],
+    compute_term: Callable[[str], float | None],
+):
+    """
+    Returns the step generator computing a node of the parser result.
+    """
+    if isinstance(node, dict):
+        return function_steps(node, operators, compute_term)
+
+    return arithm_steps(node, operators, compute_term)
+
+
+def arithm_steps(
+    ls: list[str | list],
+    operators: dict[str, Callable[..., float]],
+    compute_term: Callable[[str], float | None],
+):
+    """
+    Step generator computing a list of the parser result: it yields each
+    sub-list or function call to compute (see `compute_arithm`) and receives its
+    value; the terms are computed directly by `compute_term`.
+    The generator returns the result of the list (None if a value is missing).
     """
     result: Optional[float] = None
-    errors: list[str] = []
 
     ls_len = len(ls)
 
     if ls_len == 0:
-        return (result, errors)
+        return result
 
     if ls_len == 1:
         elem = ls[0]
 
-        if isinstance(elem, list):
-            result, next_errors = compute_arithm(
-                elem, label_sep, operators, df, account_col_name, strict_data_query
-            )
-
-            if len(next_errors) > 0:
-                errors.extend(next_errors)
-
-            return (result, errors)
+        if isinstance(elem, (list, dict)):
+            return (yield elem)
 
-        else:
-            if elem.replace(".", "", 1).isdigit():
-                result = float(elem)
-            else:
-                result, data_error = get_val_from_df(
-                    elem, label_sep, df, account_col_name, strict_data_query
-                )
-
-                if data_error is not None:
-                    errors.append(data_error)
-
-            return (result, errors)
+        return compute_term(elem)
 
     if ls_len == 2:
         # first element in list of len=2 must be a unary operator
         first_elem = ls[0]
         second_elem = ls[1]
 
-        if isinstance(first_elem, list) or (first_elem not in UNARY_MAP):
+        if isinstance(first_elem, (list, dict)) or (first_elem not in UNARY_MAP):
             raise NotUnaryOpError
 
+        unary_func = UNARY_MAP[first_elem]
+
+        if isinstance(second_elem, (list, dict)):
+            result = yield second_elem
+        elif second_elem in operators:
+            raise NeighbourOpsError
         else:
-            unary_func = UNARY_MAP[first_elem]
-
-            if isinstance(second_elem, list):
-                result, next_errors = compute_arithm(
-                    second_elem,
-                    label_sep,
-                    operators,
-                    df,
-                    account_col_name,
-                    strict_data_query,
-                )
+            result = compute_term(second_elem)
 
-                if result is not None:
-                    result = unary_func(result)
+        if result is not None:
+            result = unary_func(result)
+
+        return result
+
+    for idx, item in enumerate(ls):
+        # The operands (terms and sub-lists) are computed once, as neighbours of the operators
+        if isinstance(item, (list, dict)) or (item not in operators):
+            continue
 
-                if len(next_errors) > 0:
-                    errors.extend(next_errors)
+        # ==== left hand argument handling
+        # accumulation of previous computations as lh
 
+        if result is not None:
+            lh = result
+
+        else:
+            lh = get_lh_item(ls, idx)
+
+            if isinstance(lh, (list, dict)):
+                lh = yield lh
+            elif lh is None:
+                raise ArgumentOpsError
+            elif lh in operators:
+                raise NeighbourOpsError
             else:
-                if second_elem in operators:
-                    raise NeighbourOpsError
-                elif second_elem.replace(".", "", 1).isdigit():
-                    result = unary_func(float(second_elem))
-                else:
-                    result, data_error = get_val_from_df(
-                        second_elem, label_sep, df, account_col_name, strict_data_query
-                    )
+                lh = compute_term(lh)
 
-                    if result is not None:
-                        result = unary_func(result)
+        # ==== right hand argument handling
 
-                    if data_error is not None:
-                        errors.append(data_error)
+        rh = get_rh_item(ls, idx)
 
-            return (result, errors)
+        if isinstance(rh, (list, dict)):
+            rh = yield rh
+        elif rh is None:
+            raise ArgumentOpsError
+        elif rh in operators:
+            raise NeighbourOpsError
+        else:
+            rh = compute_term(rh)
 
-    for idx, item in enumerate(ls):
-        if isinstance(item, list):
-            compute_arithm(
-                item, label_sep, operators, df, account_col_name, strict_data_query
-            )
+        # call the function associated with the current arithmetic operator/item
 
+        if lh is not None and rh is not None:
+            arithm_operation = operators[item]
+            result = arithm_operation(lh, rh)
         else:
-            if item not in operators:
-                continue
+            return None
 
-            # ==== left hand argument handling
-            # accumulation of previous computations as lh
+    return result
 
-            if result is not None:
-                lh = result
 
-            else:
-                lh = get_lh_item(ls, idx)
-
-                if isinstance(lh, list):
-                    lh, next_errors = compute_arithm(
-                        lh,
-                        label_sep,
-                        operators,
-                        df,
-                        account_col_name,
-                        strict_data_query,
-                    )
-
-                    if len(next_errors) > 0:
-                        errors.extend(next_errors)
-
-                else:
-                    if lh is None:
-                        raise ArgumentOpsError
-                    elif lh in operators:
-                        raise NeighbourOpsError
-                    elif lh.replace(".", "", 1).isdigit():
-                        lh = float(lh)
-                    else:
-                        lh, data_error = get_val_from_df(
-                            lh, label_sep, df, account_col_name, strict_data_query
-                        )
-
-                        if data_error is not None:
-                            errors.append(data_error)
-
-            # ==== right hand argument handling
-
-            rh = get_rh_item(ls, idx)
-
-            if isinstance(rh, list):
-                rh, next_errors = compute_arithm(
-                    rh, label_sep, operators, df, account_col_name, strict_data_query
-                )
+def function_steps(
+    fn_node: dict,
+    operators: dict[str, Callable[..., float]],
+    compute_term: Callable[[str], float | None],
+):
+    """
+    Step generator computing a function call of the parser result,
+    ex. {"fn": "max", "args": [...]}, as `arithm_steps` does for the lists.
 
-                if len(next_errors) > 0:
-                    errors.extend(next_errors)
+    The arguments are computed from left to right and the computation stops
+    at the first argument without a value, as for the arithmetic operations.
+    For `if(cond, a, b)` only the argument selected by the condition is computed,
+    so the data of the other one is not required.
+    """
+    args = fn_node["args"]
+    fn_name = fn_node["fn"]
 
-            else:
-                if rh is None:
-                    raise ArgumentOpsError
-                elif rh in operators:
-                    raise NeighbourOpsError
-                elif rh.replace(".", "", 1).isdigit():
-                    rh = float(rh)
-                else:
-                    rh, data_error = get_val_from_df(
-                        rh, label_sep, df, account_col_name, strict_data_query
-                    )
-
-                    if data_error is not None:
-                        errors.append(data_error)
-
-            # call the function associated with the current arithmetic operator/item
-
-            if lh is not None and rh is not None:
-                arithm_operation = operators[item]
-                result = arithm_operation(lh, rh)
-            else:
-                result = None
-                return (result, errors)
+    if fn_name == "if":
+        condition = (
+            (yield args[0]) if isinstance(args[0], (list, dict)) else compute_term(args[0])
+        )
+
+        if condition is None:
+            return None
+
+        if isinstance(condition, str):
+            raise TypeError("The condition must be a number")
+
+        selected = args[1] if condition != 0 else args[2]
+
+        return (yield selected) if isinstance(selected, (list, dict)) else compute_term(selected)
 
-    return (result, errors)
+    values = []
+
+    for arg in args:
+        value = (yield arg) if isinstance(arg, (list, dict)) else compute_term(arg)
+
+        if value is None:
+            return None
+
+        if isinstance(value, str):
+            raise TypeError("The arguments must be numbers")
+
+        values.append(value)
+
+    return FUNCTIONS_MAP[fn_name](values)
 
 
 # ========= Micro-calc integrator
 
 
+def compile_micro_formula(
+    micro_formula: str,
+    label_fields_sep: str,
+    sumplimentary_chars: str,
+    sheet_sep: str = "!",
+) -> tuple[list | None, errcd.FieldError | None]:
+    """
+    Parse the micro formula, without reading any data.
+
+    Returns:
+    ----------
+    A tuple with the parser result (a nested list, JSON serializable) or None,
+    and an error as None or `errorcodes.FieldError`.
+    """
+    program = None
+    error = None
+
+    accepted_suplim_chars = f"{label_fields_sep}{sumplimentary_chars}{sheet_sep}"
+
+    try:
+        program = fp.parse_formula(micro_formula, accepted_suplim_chars)
+    except fp.FormulaParseError as pe:
+        error = errcd.FieldError("formula_syntax", details=str(pe))
+    except Exception:
+        error = errcd.FieldError("formula_invalid")
+
+    return (program, error)
+
+
 def compute_micro(
     df: pd.DataFrame,
     account_col_name: str,
@@ -428,111 +708,168 @@ def compute_micro(
     label_fields_sep: str,
     sumplimentary_chars: str,
     strict_data_query: bool,
+    exact_arithm: bool = False,
+    sheets: dict[str, pd.DataFrame] | None = None,
+    sheet_sep: str = "!",
 ):
     """
     Returns a tuple with the result of computation as float or None,
-    and an error as None or string.
+    and an error as None or `errorcodes.FieldError`.
+
+    If `exact_arithm` is True, the formula is computed in full float64 precision
+    and only the final result is rounded to 2 decimals, instead of rounding
+    the result of each arithmetic operation.
+
+    If `sheets` is given, the formula terms can be prefixed by a sheet name
+    and `sheet_sep` (ex. `balanta!sc@401`) to get the values from that sheet.
     """
-    result = None
-    error = None
+    operations_nested, error = compile_micro_formula(
+        micro_formula, label_fields_sep, sumplimentary_chars, sheet_sep
+    )
 
-    accepted_suplim_chars = f"{label_fields_sep}{sumplimentary_chars}"
+    if error is not None:
+        return (None, error)
+
+    return compute_micro_program(
+        df,
+        account_col_name,
+        operations_nested,
+        label_fields_sep,
+        strict_data_query,
+        exact_arithm,
+        sheets,
+        sheet_sep,
+    )
 
-    try:
-        operations_nested = parse_field(micro_formula, accepted_suplim_chars)
-    except pp.ParseException as pe:
-        error = (
-            f"Expresia introdusă în câmpul micro-calculator de la setări nu este conformă cu regulile"
-            f" de construire a formulelor de calcul."
-            f" Verificați dacă formula introdusă respectă regulile precizate."
-            f" Detalii returnate de sistem: `{pe}`"
-        )
-        return (result, error)
-    except Exception:
-        error = (
-            "Expresia introdusă în câmpul micro-calculator de la setări nu este conformă cu regulile"
-            " de construire a formulelor de calcul."
-            " Verificați dacă formula introdusă respectă regulile precizate."
-        )
-        return (result, error)
+
+def computation_error(exception: Exception) -> errcd.FieldError:
+    """
+    Returns the error (see `errorcodes.FieldError`) for an exception raised
+    while computing a micro formula.
+    """
+    if isinstance(exception, RecursionError):
+        return errcd.FieldError("formula_too_deep")
+    if isinstance(exception, ZeroDivisionError):
+        return errcd.FieldError("division_by_zero")
+    if isinstance(exception, NeighbourOpsError):
+        return errcd.FieldError("neighbour_operators")
+    if isinstance(exception, ArgumentOpsError):
+        return errcd.FieldError("operator_position")
+    if isinstance(exception, NotUnaryOpError):
+        return errcd.FieldError("unary_operator")
+    return errcd.FieldError("computation_failed")
+
+
+def get_computation_error(exception: Exception) -> str:
+    """
+    Returns the error message for an exception raised
+    while computing a micro formula, see `computation_error`.
+    """
+    return computation_error(exception).render()
+
+
+def compute_micro_program(
+    df: pd.DataFrame,
+    account_col_name: str,
+    operations_nested: list,
+    label_fields_sep: str,
+    strict_data_query: bool,
+    exact_arithm: bool = False,
+    sheets: dict[str, pd.DataFrame] | None = None,
+    sheet_sep: str = "!",
+    term_memo: dict | None = None,
+):
+    """
+    Compute a micro formula already parsed by `compile_micro_formula`.
+
+    If `term_memo` is given (see `new_term_memo`), the terms already looked up
+    by the previous formulas computed from the same data are not queried again.
+
+    Returns a tuple with the result of computation as float or None,
+    and an error as None or `errorcodes.FieldError` (its text is rendered on request).
+    """
+    result = None
+    error = None
 
     # Check if the json field for col name where to find accounting_codes exists in data frame
     if account_col_name not in df.columns.values.tolist():
-        error = (
-            f"Coloana `{account_col_name}`,"
-            f" necesară pentru calcule, nu există în fișierul încărcat sau are altă denumire."
-        )
+        error = errcd.FieldError("column_missing", column=account_col_name)
         return (result, error)
 
     # Do the computations
     try:
         # Cast all values in "account_col_name" to strings 
-        # (sometimes the values in this column are imported as integers)
-        df[account_col_name] = df[account_col_name].astype("str")
+        # (sometimes the values in this column are imported as integers),
+        # unless already done when the data was loaded
+        if not acc.is_canonical_column(df[account_col_name]):
+            df[account_col_name] = df[account_col_name].astype("str")
+
+        if sheets is not None:
+            for sheet_df in sheets.values():
+                if (account_col_name in sheet_df.columns.values.tolist()) and (
+                    not acc.is_canonical_column(sheet_df[account_col_name])
+                ):
+                    sheet_df[account_col_name] = sheet_df[account_col_name].astype("str")
 
         result, computation_errors = compute_arithm(
             operations_nested,
             label_fields_sep,
-            OPERATORS_MAP,
+            OPERATORS_MAP_EXACT if exact_arithm else OPERATORS_MAP,
             df,
             account_col_name,
             strict_data_query,
+            sheets,
+            sheet_sep,
+            term_memo,
         )
 
-        if len(computation_errors) > 0:
-            error = "\n".join(computation_errors)
+        # Only the numbers are rounded; a term read from a text cell
+        # is returned as it is, as without `exact_arithm`
+        if exact_arithm and isinstance(result, (int, float, Decimal)):
+            result = round(result, 2)
+
+        error = errcd.join_errors(computation_errors)
 
         if (result is None) and (len(computation_errors) == 0):
-            error = (
-                "Formula introdusă în câmpul de setări nu conține operatori aritmetici"
-                "  și/sau suficienți termeni necesari efectuării de calcule."
-            )
+            error = errcd.FieldError("formula_incomplete")
 
-    except RecursionError:
-        error = (
-            "Nivelul de adâncime al formulei introduse este prea mare,"
-            " a depășit memoria alocată de server. Formula introdusă trebuie să aibă"
-            " un număr rezonabil de paranteze, operatori aritmetici și termeni sau valori."
-        )
-    except ZeroDivisionError:
-        error = (
-            "În formula introdusă în câmpul de setări apare explicit o împărțire la zero SAU"
-            " numitorul folosit într-o operație de împărțire din formula introdusă la setări"
-            " are valoarea zero în celula din fișierul cu date ce corespunde numitorului indicat în formulă."
-        )
-    except NeighbourOpsError:
-        error = (
-            "Formula introdusă în câmpul de setări conține doi operatori aritmetici"
-            " situați unul lângă altul. Un operator trebuie să aibă atât la stânga cât și la dreapta lui"
-            " fie un indicator către o celulă din fișierul cu date, fie o valoare numerică."
-        )
-    except ArgumentOpsError:
-        error = (
-            "Poziția unuia din operatorii aritmetici din formula introdusă la setări este incorectă."
-            " Un operator trebuie să aibă atât la stânga cât și la dreapta lui"
-            " fie un indicator către o celulă din fișierul cu date, fie o valoare numerică."
-        )
-    except NotUnaryOpError:
-        error = (
-            "Operatorii unari pot fi doar semnele `+` și `-`, sistemul a detectat alt tip de expresie"
-            " în poziție de operator unar."
-        )
-    except Exception:
-        error = (
-            "A aparut o eroare în procesarea calculelor conform expresiei introduse."
-            " în câmpul micro-calculator de la setări."
-        )
+    except Exception as ex:
+        error = computation_error(ex)
 
     return (result, error)
 
 
 # ======= Operations maps
 
+COMPARISONS_MAP = {
+    "<": lt,
+    ">": gt,
+    "<=": le,
+    ">=": ge,
+    "=": eq,
+    "<>": ne,
+}
+
 OPERATORS_MAP = {
     "+": add,
     "-": subtr,
     "*": mult,
     "/": div,
+    **COMPARISONS_MAP,
+}
+
+OPERATORS_MAP_EXACT = {
+    "+": add_exact,
+    "-": subtr_exact,
+    "*": mult_exact,
+    "/": div_exact,
+    **COMPARISONS_MAP,
 }
 
 UNARY_MAP = {"+": unary_plus, "-": unary_minus}
+
+FUNCTIONS_MAP = {
+    "max": max,
+    "min": min,
+    "abs": lambda values: abs(values[0]),
+}
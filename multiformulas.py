@@ -1,4 +1,46 @@
 import pandas as pd
+import accountcodes as acc
+import errorcodes as errcd
+import numericvalues as nval
+
+
+def check_single_value_settings(
+    account_col_name: str,
+    accounting_code: str,
+    value_col_name: str,
+    fields_sep: str,
+) -> errcd.FieldError | None:
+    """
+    Validate the settings of a `single_cell` field, before reading any data.
+
+    Returns:
+    ----------
+    The error (`errorcodes.FieldError`) or None.
+    """
+    params = (account_col_name, accounting_code, value_col_name)
+
+    #  ===== JSON Input
+
+    # Check if func params coming from JSON are strings.
+    if not all(isinstance(item, str) for item in params) or not all(
+        len(item) > 0 for item in params
+    ):
+        return errcd.FieldError(
+            "settings_values_not_text",
+            account_col_name=str(account_col_name),
+            account_code=str(accounting_code),
+            value_col_name=str(value_col_name),
+        )
+
+    if fields_sep in accounting_code:
+        return errcd.FieldError("single_cell_many_codes", separator=fields_sep, code=accounting_code)
+
+    if fields_sep in value_col_name:
+        return errcd.FieldError(
+            "single_cell_many_columns", separator=fields_sep, column=value_col_name
+        )
+
+    return None
 
 
 def get_single_value(
@@ -7,6 +49,7 @@ def get_single_value(
     accounting_code: str,
     value_col_name: str,
     fields_sep: str,
+    code_index: pd.Index | None = None,
 ):
     """
     Select a Single value from DF using:
@@ -24,47 +67,23 @@ def get_single_value(
         the value to return exists.
     value_col_name (str):
         Name of the column containing the value to return.
+    code_index (pd.Index | None):
+        Index of the account column (see `accountcodes.build_code_index`),
+        to find the row of the accounting code without scanning the column.
 
     Returns:
     ----------
     A tuple with 2 items:
         - result of calculation
-        - error (str)
+        - error (`errorcodes.FieldError`) or None
     """
     result = None
-    error = None
-
-    params = (account_col_name, accounting_code, value_col_name)
-
-    #  ===== JSON Input
-
-    # Check if func params coming from JSON are strings.
-    if not all(isinstance(item, str) for item in params) or not all(
-        len(item) > 0 for item in params
-    ):
-        error = (
-            f"Unele din valorile `{account_col_name}`, `{accounting_code}`, `{value_col_name}`"
-            f" definite pentru acest câmp nu sunt înregistrate în baza de date în format string sau sunt înregistrate ca nule."
-        )
-        return (result, error)
 
-    # Strip the potential whitespace from the string values in JSON fields
-    account_col_name, accounting_code, value_col_name = (
-        item for item in params
+    error = check_single_value_settings(
+        account_col_name, accounting_code, value_col_name, fields_sep
     )
 
-    if fields_sep in accounting_code:
-        error = (
-            f"Pentru operațiunea `O singură valoare`, nu este permisă folosirea separatorului de"
-            f"valori multiple `{fields_sep}` alături de contul contabil `{accounting_code}`, care trebuie să fie unic."
-        )
-        return (result, error)
-    
-    if fields_sep in value_col_name:
-        error = (
-            f"Pentru operațiunea `O singură valoare`, nu este permisă folosirea separatorului de"
-            f"valori multiple `{fields_sep}` alături de numele coloanei `{value_col_name}`, care trebuie să fie unică."
-        )
+    if error is not None:
         return (result, error)
 
     # ===== DATAFRAME input
@@ -73,69 +92,96 @@ def get_single_value(
     # if account_col_name in df.columns.values.tolist():
 
     if not account_col_name in df.columns.values.tolist():
-        error = (
-            f"Coloana `{account_col_name}`,"
-            f" necesară pentru calcule, nu există în fișierul încărcat sau are altă denumire."
-        )
+        error = errcd.FieldError("column_missing", column=account_col_name)
         return (result, error)
 
-    # Transform all values in "account_col_name" to strings (sometimes the values in this column are imported as integers)
+    # Transform all values in "account_col_name" to strings (sometimes the values in this column are imported as integers),
+    # unless already done when the data was loaded
     try:
-        df[account_col_name] = df[account_col_name].astype("str")
+        if not acc.is_canonical_column(df[account_col_name]):
+            df[account_col_name] = df[account_col_name].astype("str")
     except Exception:
-        error = (
-            f"Coloana `{account_col_name}`,"
-            f" necesară pentru calcule, conține caractere care nu pot fi transformate în format string/text."
-        )
+        error = errcd.FieldError("account_column_not_text", column=account_col_name)
 
-    if not accounting_code in df[account_col_name].tolist():
+    if code_index is None:
+        code_index = acc.build_code_index(df[account_col_name])
+
+    positions = acc.code_positions(code_index, accounting_code)
+
+    if len(positions) == 0:
         result = 0.0
-        # for col in df.columns:
-        #     print(col)
-        # print([type(item) for item in df[account_col_name].tolist()])
         return (result, error)
 
     if not value_col_name in df.columns.values.tolist():
-        error = (
-            f"Coloana `{value_col_name}`,"
-            f" necesară pentru calcule, nu există în fișierul încărcat sau are altă denumire."
-        )
+        error = errcd.FieldError("column_missing", column=value_col_name)
         return (result, error)
 
     try:
-        result = df.loc[df[account_col_name] == accounting_code, value_col_name].item()
+        result = nval.read_cells(df[value_col_name].iloc[positions]).item()
 
         # Check if the value in the cell is missing (is NaN in pandas) - using pandas method pd.isna()
         if pd.isna(result):
             result = None
-            error = (
-                f"Valoarea corespunzătoare rândului cu codul contabil `{accounting_code}`"
-                f" și coloanei `{value_col_name}` lipsește din fișierul încărcat"
+            error = errcd.FieldError(
+                "cell_value_missing", code=accounting_code, column=value_col_name
             )
 
         # Check if value in the cell is a number (BUT if it's needed to be a string, then condition pd.isna(result) is enough).
         if not isinstance(result, (float, int)):
             result = None
-            error = (
-                f"Valoarea corespunzătoare rândului cu codul contabil `{accounting_code}`"
-                f" și coloanei `{value_col_name}` lipsește din fișierul încărcat sau nu este în format numeric."
+            error = errcd.FieldError(
+                "cell_value_not_numeric", code=accounting_code, column=value_col_name
             )
 
     except Exception:
-        error = (
-            f"Valoarea corespunzătoare rândului cu codul contabil `{accounting_code}`"
-            f" și coloanei `{value_col_name}` din fișierul încărcat are un format care nu poate fi procesat."
+        error = errcd.FieldError(
+            "cell_value_unreadable", code=accounting_code, column=value_col_name
         )
 
     return (result, error)
 
 
+def check_sum_settings(
+    account_col_name: str,
+    accounting_codes: str,
+    value_col_name: str,
+    fields_sep: str,
+) -> errcd.FieldError | None:
+    """
+    Validate the settings of a `sum_many_rows_same_col` field, before reading any data.
+
+    Returns:
+    ----------
+    The error (`errorcodes.FieldError`) or None.
+    """
+    params = (account_col_name, accounting_codes, value_col_name)
+
+    #  ===== JSON Input
+
+    # Check if func params coming from JSON are strings.
+    if not all(isinstance(item, str) for item in params) or not all(
+        len(item) > 0 for item in params
+    ):
+        return errcd.FieldError(
+            "settings_values_not_text",
+            account_col_name=str(account_col_name),
+            account_code=str(accounting_codes),
+            value_col_name=str(value_col_name),
+        )
+
+    if len(accounting_codes.split(fields_sep)) < 2:
+        return errcd.FieldError("sum_codes_too_few")
+
+    return None
+
+
 def sum_many_rows_same_col(
     df: pd.DataFrame,
     account_col_name: str,
     accounting_codes: str,
     value_col_name: str,
     fields_sep: str,
+    code_index: pd.Index | None = None,
 ):
     """
     Compute a value using:
@@ -156,68 +202,52 @@ def sum_many_rows_same_col(
         Name of the column containing the values to sum up.
     fields_sep (str):
         A string delimiter that separates between names of input fields.
+    code_index (pd.Index | None):
+        Index of the account column (see `accountcodes.build_code_index`).
 
     Returns:
     ----------
     A tuple with 2 items:
         - result of calculation
-        - error (str)
+        - error (`errorcodes.FieldError`) or None
     """
     result = None
-    error = None
-
-    params = (account_col_name, accounting_codes, value_col_name)
 
-    #  ===== JSON Input
+    error = check_sum_settings(
+        account_col_name, accounting_codes, value_col_name, fields_sep
+    )
 
-    # Check if func params coming from JSON are strings.
-    if not all(isinstance(item, str) for item in params) or not all(
-        len(item) > 0 for item in params
-    ):
-        error = (
-            f"Unele din valorile `{account_col_name}`, `{accounting_codes}`, `{value_col_name}`"
-            f" definite pentru acest câmp nu sunt înregistrate în baza de date în format string sau sunt înregistrate ca nule."
-        )
+    if error is not None:
         return (result, error)
 
-    # Strip the potential whitespace from the string values in JSON fields
-    account_col_name, value_col_name = (
-        item for item in (account_col_name, value_col_name)
-    )
-
     accounting_codes_list = [
         item for item in accounting_codes.split(fields_sep)
     ]
 
-    if len(accounting_codes_list) < 2:
-        error = (
-            "Pentru acest câmp a cărui valoare e calculată prin operația aritmetică de adunare"
-            + " trebuie precizate MINIM 2 conturi contabile corespunzând valorilor care trebuie adunate."
-        )
-        return (result, error)
-
     # ===== DATAFRAME input
 
     # Check if the json fields values exist in data frame
     if not account_col_name in df.columns.values.tolist():
-        error = (
-            f"Coloana `{account_col_name}`,"
-            f" necesară pentru calcule, nu există în fișierul încărcat sau are altă denumire."
-        )
+        error = errcd.FieldError("column_missing", column=account_col_name)
         return (result, error)
     
-    # Transform all values in "account_col_name" to strings (sometimes the values in this column are imported as integers)
+    # Transform all values in "account_col_name" to strings (sometimes the values in this column are imported as integers),
+    # unless already done when the data was loaded
     try:
-        df[account_col_name] = df[account_col_name].astype("str")
+        if not acc.is_canonical_column(df[account_col_name]):
+            df[account_col_name] = df[account_col_name].astype("str")
     except Exception:
-        error = (
-            f"Coloana `{account_col_name}`,"
-            f" necesară pentru calcule, conține caractere care nu pot fi transformate în format string/text."
-        )
+        error = errcd.FieldError("account_column_not_text", column=account_col_name)
+
+    if code_index is None:
+        code_index = acc.build_code_index(df[account_col_name])
 
     # filter only the accounting codes that exists in excel (to get sum 0 if fields from database are not found in excel)
+    codes_positions = {
+        item: acc.code_positions(code_index, item) for item in accounting_codes_list
+    }
     accounting_codes_list = [
-        item for item in accounting_codes_list if item in df[account_col_name].tolist()
+        item for item in accounting_codes_list if len(codes_positions[item]) > 0
     ]
 
     if len(accounting_codes_list) == 0:
@@ -225,43 +255,40 @@ def sum_many_rows_same_col(
         return (result, error)
 
     if not value_col_name in df.columns.values.tolist():
-        error = (
-            f"Coloana `{value_col_name}`,"
-            f" necesară pentru calcule, nu există în fișierul încărcat sau are altă denumire."
-        )
+        error = errcd.FieldError("column_missing", column=value_col_name)
         return (result, error)
 
     # Get the values needed for calculation as pd.Series
     # and check if they are of type float or int to cumpute the SUM
     try:
-        partial_values_series = df.loc[
-            df[account_col_name].isin(accounting_codes_list), value_col_name
-        ]
+        # The rows of all the codes, in the order of the data, each row once
+        rows_positions = sorted(
+            {pos for item in accounting_codes_list for pos in codes_positions[item].tolist()}
+        )
+        partial_values_series = nval.read_cells(df[value_col_name].iloc[rows_positions])
 
         # Check if any of the values from the required cells is missing (is NaN in pandas)
         # using pandas methods pd.Series.isnull() and pd.Series.any()
         if partial_values_series.isnull().any():
-            error = (
-                f"Unele din valorile corespunzătoare rândurilor cu codurile contabile `{accounting_codes_list}`"
-                f" și coloanei `{value_col_name}` lipsesc din fișierul încărcat."
+            error = errcd.FieldError(
+                "sum_values_missing", codes=accounting_codes_list, column=value_col_name
             )
             return (result, error)
 
         # Check if all values from the required cells are of type `float`` or `int`, otherwise the sum() cannot be computed.
-        # using pure python functions all() and isinstance()
-        if not all(
+        # using pure python functions all() and isinstance(), unless the column is numeric
+        # (ex. converted at load by `numericvalues.normalize_value_columns`)
+        if not pd.api.types.is_numeric_dtype(partial_values_series) and not all(
             isinstance(item, (float, int)) for item in partial_values_series.tolist()
         ):
-            error = (
-                f"Unele din valorile corespunzătoare rândurilor cu codurile contabile `{accounting_codes_list}`"
-                f" și coloanei `{value_col_name}` din fișierul încărcat nu sunt în format numeric."
+            error = errcd.FieldError(
+                "sum_values_not_numeric", codes=accounting_codes_list, column=value_col_name
             )
             return (result, error)
 
     except Exception:
-        error = (
-            f"Unele din valorile corespunzătoare rândurilor cu codurile contabile `{accounting_codes_list}`"
-            f" și coloanei `{value_col_name}` din fișierul încărcat nu pot fi procesate."
+        error = errcd.FieldError(
+            "sum_values_unreadable", codes=accounting_codes_list, column=value_col_name
         )
         return (result, error)
 
@@ -272,25 +299,67 @@ def sum_many_rows_same_col(
         # using pandas method pd.isna()
         if pd.isna(result):
             result = None
-            error = (
-                f"Operația de adunare a valorilor corespunzătoare rândurilor cu codurile contabile `{accounting_codes_list}`"
-                f" și coloanei `{value_col_name}` din fișierul încărcat nu a produs un rezultat numeric."
+            error = errcd.FieldError(
+                "sum_not_numeric", codes=accounting_codes_list, column=value_col_name
             )
     except Exception:
-        error = (
-            f"Unele din valorile corespunzătoare rândurilor cu codurile contabile `{accounting_codes_list}`"
-            f" și coloanei `{value_col_name}` din fișierul încărcat nu pot fi procesate."
+        error = errcd.FieldError(
+            "sum_values_unreadable", codes=accounting_codes_list, column=value_col_name
         )
 
     return (result, error)
 
 
+def check_subtract_settings(
+    account_col_name: str,
+    accounting_codes: str,
+    value_col_names: str,
+    fields_sep: str,
+) -> errcd.FieldError | None:
+    """
+    Validate the settings of a `subtract_same_row_two_cols` field, before reading any data.
+
+    Returns:
+    ----------
+    The error (`errorcodes.FieldError`) or None.
+    """
+    params = (account_col_name, accounting_codes, value_col_names)
+
+    #  ===== JSON Input =====
+
+    # Check if func params coming from JSON are strings.
+    if not all(isinstance(item, str) for item in params) or not all(
+        len(item) > 0 for item in params
+    ):
+        return errcd.FieldError(
+            "subtract_settings_values_not_text",
+            account_col_name=str(account_col_name),
+            account_code=str(accounting_codes),
+            value_col_name=str(value_col_names),
+        )
+
+    accounting_codes_list = accounting_codes.split(fields_sep)
+    value_col_names_list = value_col_names.split(fields_sep)
+
+    if len(accounting_codes_list) > 2:
+        return errcd.FieldError("subtract_codes_too_many")
+
+    if len(value_col_names_list) > 2:
+        return errcd.FieldError("subtract_columns_too_many")
+
+    if (len(accounting_codes_list) + len(value_col_names_list)) < 3:
+        return errcd.FieldError("subtract_terms_too_few")
+
+    return None
+
+
 def subtract_two_single_values(
     df: pd.DataFrame,
     account_col_name: str,
     accounting_codes: str,
     value_col_names: str,
     fields_sep: str,
+    code_index: pd.Index | None = None,
 ):
     """
     Compute a value using:
@@ -312,57 +381,26 @@ def subtract_two_single_values(
         containing the values to subtract (first value_col_name - second value_col_name).
     fields_sep (str):
         A string delimiter that separates between names of input fields.
+    code_index (pd.Index | None):
+        Index of the account column (see `accountcodes.build_code_index`).
 
     Returns:
     ----------
     A tuple with 2 items:
         - result of calculation (float or int)
-        - error (str)
+        - error (`errorcodes.FieldError`) or None
     """
     result = None
-    error = None
-
-    params = (account_col_name, accounting_codes, value_col_names)
-
-    #  ===== JSON Input =====
-
-    # Check if func params coming from JSON are strings.
-    if not all(isinstance(item, str) for item in params) or not all(
-        len(item) > 0 for item in params
-    ):
-        error = (
-            f"Unele din valorile `{account_col_name}`, `{accounting_codes}`, `{value_col_names}`"
-            f" precizate pentru acest câmp nu sunt înregistrate în baza de date în format string sau sunt înregistrate ca nule."
-        )
-        return (result, error)
 
-    # Split and Strip the potential whitespace from the string values in JSON fields
-    account_col_name = account_col_name
-    accounting_codes_list = [
-        item for item in accounting_codes.split(fields_sep)
-    ]
-    value_col_names_list = [item for item in value_col_names.split(fields_sep)]
-
-    if len(accounting_codes_list) > 2:
-        error = (
-            "Pentru acest câmp a cărui valoare e calculată prin operația aritmetică de scădere"
-            " trebuie precizate MAXIM 2 conturi contabile corespunzând valorilor cu care se face operația de scădere."
-        )
-        return (result, error)
+    error = check_subtract_settings(
+        account_col_name, accounting_codes, value_col_names, fields_sep
+    )
 
-    if len(value_col_names_list) > 2:
-        error = (
-            "Pentru acest câmp a cărui valoare e calculată prin operația aritmetică de scădere"
-            " trebuie precizate MAXIM 2 nume de coloane în care se găsesc cei 2 termeni ai scăderii."
-        )
+    if error is not None:
         return (result, error)
 
-    if (len(accounting_codes_list) + len(value_col_names_list)) < 3:
-        error = (
-            "Pentru acest câmp a cărui valoare e calculată prin operația aritmetică de scădere a 2 termeni"
-            " trebuie precizate fie 2 conturi contabile și 1 nume de coloană, fie 1 cont contabil și 2 nume de coloane"
-        )
-        return (result, error)
+    accounting_codes_list = accounting_codes.split(fields_sep)
+    value_col_names_list = value_col_names.split(fields_sep)
 
     # Get the subtraction elements
     accounting_code_first = accounting_codes_list[0]
@@ -384,92 +422,83 @@ def subtract_two_single_values(
 
     # Check if the json fields values exist in data frame
     if not account_col_name in columns_values_list:
-        error = (
-            f"Coloana `{account_col_name}`,"
-            f" necesară pentru calcule, nu există în fișierul încărcat sau are altă denumire."
-        )
+        error = errcd.FieldError("column_missing", column=account_col_name)
         return (result, error)
     
-    # Transform all values in "account_col_name" to strings (sometimes the values in this column are imported as integers)
+    # Transform all values in "account_col_name" to strings (sometimes the values in this column are imported as integers),
+    # unless already done when the data was loaded
     try:
-        df[account_col_name] = df[account_col_name].astype("str")
+        if not acc.is_canonical_column(df[account_col_name]):
+            df[account_col_name] = df[account_col_name].astype("str")
     except Exception:
-        error = (
-            f"Coloana `{account_col_name}`,"
-            f" necesară pentru calcule, conține caractere care nu pot fi transformate în format string/text."
-        )
+        error = errcd.FieldError("account_column_not_text", column=account_col_name)
+
+    if code_index is None:
+        code_index = acc.build_code_index(df[account_col_name])
 
     term_first = 0.0
     term_second = 0.0
-    account_col_name_series = df[account_col_name]
+    positions_first = acc.code_positions(code_index, accounting_code_first)
+    positions_second = acc.code_positions(code_index, accounting_code_second)
 
     try:
-        if accounting_code_first in account_col_name_series.tolist():
+        if len(positions_first) > 0:
             # Check if the json fields values exist in framedata
             if value_col_name_first in columns_values_list:
-                term_first = df.loc[
-                    account_col_name_series.isin([accounting_code_first]),
-                    value_col_name_first,
-                ].item()
+                term_first = nval.read_cells(df[value_col_name_first].iloc[positions_first]).item()
 
                 # Check if the value in cell is missing (is NaN in pandas) - using pandas method pd.isna()
                 if pd.isna(pd.Series([term_first])).any():
-                    error = (
-                        f"Valoarea corespunzătoare rândului cu codul contabil `{accounting_code_first}` și coloanei `{value_col_name_first}`,"
-                        f" lipsește din fișierul încărcat."
+                    error = errcd.FieldError(
+                        "term_cell_missing", code=accounting_code_first, column=value_col_name_first
                     )
                     return (result, error)
 
                 # Check if value in cell is a number in order to do math operations on it.
                 if not isinstance(term_first, (float, int)):
-                    error = (
-                        f"Valoarea corespunzătoare rândului cu codul contabil `{accounting_code_first}` și coloanei `{value_col_name_first}`,"
-                        f" din fișierul încărcat nu este în format numeric."
+                    error = errcd.FieldError(
+                        "term_cell_not_numeric", code=accounting_code_first, column=value_col_name_first
                     )
                     return (result, error)
 
             else:
-                error = (
-                    f"Coloana `{value_col_name_first}` corespunzătoare rândului cu contul contabil `{accounting_code_first}`,"
-                    f" necesară pentru calcule, nu există în fișierul încărcat sau are altă denumire."
+                error = errcd.FieldError(
+                    "term_cell_column_missing", column=value_col_name_first, code=accounting_code_first
                 )
                 return (result, error)
 
-        if accounting_code_second in account_col_name_series.tolist():
+        if len(positions_second) > 0:
             # Check if the json fields values exist in framedata
             if value_col_name_second in columns_values_list:
-                term_second = df.loc[
-                    account_col_name_series.isin([accounting_code_second]),
-                    value_col_name_second,
-                ].item()
+                term_second = nval.read_cells(df[value_col_name_second].iloc[positions_second]).item()
 
                 # Check if the value in cell is missing (is NaN in pandas) - using pandas method pd.isna()
                 if pd.isna(pd.Series([term_second])).any():
-                    error = (
-                        f"Valoarea corespunzătoare rândului cu codul contabil `{accounting_code_second}` și coloanei `{value_col_name_second}`,"
-                        f" lipsește din fișierul încărcat."
+                    error = errcd.FieldError(
+                        "term_cell_missing", code=accounting_code_second, column=value_col_name_second
                     )
                     return (result, error)
 
                 # Check if value in cell is a number in order to do math operations on it.
                 if not isinstance(term_second, (float, int)):
-                    error = (
-                        f"Valoarea corespunzătoare rândului cu codul contabil `{accounting_code_second}` și coloanei `{value_col_name_second}`,"
-                        f" din fișierul încărcat nu este în format numeric."
+                    error = errcd.FieldError(
+                        "term_cell_not_numeric", code=accounting_code_second, column=value_col_name_second
                     )
                     return (result, error)
 
             else:
-                error = (
-                    f"Coloana `{value_col_name_second}` corespunzătoare rândului cu contul contabil `{accounting_code_second}`,"
-                    f" necesară pentru calcule, nu există în fișierul încărcat sau are altă denumire."
+                error = errcd.FieldError(
+                    "term_cell_column_missing", column=value_col_name_second, code=accounting_code_second
                 )
                 return (result, error)
 
     except Exception:
-        error = (
-            f"Unele din valorile corespunzătoare rândurilor cu codurile contabile `{accounting_code_first}`, `{accounting_code_second}`"
-            f" și coloanelor `{value_col_name_first}`, `{value_col_name_second}` din fișierul încărcat nu pot fi procesate."
+        error = errcd.FieldError(
+            "subtract_values_unreadable",
+            code_first=accounting_code_first,
+            code_second=accounting_code_second,
+            column_first=value_col_name_first,
+            column_second=value_col_name_second,
         )
         return (result, error)
 
@@ -477,16 +506,20 @@ def subtract_two_single_values(
         result = round(term_first - term_second, ndigits=2)
         if pd.isna(result):
             result = None
-            error = (
-                f"Unele din valorile corespunzătoare rândului cu codul contabil `{accounting_code_first}`"
-                f" și coloanei `{value_col_name_first}` sau rândului cu codul contabil `{accounting_code_second}`"
-                f" și coloanei `{value_col_name_second}` lipsesc din fișierul încărcat sau nu sunt în format numeric."
+            error = errcd.FieldError(
+                "subtract_values_missing",
+                code_first=accounting_code_first,
+                code_second=accounting_code_second,
+                column_first=value_col_name_first,
+                column_second=value_col_name_second,
             )
     except Exception:
-        error = (
-            f"Unele din valorile corespunzătoare rândului cu codul contabil `{accounting_code_first}`"
-            f" și coloanei `{value_col_name_first}` sau rândului cu codul contabil `{accounting_code_second}`"
-            f" și coloanei `{value_col_name_second}` din fișierul încărcat nu sunt în format numeric."
+        error = errcd.FieldError(
+            "subtract_values_not_numeric",
+            code_first=accounting_code_first,
+            code_second=accounting_code_second,
+            column_first=value_col_name_first,
+            column_second=value_col_name_second,
         )
 
     return (result, error)
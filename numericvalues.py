@@ -0,0 +1,213 @@
+import re
+import numpy as np
+import pandas as pd
+
+# Decimal separators recognized in the amounts stored as text:
+# "," as in the Romanian exports (1.234,56), "." as in the English ones (1,234.56)
+DECIMAL_SEPS = (",", ".")
+THOUSANDS_SEPS = {",": ".", ".": ","}
+
+# Whitespace is also a thousands separator (1 234,56); `\s` matches the no-break spaces too
+_WHITESPACE_PATTERN = r"\s"
+
+# An amount in accounting notation, ex. "(1.234,56)", is negative
+_PARENTHESES_PATTERN = r"\(.*\)"
+
+
+def amount_pattern(decimal_sep: str) -> str:
+    """
+    Regex of an amount written with the decimal separator and the thousands
+    separator of a locale, ex. "-1.234,56", "1234,5", ",5", "1,5E3" for ",".
+    """
+    dec = re.escape(decimal_sep)
+    ths = re.escape(THOUSANDS_SEPS[decimal_sep])
+
+    return (
+        rf"[+-]?(?:(?:\d+|\d{{1,3}}(?:{ths}\d{{3}})+)(?:{dec}\d*)?|{dec}\d+)"
+        r"(?:[eE][+-]?\d+)?"
+    )
+
+
+AMOUNT_PATTERNS = {decimal_sep: amount_pattern(decimal_sep) for decimal_sep in DECIMAL_SEPS}
+
+
+def detect_decimal_sep(texts: pd.Series) -> tuple[str, np.ndarray]:
+    """
+    Decimal separator of a column of amounts stored as text: the one
+    of the amounts that can be read only one way (ex. "1,5", "1.234,56" vs. "1,234.56");
+    "1234" is read the same with both separators.
+
+    An amount with a single separator followed by exactly 3 digits (ex. "1.234", "12.500")
+    can be read both ways: it is read with the separator of the rest of the column.
+    On a tie (ex. a column with only such amounts), its separator is taken
+    as the thousands separator, since the amounts have 2 decimals
+    ("12.500" -> 12500, "1,234" -> 1234); the "." separator is used on any other tie.
+
+    Returns:
+    ----------
+    A tuple:
+        - the decimal separator (str)
+        - the mask of the ambiguous amounts, read both ways (np.ndarray[bool])
+    """
+    matches = {
+        decimal_sep: texts.str.fullmatch(pattern).fillna(False).to_numpy(dtype=bool)
+        for decimal_sep, pattern in AMOUNT_PATTERNS.items()
+    }
+
+    only_comma = int((matches[","] & ~matches["."]).sum())
+    only_dot = int((matches["."] & ~matches[","]).sum())
+
+    has_dot = texts.str.contains(".", regex=False).fillna(False).to_numpy(dtype=bool)
+    has_comma = texts.str.contains(",", regex=False).fillna(False).to_numpy(dtype=bool)
+    ambiguous = matches[","] & matches["."] & (has_dot | has_comma)
+
+    if only_comma != only_dot:
+        decimal_sep = "," if only_comma > only_dot else "."
+    else:
+        dot_grouped = int((ambiguous & has_dot).sum())
+        comma_grouped = int((ambiguous & has_comma).sum())
+        decimal_sep = "," if dot_grouped > comma_grouped else "."
+
+    return (decimal_sep, ambiguous)
+
+
+def parse_amounts(texts: pd.Series, decimal_sep: str) -> np.ndarray:
+    """
+    Convert, in a single vectorized pass, the amounts stored as text
+    (without whitespace) to float64; NaN for the texts that are not amounts.
+    """
+    negative = texts.str.fullmatch(_PARENTHESES_PATTERN).fillna(False).to_numpy(dtype=bool)
+    texts = texts.where(~negative, texts.str.slice(1, -1))
+
+    valid = texts.str.fullmatch(AMOUNT_PATTERNS[decimal_sep]).fillna(False).to_numpy(dtype=bool)
+    cleaned = (
+        texts.where(valid)
+        .str.replace(THOUSANDS_SEPS[decimal_sep], "", regex=False)
+        .str.replace(decimal_sep, ".", regex=False)
+    )
+
+    values = pd.to_numeric(cleaned, errors="coerce").to_numpy(dtype="float64")
+
+    return np.where(negative, -values, values)
+
+
+def read_cells(values: pd.Series) -> pd.Series:
+    """
+    The cells read from a value column, as float64 if the column is stored
+    as float32 (see `compactframes.compact_frame`): each value is read back
+    as the shortest decimal stored the same way in float32 (1234.56, not 1234.56005859375),
+    so the results do not carry the noise of the storage type.
+    The cells of the other columns are returned as they are.
+    """
+    if values.dtype != "float32":
+        return values
+
+    return values.astype("str").astype("float64")
+
+
+def convert_value_column(values: pd.Series) -> tuple[pd.Series | None, dict | None]:
+    """
+    Convert a text typed column of amounts to numbers.
+
+    Parameters:
+    ----------
+    values (pd.Series):
+        A column of the data, read as text (or mixed text and numbers).
+
+    Returns:
+    ----------
+    A tuple:
+        - the converted column or None if the column does not hold amounts:
+        float64 if all the texts are amounts, otherwise (mostly amounts)
+        an object column keeping the other texts, reported as not numeric
+        by the procedures
+        - diagnostics (dict) or None: `decimal_sep`, `parsed` (number of texts converted),
+        `missing` (blank texts, now NaN), `unparsed` (number of texts kept),
+        `unparsed_rows` (their positions, i.e. the NaN mask of the conversion),
+        `ambiguous` (number of amounts that can be read with both separators,
+        see `detect_decimal_sep`), `ambiguous_rows` (their positions)
+    """
+    if pd.api.types.is_numeric_dtype(values) or not (
+        pd.api.types.is_object_dtype(values) or isinstance(values.dtype, pd.StringDtype)
+    ):
+        return (None, None)
+
+    is_text = (
+        values.notna().to_numpy(dtype=bool)
+        if isinstance(values.dtype, pd.StringDtype)
+        else values.map(lambda val: isinstance(val, str)).to_numpy(dtype=bool)
+    )
+
+    if not is_text.any():
+        return (None, None)
+
+    texts = values.where(is_text).astype("str").str.replace(_WHITESPACE_PATTERN, "", regex=True)
+
+    blank = is_text & (texts.str.len() == 0).fillna(False).to_numpy(dtype=bool)
+    texts = texts.where(is_text & ~blank)
+
+    decimal_sep, ambiguous = detect_decimal_sep(texts)
+    amounts = parse_amounts(texts, decimal_sep)
+
+    parsed = is_text & ~blank & ~np.isnan(amounts)
+    unparsed = is_text & ~blank & ~parsed
+
+    # A text column (ex. the accounts names) with a few numbers in it is kept as it is
+    if parsed.sum() <= unparsed.sum():
+        return (None, None)
+
+    diagnostics = {
+        "decimal_sep": decimal_sep,
+        "parsed": int(parsed.sum()),
+        "missing": int(blank.sum()),
+        "unparsed": int(unparsed.sum()),
+        "unparsed_rows": np.flatnonzero(unparsed).tolist(),
+        "ambiguous": int(ambiguous.sum()),
+        "ambiguous_rows": np.flatnonzero(ambiguous).tolist(),
+    }
+
+    if not unparsed.any():
+        numbers = pd.to_numeric(values.where(~is_text), errors="coerce").to_numpy(dtype="float64")
+        converted = np.where(is_text, amounts, numbers)
+        return (pd.Series(converted, index=values.index, name=values.name), diagnostics)
+
+    converted = values.astype("object").copy()
+    converted[parsed] = amounts[parsed]
+    converted[blank] = np.nan
+
+    return (pd.Series(converted, index=values.index, name=values.name, dtype="object"), diagnostics)
+
+
+def normalize_value_columns(
+    frames: list[pd.DataFrame], account_col_names: list[str]
+) -> list[dict]:
+    """
+    Load stage: replace, in place, the text typed columns of amounts
+    (ex. "1.234,56" exported as text) of the data frames with numbers,
+    so the procedures do not meet amounts stored as text.
+    The account columns are never converted.
+
+    Returns:
+    ----------
+    The diagnostics of the converted columns (see `convert_value_column`),
+    with the keys `frame` (position in `frames`) and `column` added.
+    """
+    diagnostics = []
+    seen = set()
+
+    for frame_idx, df in enumerate(frames):
+        if id(df) in seen:
+            continue
+        seen.add(id(df))
+
+        for col_name in df.columns.values.tolist():
+            if col_name in account_col_names:
+                continue
+
+            converted, col_diagnostics = convert_value_column(df[col_name])
+
+            if converted is not None:
+                df[col_name] = converted
+                diagnostics.append({"frame": frame_idx, "column": col_name, **col_diagnostics})
+
+    return diagnostics
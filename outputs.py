@@ -0,0 +1,219 @@
+import json
+import numbers
+from typing import Callable, Iterable, Iterator, TextIO
+import errorcodes as errcd
+
+# Optional faster serializer, used when installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Output formats
+JSON_FORMAT = "json"
+JSON_STREAM_FORMAT = "json-stream"
+JSONL_FORMAT = "jsonl"
+# The results are written to a SQLite table, see `dbsink.ResultSink`
+SQLITE_FORMAT = "sqlite"
+
+OUTPUT_FORMATS = (JSON_FORMAT, JSON_STREAM_FORMAT, JSONL_FORMAT, SQLITE_FORMAT)
+
+# Key of the records of the distinct errors, see `iter_error_references`
+ERROR_ID_KEY = "error_id"
+
+# Number of records written between the flushes of the stream file,
+# so the readers of the file see the results without a syscall per record
+STREAM_FLUSH_RECORDS = 1000
+
+
+def _to_builtin(obj):
+    """
+    Fallback for values the serializers do not know,
+    ex. numpy scalars returned by pandas sums.
+    """
+    if hasattr(obj, "item"):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def nan_to_none(obj):
+    """
+    Copy of a result record (or list of records) with the NaN values as None,
+    written as `null` by all the serializers: `json` would write `NaN`,
+    which is not valid JSON, while `orjson` writes `null`.
+    """
+    if isinstance(obj, dict):
+        return {key: nan_to_none(val) for key, val in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [nan_to_none(val) for val in obj]
+    if isinstance(obj, numbers.Real) and (obj != obj):
+        return None
+    return obj
+
+
+def iter_error_references(records: Iterable[dict]) -> Iterator[dict]:
+    """
+    Yields the result records with their errors written once: before the first
+    result with an error, a record `{"error_id", "error"}` with its id (int, from 0)
+    and the error; the results have this id as error. The results of thousands
+    of fields failing the same way (ex. the same missing column) then share
+    a single error record in the output.
+
+    The errors are compared by their code and parameters (see `errorcodes.FieldError.key`);
+    the identical errors of `errorcodes.ErrorTable` are the same object, found by identity
+    without computing their key again. The records without error (or with a global error)
+    are yielded as they are.
+
+    Parameters:
+    ----------
+    records (Iterable[dict]):
+        Records `{"id", "value", "error"}` (or `{"global_error"}`), the errors being
+        records `{"code", "params"}` (the `code` error format).
+
+    Yields:
+    ----------
+    The records of the distinct errors and the result records, in the output order.
+    """
+    error_ids = {}
+    key_ids = {}
+    # The errors found by identity are kept alive, so their ids are not reused
+    errors = []
+
+    for record in records:
+        error = record.get("error")
+
+        if error is None:
+            yield record
+            continue
+
+        error_id = error_ids.get(id(error))
+
+        if error_id is None:
+            key = errcd.to_error(error).key()
+
+            if key not in key_ids:
+                key_ids[key] = len(key_ids)
+                yield {ERROR_ID_KEY: key_ids[key], "error": error}
+
+            error_id = key_ids[key]
+            error_ids[id(error)] = error_id
+            errors.append(error)
+
+        yield {**record, "error": error_id}
+
+
+def error_table_output(records: Iterable[dict]) -> dict:
+    """
+    The `json` output with the distinct errors written once, see `iter_error_references`.
+
+    Returns:
+    ----------
+    A dictionary with the keys:
+        - errors: the records `{"error_id", "error"}` of the distinct errors,
+        the `error_id` being their index in the list
+        - results: the result records (or the global error), with the ids of their errors
+    """
+    errors = []
+    results = []
+
+    for record in iter_error_references(records):
+        if ERROR_ID_KEY in record:
+            errors.append(record)
+        else:
+            results.append(record)
+
+    return {"errors": errors, "results": results}
+
+
+def get_record_serializer(fast: bool = True) -> Callable[[dict], str]:
+    """
+    Returns a function that serializes one result record to a JSON string.
+    The NaN values are written as `null` by both serializers, see `nan_to_none`.
+
+    Parameters:
+    ----------
+    fast (bool):
+        Use `orjson` if it is installed, otherwise fall back to the `json` module.
+
+    Returns:
+    ----------
+    A function taking a dictionary and returning a string.
+    """
+    if fast and orjson is not None:
+        options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+        def dumps_fast(record: dict) -> str:
+            return orjson.dumps(nan_to_none(record), default=_to_builtin, option=options).decode(
+                "utf-8"
+            )
+
+        return dumps_fast
+
+    def dumps(record: dict) -> str:
+        return json.dumps(
+            nan_to_none(record), skipkeys=True, ensure_ascii=False, default=_to_builtin
+        )
+
+    return dumps
+
+
+def write_results_stream(
+    records: Iterable[dict],
+    fp: TextIO,
+    output_format: str = JSON_STREAM_FORMAT,
+    fast: bool = True,
+) -> int:
+    """
+    Write each result record to the file as soon as it is received,
+    without keeping the whole list of results in memory. The file is flushed
+    every `STREAM_FLUSH_RECORDS` records and at the end.
+
+    A global error received after some results (ex. a field settings object
+    in a wrong format)
+    is written as a last record `{"global_error"}`, after the partial results;
+    the `json` output of `computation.compute_fields` has only the global error.
+
+    Parameters:
+    ----------
+    records (Iterable[dict]):
+        Records `{"id", "value", "error"}` (or `{"global_error"}`), ex. the generator
+        returned by `computation.iter_computed_fields`.
+
+    fp (TextIO):
+        Text file opened for writing.
+
+    output_format (str):
+        `json-stream` writes a single JSON array, `jsonl` writes a JSON object per line.
+
+    fast (bool):
+        Use the faster serializer when it is available.
+
+    Returns:
+    ----------
+    The number of written records.
+    """
+    dumps = get_record_serializer(fast)
+    count = 0
+
+    if output_format == JSONL_FORMAT:
+        for record in records:
+            fp.write(dumps(record))
+            fp.write("\n")
+            count += 1
+            if count % STREAM_FLUSH_RECORDS == 0:
+                fp.flush()
+        fp.flush()
+        return count
+
+    fp.write("[")
+    for record in records:
+        if count > 0:
+            fp.write(", ")
+        fp.write(dumps(record))
+        count += 1
+        if count % STREAM_FLUSH_RECORDS == 0:
+            fp.flush()
+    fp.write("]")
+    fp.flush()
+
+    return count
@@ -0,0 +1,234 @@
+import gc
+import time
+import importlib
+import multiprocessing
+import multiprocessing.pool
+import os
+import threading
+import inputs as inp
+import templatecache as tcache
+import microcalc
+import constants as cnst
+import computation as cmp
+
+# Number of jobs computed by a worker before it is replaced by a fresh fork,
+# returning to the system the memory kept by pandas between jobs
+DEFAULT_TASKS_PER_WORKER = 200
+
+# Optional modules imported by the computations on first use (the Excel readers of pandas)
+PRELOAD_MODULES = ("openpyxl", "xlrd")
+
+# Number of the open pools of the process: `gc.freeze` is process-wide,
+# so the objects are unfrozen only when the last pool is stopped
+_open_pools = 0
+_open_pools_lock = threading.Lock()
+
+
+def _freeze_for_fork():
+    """
+    Move the objects of the process out of the garbage collector generations
+    before forking the workers of a pool, see `PreforkPool`.
+    """
+    global _open_pools
+
+    with _open_pools_lock:
+        gc.collect()
+        gc.freeze()
+        _open_pools += 1
+
+
+def _unfreeze_after_pool():
+    """
+    Unfreeze the objects of the process when the last open pool is stopped.
+    """
+    global _open_pools
+
+    with _open_pools_lock:
+        _open_pools -= 1
+
+        if _open_pools == 0:
+            gc.unfreeze()
+
+
+def preload(settings_paths: list[str] | tuple[str, ...] = ()) -> int:
+    """
+    Prepare the process before forking the workers, so each worker starts
+    with everything loaded, shared with the parent copy-on-write:
+    - import the optional modules used on first use (see `PRELOAD_MODULES`),
+    - warm the formula parser,
+    - compile the fields settings of `settings_paths` into the memory
+    of the process (see `templatecache.get_compiled_template`).
+
+    The objects are frozen for the garbage collector only by `PreforkPool`,
+    right before forking.
+
+    Returns:
+    ----------
+    The number of compiled templates loaded.
+    """
+    for module_name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(module_name)
+        except ImportError:
+            pass
+
+    microcalc.compile_micro_formula(
+        f"-(sc{cnst.MICRO_CALC_FIELDS_SPLIT_SEP}401 + 1) * 2",
+        cnst.MICRO_CALC_FIELDS_SPLIT_SEP,
+        cnst.MICRO_CALC_SUPLIM_CHARS,
+        cnst.MICRO_CALC_SHEET_SEP,
+    )
+
+    loaded = 0
+
+    for settings_path in settings_paths:
+        jsn_inp_obj, jsn_inp_reading_error = inp.read_db_fields_json(settings_path)
+
+        if (len(jsn_inp_reading_error) > 0) or (cmp.check_settings(jsn_inp_obj) is not None):
+            continue
+
+        _, template_error = tcache.get_compiled_template(jsn_inp_obj)
+        loaded += 1 if template_error is None else 0
+
+    return loaded
+
+
+def _compute_job(field_names_path: str, data_file_path: str | list[str], options: dict) -> list[dict]:
+    """
+    Runs in a worker: the results of a job, see `computation.compute_fields`.
+    """
+    return cmp.compute_fields(field_names_path, data_file_path, **options)
+
+
+def _compute_batch(jobs: list[tuple[str, str | list[str]]], options: dict) -> list[tuple[list[dict], float]]:
+    """
+    Runs in a worker: the results of many jobs, one after another in the same process,
+    with the computation time of each job (seconds).
+    """
+    batch_results = []
+
+    for field_names_path, data_file_path in jobs:
+        started = time.perf_counter()
+        results = cmp.compute_fields(field_names_path, data_file_path, **options)
+        batch_results.append((results, time.perf_counter() - started))
+
+    return batch_results
+
+
+class PreforkPool:
+    """
+    Pool of worker processes forked from a preloaded parent (see `preload`),
+    for computing many jobs in parallel on all the cores without paying,
+    in each worker, the imports and the settings compilation.
+
+    A worker is replaced by a new fork of the parent after
+    `tasks_per_worker` jobs, which bounds the memory kept by each worker.
+    Requires the `fork` start method (Linux, macOS).
+
+    Right before forking, the objects of the parent are moved out of the
+    garbage collector generations (`gc.freeze`), so the collections of the
+    workers do not write to (and copy) the shared pages. Side effect: while
+    the pool is open, the objects of the parent alive at its creation are not
+    collected as cycles in the parent either. The freeze is process-wide and shared
+    by the open pools: the objects are unfrozen when the last of them is stopped
+    by `close` or `terminate`.
+
+    Parameters:
+    ----------
+    processes (int | None):
+        Number of workers; by default the number of CPUs.
+
+    tasks_per_worker (int | None):
+        Jobs computed by a worker before it is replaced; None keeps the workers.
+
+    settings_paths (list[str] | tuple[str, ...]):
+        Fields settings compiled in the parent, before forking.
+    """
+
+    def __init__(
+        self,
+        processes: int | None = None,
+        tasks_per_worker: int | None = DEFAULT_TASKS_PER_WORKER,
+        settings_paths: list[str] | tuple[str, ...] = (),
+    ):
+        self.processes = processes if processes is not None else (os.cpu_count() or 1)
+        self.preloaded_templates = preload(settings_paths)
+
+        _freeze_for_fork()
+        self._frozen = True
+        # The replaced workers are forked later, so the objects stay frozen
+        # until the pool is stopped
+        self._pool = multiprocessing.get_context("fork").Pool(
+            self.processes, maxtasksperchild=tasks_per_worker
+        )
+
+    def submit(
+        self,
+        field_names_path: str,
+        data_file_path: str | list[str],
+        **options,
+    ) -> multiprocessing.pool.AsyncResult:
+        """
+        Schedule a job; `options` are the keyword arguments of
+        `computation.compute_fields` (ex. `sheet_names`, `compact`).
+
+        Returns:
+        ----------
+        The pending result; its `get()` returns the list of results of the job.
+        """
+        return self._pool.apply_async(_compute_job, (field_names_path, data_file_path, options))
+
+    def submit_batch(
+        self,
+        jobs: list[tuple[str, str | list[str]]],
+        **options,
+    ) -> multiprocessing.pool.AsyncResult:
+        """
+        Schedule many (fields settings path, data file path) jobs computed
+        one after another by the same worker, reusing its loaded modules and caches
+        (ex. for many small files, see `scheduler.run_batch`).
+
+        Returns:
+        ----------
+        The pending result; its `get()` returns, for each job, the list of results
+        and the computation time (seconds).
+        """
+        return self._pool.apply_async(_compute_batch, (jobs, options))
+
+    def compute(self, field_names_path: str, data_file_path: str | list[str], **options) -> list[dict]:
+        """
+        Compute a job in a worker and wait for its results, see `submit`.
+        """
+        return self.submit(field_names_path, data_file_path, **options).get()
+
+    def close(self):
+        """
+        Wait for the scheduled jobs and stop the workers.
+        """
+        self._pool.close()
+        self._pool.join()
+        self._release_freeze()
+
+    def terminate(self):
+        """
+        Stop the workers at once, dropping the scheduled jobs.
+        """
+        self._pool.terminate()
+        self._pool.join()
+        self._release_freeze()
+
+    def _release_freeze(self):
+        # A pool stopped twice (ex. `close`, then the exit of a `with` block)
+        # releases the freeze once
+        if self._frozen:
+            self._frozen = False
+            _unfreeze_after_pool()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
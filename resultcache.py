@@ -0,0 +1,272 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+import pandas as pd
+import constants as cnst
+import compiler as cmpl
+import formulaparser as fp
+
+# Version of the cached results; change it to invalidate all the cached results
+RESULT_CACHE_VERSION = 3
+
+# Environment variable with the SQLite file of the results cache;
+# an empty value keeps the results only in memory
+RESULT_CACHE_PATH_ENV = "RFC_RESULT_CACHE_PATH"
+DEFAULT_RESULT_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "rfc", "results.sqlite"
+)
+
+DEFAULT_MEMORY_ENTRIES = 4096
+DEFAULT_DISK_ENTRIES = 200_000
+
+# Max. number of keys in a single SQLite query (SQLITE_MAX_VARIABLE_NUMBER is 999 in old versions)
+_QUERY_CHUNK = 500
+
+
+def hash_data(df: pd.DataFrame, sheets: dict[str, pd.DataFrame] | None = None) -> str:
+    """
+    Content hash of the data: column names, dtypes and cell values
+    of the DataFrame and of all the sheets, independent of the file
+    the data was read from.
+    """
+    hasher = hashlib.sha256()
+    frames = [("", df)] + (sorted(sheets.items()) if sheets is not None else [])
+
+    for name, frame in frames:
+        hasher.update(
+            json.dumps(
+                [name, [str(col) for col in frame.columns], [str(dtype) for dtype in frame.dtypes]],
+                ensure_ascii=False,
+            ).encode("utf-8")
+        )
+        hasher.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+
+    return hasher.hexdigest()
+
+
+def field_cache_key(field: dict, data_hash: str, exact_arithm: bool) -> str | None:
+    """
+    Hash of the canonical form of a compiled field (procedure, strictness,
+    columns, codes, parsed formula) and of the data it is computed from.
+    The parsed formula is used instead of its text, so formulas that differ
+    only by whitespace or redundant parentheses share the same entry.
+
+    Returns None for the formulas nested too deep to be serialized
+    (over the recursion limit of `json`): they are not cached.
+    """
+    key_source = {
+        "cache_version": RESULT_CACHE_VERSION,
+        "template_version": cmpl.TEMPLATE_FORMAT_VERSION,
+        "parser_version": fp.PARSER_VERSION,
+        "data": data_hash,
+        "procedure": field["procedure"],
+        "strict": field["procedure"] != cnst.MICRO_CALC_FLEXI,
+        "exact_arithm": exact_arithm,
+        "account_col_name": field["account_col_name"],
+        "program": field.get("program"),
+        "account_code": field.get("account_code"),
+        "value_col_name": field.get("value_col_name"),
+    }
+
+    try:
+        serialized = json.dumps(
+            key_source, sort_keys=True, ensure_ascii=False, separators=(",", ":")
+        )
+    except RecursionError:
+        return None
+
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def _to_builtin(val):
+    """
+    Convert the numpy scalars (ex. the sum of an integer column) for JSON.
+    """
+    if hasattr(val, "item"):
+        return val.item()
+    raise TypeError(f"Object of type {type(val).__name__} is not JSON serializable")
+
+
+class ResultCache:
+    """
+    Cache of the (value, error) results of the fields: an in-memory LRU
+    in front of a SQLite file shared by the processes.
+
+    The SQLite failures are ignored (the entries are kept only in memory):
+    the cache is only an optimization.
+
+    Parameters:
+    ----------
+    db_path (str | None):
+        Path of the SQLite file, or None to keep the results only in memory.
+
+    max_memory_entries (int):
+        Max. number of results kept in memory.
+
+    max_disk_entries (int):
+        Max. number of results kept in the SQLite file; the least recently
+        stored ones are removed first.
+    """
+
+    def __init__(
+        self,
+        db_path: str | None,
+        max_memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        max_disk_entries: int = DEFAULT_DISK_ENTRIES,
+    ):
+        self.db_path = db_path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: OrderedDict[str, tuple] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path, timeout=10)
+
+        if not self._db_ready:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS results"
+                " (key TEXT PRIMARY KEY, result TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS results_stored_at ON results (stored_at)"
+            )
+            self._db_ready = True
+
+        return connection
+
+    def _remember(self, key: str, result: tuple):
+        with self._lock:
+            self._memory[key] = result
+            self._memory.move_to_end(key)
+
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def get_many(self, keys: list[str]) -> dict[str, tuple]:
+        """
+        Returns the cached (value, error) tuples of the keys found,
+        looking first in memory and then, in a single pass, in the SQLite file.
+        """
+        found = {}
+
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+
+        if (self.db_path is None) or (len(missing) == 0):
+            return found
+
+        try:
+            connection = self._connect()
+            try:
+                for idx in range(0, len(missing), _QUERY_CHUNK):
+                    chunk = missing[idx : idx + _QUERY_CHUNK]
+                    rows = connection.execute(
+                        "SELECT key, result FROM results WHERE key IN"
+                        f" ({','.join('?' * len(chunk))})",
+                        chunk,
+                    ).fetchall()
+
+                    for key, result in rows:
+                        value, error = json.loads(result)
+                        found[key] = (value, error)
+                        self._remember(key, (value, error))
+            finally:
+                connection.close()
+        except Exception:
+            pass
+
+        return found
+
+    def put_many(self, entries: dict[str, tuple]):
+        """
+        Store the (value, error) tuples, in memory and in the SQLite file,
+        in a single transaction.
+        """
+        if len(entries) == 0:
+            return
+
+        rows = []
+        stored_at = time.time()
+
+        for key, (value, error) in entries.items():
+            try:
+                serialized = json.dumps([value, error], default=_to_builtin)
+            except Exception:
+                continue
+            value, error = json.loads(serialized)
+            self._remember(key, (value, error))
+            rows.append((key, serialized, stored_at))
+
+        if self.db_path is None:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO results (key, result, stored_at) VALUES (?, ?, ?)",
+                        rows,
+                    )
+                    connection.execute(
+                        "DELETE FROM results WHERE key IN (SELECT key FROM results"
+                        " ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                        (self.max_disk_entries,),
+                    )
+            finally:
+                connection.close()
+        except Exception:
+            pass
+
+    def clear(self):
+        """
+        Remove all the cached results, in memory and on disk.
+        """
+        with self._lock:
+            self._memory.clear()
+
+        if self.db_path is None:
+            return
+
+        try:
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.execute("DELETE FROM results")
+            finally:
+                connection.close()
+        except Exception:
+            pass
+
+
+_default_cache: ResultCache | None = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> ResultCache:
+    """
+    Returns the results cache of the process, stored in the SQLite file given by
+    the `RFC_RESULT_CACHE_PATH` environment variable, or ~/.cache/rfc/results.sqlite.
+    """
+    global _default_cache
+
+    db_path = os.environ.get(RESULT_CACHE_PATH_ENV, DEFAULT_RESULT_CACHE_PATH)
+    db_path = db_path if len(db_path) > 0 else None
+
+    with _default_cache_lock:
+        if (_default_cache is None) or (_default_cache.db_path != db_path):
+            _default_cache = ResultCache(db_path)
+
+        return _default_cache
@@ -0,0 +1,201 @@
+import time
+import heapq
+import inputs as inp
+import constants as cnst
+import prefork
+
+# Estimated time (seconds) of computing a field: a fixed part and a part
+# growing with the size of the data
+FIELD_SECONDS = 0.0005
+FIELD_SECONDS_PER_MB = 0.0015
+
+# Estimated fixed time (seconds) of a job: reading the settings, scheduling
+JOB_SECONDS = 0.01
+
+
+def count_fields(field_names_path: str) -> int:
+    """
+    Number of fields objects in a fields settings JSON file (0 if it cannot be read).
+    """
+    jsn_inp_obj, jsn_inp_reading_error = inp.read_db_fields_json(field_names_path)
+
+    if (len(jsn_inp_reading_error) > 0) or (not isinstance(jsn_inp_obj, dict)):
+        return 0
+
+    return sum(
+        len(objs_list)
+        for key, objs_list in jsn_inp_obj.items()
+        if (key in cnst.PROCEDURES_MAP) and isinstance(objs_list, list)
+    )
+
+
+def estimate_job_cost(data_file_path: str | list[str], n_fields: int) -> float:
+    """
+    Estimated computation time (seconds) of a job, from the size and the format
+    of its data files (see `inputs.estimate_load_seconds`) and the number of its fields.
+    """
+    file_paths = [data_file_path] if isinstance(data_file_path, str) else data_file_path
+    cost = JOB_SECONDS
+
+    for file_path in file_paths:
+        cost += inp.estimate_load_seconds(file_path)
+        cost += n_fields * (FIELD_SECONDS + FIELD_SECONDS_PER_MB * inp.file_size_mb(file_path))
+
+    return cost
+
+
+def plan_longest_first(costs: list[float], workers: int) -> tuple[list[int], float]:
+    """
+    Longest processing time first schedule: the tasks are started in decreasing
+    order of their cost, each by the first worker that becomes free.
+
+    Returns:
+    ----------
+    A tuple:
+        - the positions of the tasks, in the order to start them
+        - the predicted makespan (the time the last worker finishes, seconds)
+    """
+    order = sorted(range(len(costs)), key=lambda idx: costs[idx], reverse=True)
+    loads = [0.0] * max(1, min(workers, len(costs)))
+
+    for idx in order:
+        heapq.heapreplace(loads, loads[0] + costs[idx])
+
+    return (order, max(loads))
+
+
+def bucket_small_jobs(costs: list[float], bucket_cost: float) -> list[list[int]]:
+    """
+    Group the jobs cheaper than `bucket_cost` in buckets of about `bucket_cost`,
+    computed one after another by the same worker; the other jobs are alone
+    in their bucket.
+
+    Returns:
+    ----------
+    The positions of the jobs of each bucket.
+    """
+    buckets = []
+    bucket = []
+    bucket_total = 0.0
+
+    for idx in sorted(range(len(costs)), key=lambda idx: costs[idx], reverse=True):
+        if costs[idx] >= bucket_cost:
+            buckets.append([idx])
+            continue
+
+        bucket.append(idx)
+        bucket_total += costs[idx]
+
+        if bucket_total >= bucket_cost:
+            buckets.append(bucket)
+            bucket = []
+            bucket_total = 0.0
+
+    if len(bucket) > 0:
+        buckets.append(bucket)
+
+    return buckets
+
+
+def run_batch(
+    jobs: list[tuple[str, str | list[str]]],
+    pool: prefork.PreforkPool | None = None,
+    processes: int | None = None,
+    bucket_cost: float | None = None,
+    **options,
+) -> tuple[list[list[dict]], dict]:
+    """
+    Compute many (fields settings path, data file path) jobs on a pool of workers,
+    the most expensive first (see `estimate_job_cost`, `plan_longest_first`),
+    so a large .xlsx file does not start last and stretch the total time.
+
+    Parameters:
+    ----------
+    jobs (list[tuple[str, str | list[str]]]):
+        Paths of the fields settings and of the data file(s) of each job.
+
+    pool (prefork.PreforkPool | None):
+        Pool of workers to use (ex. of a service); by default a new pool
+        is created for the batch and closed at the end.
+
+    processes (int | None):
+        Number of workers of the new pool; by default the number of CPUs.
+
+    bucket_cost (float | None):
+        If given, the jobs cheaper than this estimated time (seconds) are grouped
+        and computed by the same worker, see `bucket_small_jobs`.
+
+    options:
+        Keyword arguments of `computation.compute_fields`, for all the jobs.
+
+    Returns:
+    ----------
+    A tuple:
+        - the results of each job (list of lists of dictionaries), in the order of `jobs`
+        - report (dict): `workers`, `tasks` (number of buckets), `predicted_makespan`
+        and `actual_makespan` (seconds), `jobs` (`predicted` and `actual` time of each job)
+    """
+    fields_counts = {}
+
+    for field_names_path, _ in jobs:
+        if field_names_path not in fields_counts:
+            fields_counts[field_names_path] = count_fields(field_names_path)
+
+    costs = [
+        estimate_job_cost(data_file_path, fields_counts[field_names_path])
+        for field_names_path, data_file_path in jobs
+    ]
+
+    buckets = (
+        bucket_small_jobs(costs, bucket_cost)
+        if bucket_cost is not None
+        else [[idx] for idx in range(len(jobs))]
+    )
+
+    own_pool = pool is None
+
+    if own_pool:
+        pool = prefork.PreforkPool(processes, settings_paths=list(fields_counts))
+
+    order, predicted_makespan = plan_longest_first(
+        [sum(costs[idx] for idx in bucket) for bucket in buckets], pool.processes
+    )
+
+    results = [None] * len(jobs)
+    actual = [None] * len(jobs)
+
+    try:
+        started = time.perf_counter()
+        pending = [
+            (buckets[bucket_idx], pool.submit_batch([jobs[idx] for idx in buckets[bucket_idx]], **options))
+            for bucket_idx in order
+        ]
+
+        for bucket, async_result in pending:
+            for idx, (job_results, seconds) in zip(bucket, async_result.get()):
+                results[idx] = job_results
+                actual[idx] = seconds
+
+        actual_makespan = time.perf_counter() - started
+
+    except BaseException:
+        # The jobs still scheduled are dropped, not waited for
+        if own_pool:
+            pool.terminate()
+        raise
+
+    if own_pool:
+        pool.close()
+
+    report = {
+        "workers": pool.processes,
+        "tasks": len(buckets),
+        "predicted_makespan": predicted_makespan,
+        "actual_makespan": actual_makespan,
+        "jobs": [
+            {"predicted": predicted, "actual": seconds}
+            for predicted, seconds in zip(costs, actual)
+        ],
+    }
+
+    return (results, report)
@@ -0,0 +1,204 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+import constants as cnst
+import compiler as cmpl
+import formulaparser as fp
+
+# Version of the cache entries; change it to invalidate all the cached templates
+TEMPLATE_CACHE_VERSION = 1
+
+# Environment variable with the cache folder; an empty value disables the cache
+TEMPLATE_CACHE_DIR_ENV = "RFC_TEMPLATE_CACHE_DIR"
+DEFAULT_TEMPLATE_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "rfc", "templates"
+)
+
+# Max. number of compiled templates kept in the memory of the process
+DEFAULT_MEMORY_ENTRIES = 256
+
+# Compiled templates by cache key, in front of the on-disk cache; filled before forking
+# the workers (see `prefork.preload`), they are shared by all the workers
+_memory_templates: OrderedDict[str, dict] = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def get_cache_dir() -> str | None:
+    """
+    Returns the folder of the compiled templates cache, or None if the cache is disabled.
+    """
+    cache_dir = os.environ.get(TEMPLATE_CACHE_DIR_ENV, DEFAULT_TEMPLATE_CACHE_DIR)
+
+    if len(cache_dir) == 0:
+        return None
+
+    return cache_dir
+
+
+def template_cache_key(jsn_inp_obj: dict) -> str:
+    """
+    Hash of everything the compiled template depends on: the fields settings,
+    the separators used by the parser, the parser, template format and cache versions.
+
+    Only the presence of the `special_rfc` key is hashed, not its value:
+    the template contains both variants, so toggling the flag reuses the same entry.
+    """
+    key_source = {
+        "cache_version": TEMPLATE_CACHE_VERSION,
+        "template_version": cmpl.TEMPLATE_FORMAT_VERSION,
+        "parser_version": fp.PARSER_VERSION,
+        "separators": [
+            cnst.SPECIAL_RFC_SPLIT_SEP,
+            cnst.MICRO_CALC_FIELDS_SPLIT_SEP,
+            cnst.MICRO_CALC_SUPLIM_CHARS,
+            cnst.MICRO_CALC_SHEET_SEP,
+            cnst.MULTI_FORMULAS_FIELDS_SPLIT_SEP,
+        ],
+        "special_rfc": cnst.SPECIAL_RFC in jsn_inp_obj,
+        "settings": {
+            key: val for key, val in jsn_inp_obj.items() if key != cnst.SPECIAL_RFC
+        },
+    }
+
+    serialized = json.dumps(
+        key_source, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str
+    )
+
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def load_cached_template(cache_dir: str, key: str) -> dict | None:
+    """
+    Returns the cached template for the key, or None if it is missing,
+    unreadable or created by another version.
+    """
+    try:
+        with open(os.path.join(cache_dir, f"{key}.json"), "r", encoding="utf-8") as file:
+            entry = json.load(file)
+    except Exception:
+        return None
+
+    if (
+        (not isinstance(entry, dict))
+        or (entry.get("cache_version") != TEMPLATE_CACHE_VERSION)
+        or (entry.get("key") != key)
+    ):
+        return None
+
+    template = entry.get("template")
+
+    if (not isinstance(template, dict)) or (
+        template.get("version") != cmpl.TEMPLATE_FORMAT_VERSION
+    ):
+        return None
+
+    return template
+
+
+def store_cached_template(cache_dir: str, key: str, template: dict):
+    """
+    Write the template to the cache. The file is written under a temporary name
+    and then renamed, so concurrent processes never read a partial entry.
+    Failures are ignored: the cache is only an optimization.
+    """
+    entry = {
+        "cache_version": TEMPLATE_CACHE_VERSION,
+        "key": key,
+        "template": template,
+    }
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(entry, file, ensure_ascii=False)
+            os.replace(tmp_path, os.path.join(cache_dir, f"{key}.json"))
+        except Exception:
+            os.remove(tmp_path)
+            raise
+    except Exception:
+        pass
+
+
+def remember_template(key: str, template: dict):
+    """
+    Keep a compiled template in the memory of the process,
+    dropping the least recently used ones over `DEFAULT_MEMORY_ENTRIES`.
+    """
+    with _memory_lock:
+        _memory_templates[key] = template
+        _memory_templates.move_to_end(key)
+
+        while len(_memory_templates) > DEFAULT_MEMORY_ENTRIES:
+            _memory_templates.popitem(last=False)
+
+
+def recall_template(key: str) -> dict | None:
+    """
+    Returns the compiled template kept in memory for the key, or None.
+    """
+    with _memory_lock:
+        template = _memory_templates.get(key)
+
+        if template is not None:
+            _memory_templates.move_to_end(key)
+
+        return template
+
+
+def get_compiled_template(
+    jsn_inp_obj: dict, cache_dir: str | None = None
+) -> tuple[dict, str | None]:
+    """
+    Same as `compiler.compile_template`, but the compiled template is looked up
+    first in the memory of the process and then in the on-disk cache,
+    so an unchanged settings object is parsed only once across processes.
+    The templates kept in memory are shared by the requests: they must not be modified.
+
+    Parameters:
+    ----------
+    jsn_inp_obj (dict):
+        Fields settings, as read from the JSON file.
+
+    cache_dir (str | None):
+        Cache folder; by default taken from the `RFC_TEMPLATE_CACHE_DIR`
+        environment variable, or ~/.cache/rfc/templates.
+
+    Returns:
+    ----------
+    A tuple:
+        - template (dict)
+        - global error (str) or None
+    """
+    cache_dir = cache_dir if cache_dir is not None else get_cache_dir()
+    key = template_cache_key(jsn_inp_obj)
+    # Select the variant for the current value of the flag
+    special_rfc = True if jsn_inp_obj.get(cnst.SPECIAL_RFC) else False
+
+    template = recall_template(key)
+
+    if (template is None) and (cache_dir is not None):
+        template = load_cached_template(cache_dir, key)
+
+        if template is not None:
+            remember_template(key, template)
+
+    if template is not None:
+        return ({**template, "special_rfc": special_rfc}, None)
+
+    template, template_error = cmpl.compile_template(jsn_inp_obj)
+
+    if template_error is None:
+        remember_template(key, template)
+
+        if cache_dir is not None:
+            store_cached_template(cache_dir, key, template)
+
+        template = {**template, "special_rfc": special_rfc}
+
+    return (template, template_error)
@@ -0,0 +1,61 @@
+import os
+import sys
+import json
+import pytest
+
+# The modules of the package are at the root of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the compiled templates and the results only in memory while testing
+os.environ.setdefault("RFC_TEMPLATE_CACHE_DIR", "")
+os.environ.setdefault("RFC_RESULT_CACHE_PATH", "")
+
+# Fields settings with all the procedures, for the tests of the computation paths
+FIELDS_SETTINGS = {
+    "micro_calculator": [
+        {"id": 1, "account_col_name": "cont", "micro_formula": "sc@401 + sd@411 * 2"},
+        {"id": 2, "account_col_name": "cont", "micro_formula": "rc@121 - rd@121"},
+        {"id": 3, "account_col_name": "cont", "micro_formula": "sc@401 / sd@401"},
+        {"id": 4, "account_col_name": "cont", "micro_formula": "sc@999 + 1"},
+    ],
+    "micro_calculator_flexi": [
+        {"id": 5, "account_col_name": "cont", "micro_formula": "sc@999 + sc@401"},
+    ],
+    "single_cell": [
+        {"id": 6, "account_col_name": "cont", "account_code": "411", "value_col_name": "sd"},
+    ],
+    "sum_many_rows_same_col": [
+        {"id": 7, "account_col_name": "cont", "account_code": "401,411,121", "value_col_name": "rc"},
+    ],
+    "subtract_same_row_two_cols": [
+        {"id": 8, "account_col_name": "cont", "account_code": "121", "value_col_name": "rc,rd"},
+    ],
+}
+
+TRIAL_BALANCE_CSV = (
+    "cont,sd,sc,rd,rc\n"
+    "121,0,0,150.5,400.25\n"
+    "1011,0,0,0,1000\n"
+    "401,0,2500.75,0,12.5\n"
+    "411,3200.1,0,0,0\n"
+    "4423,0,310.4,20,10\n"
+)
+
+
+@pytest.fixture
+def fields_settings() -> dict:
+    return json.loads(json.dumps(FIELDS_SETTINGS))
+
+
+@pytest.fixture
+def settings_path(tmp_path, fields_settings) -> str:
+    path = tmp_path / "fields.json"
+    path.write_text(json.dumps(fields_settings), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def data_path(tmp_path) -> str:
+    path = tmp_path / "balanta.csv"
+    path.write_text(TRIAL_BALANCE_CSV, encoding="utf-8")
+    return str(path)
@@ -0,0 +1,135 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+import accountcodes as acc
+import computation
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        ("0401", "401"),
+        ("00401.01", "401.01"),
+        ("0", "0"),
+        ("000", "0"),
+        (401, "401"),
+        (np.int64(401), "401"),
+        (401.0, "401"),
+        (np.float64(401.0), "401"),
+        ("401.0", "401"),
+        ("401.00", "401"),
+        ("401_01", "401.01"),
+        ("4423_1_2", "4423.1.2"),
+        (" 401 ", "401"),
+        ("40 1.0 1", "401.01"),
+        ("\t411_1\n", "411.1"),
+        ("AB_01", "AB.01"),
+        ("", ""),
+    ],
+)
+def test_canonical_account_code(code, expected):
+    assert acc.canonical_account_code(code) == expected
+
+
+def test_analytic_trailing_zeros_are_kept_in_text():
+    # "401.10" and "401.1" are different analytic accounts
+    assert acc.canonical_account_code("401.10") == "401.10"
+    assert acc.canonical_account_code("401.1") == "401.1"
+    assert acc.canonical_account_code("401_10") == acc.canonical_account_code("401.10")
+    # A float cell cannot keep the trailing zero: Excel stored 401.10 as 401.1
+    assert acc.canonical_account_code(401.10) == "401.1"
+
+
+def test_missing_code_is_not_a_number_code():
+    assert acc.canonical_account_code(float("nan")) == "nan"
+
+
+def test_normalize_account_columns_in_place():
+    df = pd.DataFrame({"cont": [401.0, "0411", "4423_1", 121], "sc": [1.0, 2.0, 3.0, 4.0]})
+    other = pd.DataFrame({"sc": [1.0]})
+
+    acc.normalize_account_columns([df, df, other], ["cont"])
+
+    assert df["cont"].tolist() == ["401", "411", "4423.1", "121"]
+    assert acc.is_canonical_column(df["cont"])
+    assert list(other.columns) == ["sc"]
+
+
+def test_settings_codes_match_the_data_codes():
+    assert acc.canonicalize_codes_list("0401,411_1, 121.0", ",") == "401,411.1,121"
+    assert acc.canonicalize_term("sc@0401", "@", "!") == "sc@401"
+    assert acc.canonicalize_term("Detalii!sd@401_01", "@", "!") == "Detalii!sd@401.01"
+    assert acc.canonicalize_term("123.5", "@", "!") == "123.5"
+
+
+def rollup_of(rollup_index: dict, values: list) -> dict:
+    totals, has_missing, has_text = acc.rollup_totals(rollup_index, pd.Series(values, dtype="object"))
+    return {
+        code: (float(totals[label]), bool(has_missing[label]), bool(has_text[label]))
+        for code, label in rollup_index["codes"].items()
+    }
+
+
+def test_code_ancestors():
+    assert acc.code_ancestors("4423.01.5") == ["4423.01", "4423", "442", "44", "4"]
+    assert acc.code_ancestors("401") == ["40", "4"]
+    assert acc.code_ancestors("AB.1") == ["AB"]
+
+
+def test_rollup_stops_at_the_nearest_present_ancestor():
+    codes = pd.Series(["401.01", "401.02", "44", "4423.01", "4424"], dtype="str")
+
+    rollup_index = acc.build_rollup_index(codes)
+    totals = rollup_of(rollup_index, [10.0, 5.5, 100.0, 1.0, 2.0])
+
+    # 401 and its ancestors have no row: 401.01 and 401.02 roll up to all of them
+    assert totals["401"] == (15.5, False, False)
+    assert totals["40"] == (15.5, False, False)
+    # 44 has a row: 4423.01 and 4424 stop there, so 44 is not counted twice in 4
+    assert totals["4423"] == (1.0, False, False)
+    assert totals["442"] == (3.0, False, False)
+    assert "44" not in totals
+    assert totals["4"] == (115.5, False, False)
+
+
+def test_rollup_of_duplicated_codes_sums_all_their_rows():
+    codes = pd.Series(["401.01", "401.01", "401.02"], dtype="str")
+
+    totals = rollup_of(acc.build_rollup_index(codes), [1.0, 2.0, 4.0])
+
+    assert totals["401"] == (7.0, False, False)
+
+
+def test_rollup_totals_flag_missing_and_text_values():
+    codes = pd.Series(["401.01", "401.02", "411.01", "411.02"], dtype="str")
+
+    totals = rollup_of(acc.build_rollup_index(codes), [1.0, None, 2.0, "n/a"])
+
+    assert totals["401"] == (1.0, True, False)
+    assert totals["411"] == (2.0, False, True)
+
+
+def test_profile_reports_the_codes_resolved_by_rollup(tmp_path, data_path):
+    settings_path = tmp_path / "rollup.json"
+    settings_path.write_text(
+        json.dumps(
+            {
+                "micro_calculator": [
+                    {"id": 1, "account_col_name": "cont", "micro_formula": "sc@401 + sc@44"},
+                    {"id": 2, "account_col_name": "cont", "micro_formula": "sc@44 - sc@4423"},
+                    {"id": 3, "account_col_name": "cont", "micro_formula": "sc@999"},
+                ]
+            }
+        ),
+        encoding="utf-8",
+    )
+    profile = {}
+
+    results = computation.compute_fields(str(settings_path), data_path, profile=profile)
+
+    # 44 has no row: it is the total of 4423 (a typo of 4423 would resolve the same way)
+    assert [record["value"] for record in results[:2]] == [2811.15, 0.0]
+    assert profile["rollup_codes"] == [
+        {"sheet": None, "account_col_name": "cont", "code": "44", "fields": [1, 2]}
+    ]
@@ -0,0 +1,91 @@
+import json
+import pandas as pd
+import pytest
+import compactframes as cfr
+import computation
+import numericvalues as nval
+
+# Amounts with 2 decimals which float32 does not store exactly, and rollups
+COMPACT_CSV = (
+    "cont,denumire,sd,sc,rd,rc\n"
+    "121,Profit,0,0,150.53,400.27\n"
+    "401.01,Furnizor A,0,1234.56,0,12.51\n"
+    "401.02,Furnizor B,0,765.43,0,0.13\n"
+    "411,Clienti,3200.11,0,0,0\n"
+    "4423,TVA,0,310.47,20.01,10.09\n"
+)
+
+COMPACT_SETTINGS = {
+    "micro_calculator": [
+        {"id": 1, "account_col_name": "cont", "micro_formula": "sc@401.01"},
+        {"id": 2, "account_col_name": "cont", "micro_formula": "sc@401 + sd@411"},
+        {"id": 3, "account_col_name": "cont", "micro_formula": "rc@121 - rd@121"},
+    ],
+    "micro_calculator_flexi": [
+        {"id": 4, "account_col_name": "cont", "micro_formula": "sc@4423 + sc@999"},
+    ],
+    "single_cell": [
+        {"id": 5, "account_col_name": "cont", "account_code": "401.02", "value_col_name": "sc"},
+    ],
+    "sum_many_rows_same_col": [
+        {"id": 6, "account_col_name": "cont", "account_code": "401.01,401.02,121", "value_col_name": "rc"},
+    ],
+    "subtract_same_row_two_cols": [
+        {"id": 7, "account_col_name": "cont", "account_code": "4423", "value_col_name": "rd,rc"},
+    ],
+}
+
+
+@pytest.fixture
+def compact_inputs(tmp_path) -> tuple[str, str]:
+    settings_path = tmp_path / "compact.json"
+    settings_path.write_text(json.dumps(COMPACT_SETTINGS), encoding="utf-8")
+    data_path = tmp_path / "compact.csv"
+    data_path.write_text(COMPACT_CSV, encoding="utf-8")
+    return (str(settings_path), str(data_path))
+
+
+@pytest.mark.parametrize("float_dtype", cfr.FLOAT_DTYPES)
+def test_compact_results_match_the_full_data(compact_inputs, float_dtype):
+    settings_path, data_path = compact_inputs
+
+    expected = computation.compute_fields(settings_path, data_path)
+    compact = computation.compute_fields(settings_path, data_path, compact=float_dtype)
+
+    assert compact == expected
+    assert {record["id"]: record["value"] for record in compact}[1] == 1234.56
+
+
+def test_compact_profile_reports_the_memory(compact_inputs):
+    settings_path, data_path = compact_inputs
+    profile = {}
+
+    computation.compute_fields(settings_path, data_path, compact="float32", profile=profile)
+
+    report = profile["memory"][0]
+    # The names column is not used by the fields
+    assert (report["columns_before"], report["columns_after"]) == (6, 5)
+    assert report["bytes_after"] < report["bytes_before"]
+
+
+def test_compact_frame_keeps_the_used_columns():
+    df = pd.DataFrame(
+        {
+            "cont": pd.Series(["401", "411"], dtype="str"),
+            "denumire": ["Furnizori", "Clienti"],
+            "sc": [1234.56, 0.5],
+            "nr": [1, 2],
+        }
+    )
+
+    compact, _ = cfr.compact_frame(df, ["cont"], ["sc", "nr"], "float32")
+
+    assert compact.columns.tolist() == ["cont", "sc", "nr"]
+    assert (str(compact["sc"].dtype), str(compact["nr"].dtype)) == ("float32", "int64")
+    assert df["sc"].dtype == "float64"
+    assert nval.read_cells(compact["sc"]).tolist() == [1234.56, 0.5]
+
+
+def test_unknown_float_dtype():
+    with pytest.raises(ValueError):
+        cfr.compact_frame(pd.DataFrame({"cont": ["401"]}), ["cont"], [], "float16")
@@ -0,0 +1,164 @@
+import copy
+import json
+import compiler as cmpl
+import computation
+import errorcodes as errcd
+import inputs as inp
+
+
+def test_settings_errors_before_reading_the_data(monkeypatch, tmp_path, fields_settings):
+    def read_data_file(file_path):
+        raise AssertionError("the data is read after a settings error")
+
+    monkeypatch.setattr(inp, "read_data_file", read_data_file)
+
+    broken_fields = [
+        [],
+        ["401"],
+        [{"id": 6, "account_col_name": "cont"}],
+        [{"id": 6, "account_col_name": 401, "account_code": "4", "value_col_name": "sd"}],
+    ]
+
+    for single_cell in broken_fields:
+        settings = {**fields_settings, "single_cell": single_cell}
+        template, error = cmpl.compile_template(settings)
+        assert (template, isinstance(error, str)) == ({}, True)
+
+        settings_path = tmp_path / "fields.json"
+        settings_path.write_text(json.dumps(settings), encoding="utf-8")
+
+        results = computation.compute_fields(str(settings_path), str(tmp_path / "balanta.csv"))
+        assert results == [{"global_error": error}]
+
+
+def test_field_settings_errors_are_kept_per_field(fields_settings):
+    fields_settings["micro_calculator"].append(
+        {"id": 9, "account_col_name": "cont", "micro_formula": "sc@401 + * 2"}
+    )
+
+    template, error = cmpl.compile_template(fields_settings)
+    fields = {field["id"]: field for field in cmpl.get_template_fields(template)}
+
+    assert error is None
+    assert fields[9]["program"] is None
+    assert fields[9]["error"] is not None
+    assert fields[1]["error"] is None
+
+
+def test_field_settings_errors_are_codes(fields_settings, settings_path, data_path):
+    fields_settings["micro_calculator"].append(
+        {"id": 9, "account_col_name": "cont", "micro_formula": "sc@401 + * 2"}
+    )
+    fields_settings["sum_many_rows_same_col"].append(
+        {"id": 10, "account_col_name": "cont", "account_code": "401", "value_col_name": "rc"}
+    )
+    with open(settings_path, "w", encoding="utf-8") as j_file:
+        json.dump(fields_settings, j_file)
+
+    template, _ = cmpl.compile_template(fields_settings)
+    fields = {field["id"]: field for field in cmpl.get_template_fields(template)}
+
+    assert fields[9]["error"]["code"] == "formula_syntax"
+    assert fields[10]["error"] == {"code": "sum_codes_too_few", "params": {}}
+    assert cmpl.load_template(cmpl.dump_template(template)) == (template, None)
+
+    codes = computation.compute_fields(settings_path, data_path, error_format=errcd.CODE_ERRORS)
+    texts = computation.compute_fields(settings_path, data_path)
+
+    errors = {result["id"]: result["error"] for result in codes}
+
+    assert (errors[9]["code"], errors[10]["code"]) == ("formula_syntax", "sum_codes_too_few")
+    for code_result, text_result in zip(codes, texts):
+        assert errcd.render_error(code_result["error"]) == text_result["error"]
+
+
+def test_compile_does_not_modify_the_settings(fields_settings):
+    original = copy.deepcopy(fields_settings)
+
+    cmpl.compile_template(fields_settings)
+
+    assert fields_settings == original
+
+
+def test_canonical_codes_in_the_compiled_fields():
+    settings = {
+        "micro_calculator": [{"id": 1, "account_col_name": "cont", "micro_formula": "sc@0401 + sd@411_1"}],
+        "single_cell": [{"id": 2, "account_col_name": "c ont", "account_code": "0401", "value_col_name": " sd"}],
+    }
+
+    template, _ = cmpl.compile_template(settings)
+    micro, single = cmpl.get_template_fields(template)
+
+    assert micro["program"] == [["sc@401", "+", "sd@411.1"]]
+    assert (single["account_col_name"], single["account_code"], single["value_col_name"]) == (
+        "cont",
+        "401",
+        "sd",
+    )
+
+
+def test_template_round_trip(fields_settings):
+    template, _ = cmpl.compile_template(fields_settings)
+
+    assert cmpl.load_template(cmpl.dump_template(template)) == (template, None)
+
+    outdated = cmpl.dump_template({**template, "version": cmpl.TEMPLATE_FORMAT_VERSION - 1})
+    assert cmpl.load_template(outdated)[0] == {}
+    assert cmpl.load_template("{")[0] == {}
+
+
+def test_apply_template_matches_compute_fields(fields_settings, settings_path, data_path):
+    template, _ = cmpl.compile_template(fields_settings)
+
+    assert computation.apply_template(template, data_path) == computation.compute_fields(
+        settings_path, data_path
+    )
+
+
+def test_split_special_values():
+    obj = {"id": 1, "key": "Profit", "account_col_name": "cont", "micro_formula": "sc@401 : sd@411"}
+    original = copy.deepcopy(obj)
+
+    normal, special = cmpl.split_special_jsn_vals(obj, ":")
+
+    assert normal == {"id": 1, "account_col_name": "cont", "micro_formula": "sc@401 "}
+    assert special == {"id": 1, "account_col_name": "cont", "micro_formula": " sd@411"}
+    assert obj == original
+
+
+def test_split_without_separator_shares_the_variant():
+    normal, special = cmpl.split_special_jsn_vals(
+        {"id": 1, "account_col_name": "cont", "micro_formula": "sc@401"}, ":"
+    )
+
+    assert normal is special
+
+
+def test_special_rfc_selects_the_variant(tmp_path, data_path):
+    settings = {
+        "micro_calculator": [{"id": 1, "account_col_name": "cont", "micro_formula": "sc@401 : sd@411"}],
+        "single_cell": [{"id": 2, "account_col_name": "cont", "account_code": "401:411", "value_col_name": "sc:sd"}],
+        "sum_many_rows_same_col": [
+            {"id": 3, "account_col_name": "cont", "account_code": "121,401", "value_col_name": "rc"}
+        ],
+    }
+    values = {}
+
+    for special_rfc in (False, True):
+        settings_path = tmp_path / f"fields_{special_rfc}.json"
+        settings_path.write_text(json.dumps({**settings, "special_rfc": special_rfc}), encoding="utf-8")
+        results = computation.compute_fields(str(settings_path), data_path)
+        values[special_rfc] = [record["value"] for record in results]
+
+    assert values[False] == [2500.75, 2500.75, 412.75]
+    assert values[True] == [3200.1, 3200.1, 412.75]
+
+
+def test_both_variants_compiled_once(fields_settings):
+    template, _ = cmpl.compile_template({**fields_settings, "special_rfc": False})
+
+    # Without a separator in the values, the variants share the compiled fields
+    for normal, special in zip(
+        cmpl.get_template_fields(template, False), cmpl.get_template_fields(template, True)
+    ):
+        assert normal is special
@@ -0,0 +1,68 @@
+import json
+import computation
+import errorcodes as errcd
+
+
+def write_inputs(tmp_path) -> tuple[str, list[str]]:
+    settings = {
+        "micro_calculator": [
+            {"id": 1, "account_col_name": "cont", "micro_formula": "sc@401 + sc@411"},
+            {"id": 2, "account_col_name": "cont", "micro_formula": "sc@401 / sd@401"},
+        ],
+        "single_cell": [
+            {"id": 3, "account_col_name": "cont", "account_code": "411", "value_col_name": "sc"}
+        ],
+    }
+    settings_path = tmp_path / "settings.json"
+    settings_path.write_text(json.dumps(settings))
+
+    frames = {
+        "alfa": "cont,sd,sc\n401,2,10\n411,0,5\n",
+        "beta": "cont,sd,sc\n401,0,7\n",
+    }
+    data_paths = []
+
+    for name, content in frames.items():
+        data_path = tmp_path / f"{name}.csv"
+        data_path.write_text(content)
+        data_paths.append(str(data_path))
+
+    return (str(settings_path), data_paths)
+
+
+def test_consolidated_error_codes_render_as_texts(tmp_path):
+    settings_path, data_paths = write_inputs(tmp_path)
+
+    texts = computation.compute_consolidated(settings_path, data_paths)
+    codes = computation.compute_consolidated(
+        settings_path, data_paths, error_format=errcd.CODE_ERRORS
+    )
+
+    for text_record, code_record in zip(texts, codes):
+        assert errcd.render_error(code_record["error"]) == text_record["error"]
+
+        for text_company, code_company in zip(text_record["companies"], code_record["companies"]):
+            assert errcd.render_error(code_company["error"]) == text_company["error"]
+
+    by_id = {record["id"]: record for record in codes}
+
+    assert by_id[1]["companies"][1]["error"]["code"] == "code_missing"
+    assert by_id[2]["companies"][1]["error"]["code"] == "division_by_zero"
+    assert by_id[1]["error"] == {
+        "code": "consolidated_values_missing",
+        "params": {"companies": "`beta`"},
+    }
+    # A missing code counts as 0.0 for the single cell
+    assert (by_id[3]["value"], by_id[3]["error"]) == (5.0, None)
+
+
+def test_time_series_error_codes_render_as_texts(tmp_path):
+    settings_path, data_paths = write_inputs(tmp_path)
+
+    texts = computation.compute_time_series(settings_path, data_paths)
+    codes = computation.compute_time_series(
+        settings_path, data_paths, error_format=errcd.CODE_ERRORS
+    )
+
+    for text_record, code_record in zip(texts, codes):
+        assert [errcd.render_error(error) for error in code_record["errors"]] == text_record["errors"]
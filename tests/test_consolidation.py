@@ -0,0 +1,79 @@
+import pytest
+import computation
+from conftest import TRIAL_BALANCE_CSV
+
+COMPANIES = {
+    "alfa": TRIAL_BALANCE_CSV,
+    "beta": (
+        "cont,sd,sc,rd,rc\n"
+        "121,0,0,10,90.5\n"
+        "401,0,1200.3,0,7.25\n"
+        "411,800.45,0,0,0\n"
+    ),
+    # The first row is not the first code of the other companies
+    "gama": (
+        "cont,sd,sc,rd,rc\n"
+        "411,15,0,0,0\n"
+        "401,4.5,99.99,0,0.01\n"
+        "121,0,0,0.5,3\n"
+        "5121,100,0,0,0\n"
+    ),
+}
+
+
+@pytest.fixture
+def company_paths(tmp_path) -> list[str]:
+    paths = []
+
+    for name, content in COMPANIES.items():
+        path = tmp_path / f"{name}.csv"
+        path.write_text(content, encoding="utf-8")
+        paths.append(str(path))
+
+    return paths
+
+
+def test_company_values_match_each_file(settings_path, company_paths):
+    records = computation.compute_consolidated(settings_path, company_paths)
+
+    for index, path in enumerate(company_paths):
+        expected = computation.compute_fields(settings_path, path)
+
+        assert [
+            {"id": record["id"], **{key: record["companies"][index][key] for key in ("value", "error")}}
+            for record in records
+        ] == expected
+
+
+def test_consolidated_value_is_the_sum_of_the_companies(settings_path, company_paths):
+    records = computation.compute_consolidated(settings_path, company_paths)
+    by_id = {record["id"]: record for record in records}
+
+    # id 1: sc@401 + sd@411 * 2
+    assert by_id[1]["value"] == round((2500.75 + 3200.1 * 2) + (1200.3 + 800.45 * 2) + (99.99 + 15 * 2), 2)
+    assert by_id[7]["value"] == round((400.25 + 12.5) + (90.5 + 7.25) + (3 + 0.01), 2)
+    assert by_id[7]["error"] is None
+    assert [company["company"] for company in by_id[7]["companies"]] == ["alfa", "beta", "gama"]
+
+
+def test_company_without_value_has_no_consolidated_value(settings_path, company_paths):
+    records = computation.compute_consolidated(
+        settings_path, company_paths, company_names=["A", "B", "C"]
+    )
+    by_id = {record["id"]: record for record in records}
+
+    # id 3 divides by sd@401, 0 for alfa and beta
+    assert by_id[3]["value"] is None
+    assert "`A`, `B`" in by_id[3]["error"]
+    assert "`C`" not in by_id[3]["error"]
+    assert by_id[3]["companies"][2]["value"] == round(99.99 / 4.5, 2)
+    assert by_id[3]["companies"][2]["error"] is None
+
+
+def test_unreadable_company_file_is_a_global_error(settings_path, company_paths, tmp_path):
+    records = computation.compute_consolidated(
+        settings_path, company_paths + [str(tmp_path / "lipsa.csv")]
+    )
+
+    assert len(records) == 1
+    assert "global_error" in records[0]
@@ -0,0 +1,149 @@
+import json
+import sqlite3
+import pytest
+import computation
+import dbpool
+import dbsource as dbs
+import inputs as inp
+
+# Analytic accounts without their synthetic account (rolled up), codes stored
+# in other forms (0401.02, 4423_1, 5121.0), a duplicated code and text values
+DB_CSV = (
+    "cont,sd,sc,rd,rc\n"
+    "121,0,0,150.5,400.25\n"
+    "401.01,0,1200.5,0,10\n"
+    "0401.02,0,300.25,0,2.5\n"
+    "411,3200.1,0,0,0\n"
+    "411,5,0,0,0\n"
+    "4423_1,0,310.4,20,10\n"
+    "4424,0,12,n/a,1\n"
+    "5121.0,800,0,0,0\n"
+)
+
+DB_SETTINGS = {
+    "micro_calculator": [
+        {"id": 1, "account_col_name": "cont", "micro_formula": "sc@401 + sd@5121"},
+        {"id": 2, "account_col_name": "cont", "micro_formula": "rc@121 - rd@121"},
+        {"id": 3, "account_col_name": "cont", "micro_formula": "sd@411"},
+        {"id": 4, "account_col_name": "cont", "micro_formula": "rd@442 + sc@44"},
+        {"id": 5, "account_col_name": "cont", "micro_formula": "sc@999"},
+        {"id": 6, "account_col_name": "cont", "micro_formula": "max(sc@4, rc@4423.1)"},
+    ],
+    "micro_calculator_flexi": [
+        {"id": 7, "account_col_name": "cont", "micro_formula": "sc@999 + sc@401.02"},
+    ],
+    "single_cell": [
+        {"id": 8, "account_col_name": "cont", "account_code": "0401_01", "value_col_name": "sc"},
+    ],
+    "sum_many_rows_same_col": [
+        {"id": 9, "account_col_name": "cont", "account_code": "121,4424,999", "value_col_name": "rc"},
+    ],
+    "subtract_same_row_two_cols": [
+        {"id": 10, "account_col_name": "cont", "account_code": "4423.1", "value_col_name": "rc,rd"},
+    ],
+}
+
+
+@pytest.fixture
+def db_inputs(tmp_path) -> tuple[str, str, str]:
+    settings_path = tmp_path / "fields.json"
+    settings_path.write_text(json.dumps(DB_SETTINGS), encoding="utf-8")
+    data_path = tmp_path / "balanta.csv"
+    data_path.write_text(DB_CSV, encoding="utf-8")
+
+    # The table holds the data as read from the file, with the types of its cells
+    df, error = inp.read_data_file(str(data_path))
+    assert error == ""
+    db_path = str(tmp_path / "balante.sqlite")
+    with sqlite3.connect(db_path) as connection:
+        df.to_sql("balanta", connection, index=False)
+    connection.close()
+
+    yield (str(settings_path), str(data_path), db_path)
+
+    dbpool._sqlite_pools.clear()
+
+
+def test_table_results_match_the_file(db_inputs):
+    settings_path, data_path, db_path = db_inputs
+
+    expected = computation.compute_fields(settings_path, data_path)
+
+    assert computation.compute_table_fields(settings_path, db_path, "balanta") == expected
+
+
+def test_indexed_table_results_match_the_file(db_inputs):
+    settings_path, data_path, db_path = db_inputs
+
+    count, error = dbs.index_account_codes(db_path, "balanta", ["cont"])
+    expected = computation.compute_fields(settings_path, data_path)
+
+    assert (count, error) == (7, None)
+    assert computation.compute_table_fields(settings_path, db_path, "balanta") == expected
+
+
+def test_indexed_table_reads_only_the_rows_needed(db_inputs):
+    _, _, db_path = db_inputs
+    dbs.index_account_codes(db_path, "balanta", ["cont"])
+
+    df, table_size, error = dbs.read_table(db_path, "balanta", {"cont": {"401", "5121"}})
+
+    assert error == ""
+    assert table_size == 2 * 5
+    assert df["cont"].tolist() == ["401.01", "0401.02", "5121.0"]
+
+
+def test_changed_table_is_read_without_the_stored_codes(db_inputs):
+    settings_path, data_path, db_path = db_inputs
+    dbs.index_account_codes(db_path, "balanta", ["cont"])
+
+    # A code inserted after the codes were stored
+    with sqlite3.connect(db_path) as connection:
+        connection.execute("INSERT INTO balanta (cont, sd, sc, rd, rc) VALUES ('999', 0, 7.5, 0, 0)")
+    connection.close()
+
+    with open(data_path, "a", encoding="utf-8") as data_file:
+        data_file.write("999,0,7.5,0,0\n")
+
+    results = computation.compute_table_fields(settings_path, db_path, "balanta")
+
+    assert results == computation.compute_fields(settings_path, data_path)
+    assert {record["id"]: record["value"] for record in results}[5] == 7.5
+
+
+def test_table_without_the_codes_used(db_inputs, tmp_path):
+    _, _, db_path = db_inputs
+    settings_path = tmp_path / "other.json"
+    settings_path.write_text(
+        json.dumps(
+            {"micro_calculator": [{"id": 1, "account_col_name": "cont", "micro_formula": "sc@7"}]}
+        ),
+        encoding="utf-8",
+    )
+
+    # No row is read, but the table is not empty: no global error
+    results = computation.compute_table_fields(str(settings_path), db_path, "balanta")
+
+    assert results[0]["value"] is None
+    assert "`7`" in results[0]["error"]
+
+
+def test_empty_table_is_a_global_error(tmp_path, settings_path):
+    db_path = str(tmp_path / "gol.sqlite")
+    with sqlite3.connect(db_path) as connection:
+        connection.execute("CREATE TABLE balanta (cont TEXT, sd REAL)")
+    connection.close()
+
+    results = computation.compute_table_fields(settings_path, db_path, "balanta")
+
+    assert list(results[0]) == ["global_error"]
+    dbpool._sqlite_pools.clear()
+
+
+def test_missing_table_is_a_global_error(db_inputs):
+    settings_path, _, db_path = db_inputs
+
+    results = computation.compute_table_fields(settings_path, db_path, "lipsa")
+
+    assert "`lipsa`" in results[0]["global_error"]
+    assert dbs.index_account_codes(db_path, "lipsa", ["cont"])[1] is not None
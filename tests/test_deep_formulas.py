@@ -0,0 +1,63 @@
+import sys
+import pandas as pd
+import constants as cnst
+import formulaparser as fp
+import microcalc
+
+SUPLIM_CHARS = cnst.MICRO_CALC_FIELDS_SPLIT_SEP + cnst.MICRO_CALC_SUPLIM_CHARS
+
+
+def compute(formula: str, exact_arithm: bool = True):
+    """
+    The formula computed as the fields of a request are: the terms
+    are looked up once, in the term memo (see `microcalc.new_term_memo`).
+    """
+    df = pd.DataFrame({"cont": ["401", "411"], "sc": [2.5, 4.0]})
+    program, error = microcalc.compile_micro_formula(
+        formula,
+        cnst.MICRO_CALC_FIELDS_SPLIT_SEP,
+        cnst.MICRO_CALC_SUPLIM_CHARS,
+        cnst.MICRO_CALC_SHEET_SEP,
+    )
+    assert error is None
+
+    return microcalc.compute_micro_program(
+        df,
+        "cont",
+        program,
+        cnst.MICRO_CALC_FIELDS_SPLIT_SEP,
+        True,
+        exact_arithm,
+        term_memo=microcalc.new_term_memo(),
+    )
+
+
+def test_parentheses_nested_past_recursion_limit():
+    depth = 5 * sys.getrecursionlimit()
+    formula = "(" * depth + "sc@401" + " + 1)" * depth
+
+    assert len(fp.parse_formula(formula, SUPLIM_CHARS)) == 1
+    assert compute(formula) == (2.5 + depth, None)
+
+
+def test_operators_nested_past_recursion_limit():
+    # Alternate the binding powers, so each level is a nested list
+    depth = 5 * sys.getrecursionlimit()
+    formula = "sc@411 / 4" + " * (1 + (0" * depth + "))" * depth
+
+    assert compute(formula) == (1.0, None)
+
+
+def test_functions_and_signs_nested_past_recursion_limit():
+    depth = 5 * sys.getrecursionlimit()
+
+    assert compute("abs(" * depth + "-sc@401" + ")" * depth) == (2.5, None)
+    assert compute("-" * depth + "sc@411") == (4.0, None)
+    assert compute("max(1, " * depth + "sc@411" + ")" * depth) == (4.0, None)
+
+
+def test_long_formula():
+    n_terms = 100_000
+    formula = " + ".join(["sc@401", "sc@411", "1"] * (n_terms // 3))
+
+    assert compute(formula) == (round((2.5 + 4.0 + 1) * (n_terms // 3), 2), None)
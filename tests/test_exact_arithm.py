@@ -0,0 +1,188 @@
+import ast
+import operator
+import random
+import pandas as pd
+import pytest
+import constants as cnst
+import microcalc
+import vectorcalc as vcalc
+
+CODES = [f"40{digit}" for digit in range(1, 10)]
+COLUMNS = ["sd", "sc"]
+OPERATORS = ["+", "-", "*", "/"]
+# Divisors far from zero, so the per-operation rounding cannot divide by zero
+DIVISORS = ["2", "3", "4", "7", "1.5", "0.25"]
+
+
+def make_frame(rnd: random.Random) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "cont": CODES,
+            "sd": [rnd.randint(-10**7, 10**7) / 100 for _ in CODES],
+            "sc": [rnd.randint(-10**5, 10**5) / 100 for _ in CODES],
+        }
+    )
+
+
+def make_formula(rnd: random.Random, depth: int = 0) -> str:
+    """
+    Random micro formula with terms, numbers, unary signs and parentheses.
+    """
+    items = [make_operand(rnd, depth)]
+
+    for _ in range(rnd.randint(1, 4)):
+        sign = rnd.choice(OPERATORS)
+        items.append(sign)
+        items.append(rnd.choice(DIVISORS) if sign == "/" else make_operand(rnd, depth))
+
+    return " ".join(items)
+
+
+def make_operand(rnd: random.Random, depth: int) -> str:
+    choice = rnd.random()
+
+    if (choice < 0.2) and (depth < 3):
+        return f"({make_formula(rnd, depth + 1)})"
+    if choice < 0.3:
+        return f"-{rnd.choice(COLUMNS)}{cnst.MICRO_CALC_FIELDS_SPLIT_SEP}{rnd.choice(CODES)}"
+    if choice < 0.45:
+        return str(rnd.randint(0, 999) / rnd.choice([1, 10, 100]))
+    return f"{rnd.choice(COLUMNS)}{cnst.MICRO_CALC_FIELDS_SPLIT_SEP}{rnd.choice(CODES)}"
+
+
+def reference_value(formula: str, df: pd.DataFrame, round_each: bool) -> float:
+    """
+    The formula evaluated by python, the terms replaced by their values:
+    each operation rounded to 2 decimals, or only the final result.
+    """
+    values = {}
+
+    for col_name in COLUMNS:
+        for code, val in zip(df["cont"], df[col_name]):
+            values[f"{col_name}{cnst.MICRO_CALC_FIELDS_SPLIT_SEP}{code}"] = float(val)
+
+    names = {}
+
+    def name_of(match: str) -> str:
+        names.setdefault(match, f"t{len(names)}")
+        return names[match]
+
+    python_src = " ".join(
+        name_of(token) if token in values else token
+        for token in formula.replace("(", " ( ").replace(")", " ) ").replace("-", " - ").split()
+    )
+    terms = {name: values[term] for term, name in names.items()}
+
+    binary = {
+        ast.Add: operator.add,
+        ast.Sub: operator.sub,
+        ast.Mult: operator.mul,
+        ast.Div: operator.truediv,
+    }
+
+    def evaluate(node):
+        if isinstance(node, ast.Expression):
+            return evaluate(node.body)
+        if isinstance(node, ast.Constant):
+            return float(node.value)
+        if isinstance(node, ast.Name):
+            return terms[node.id]
+        if isinstance(node, ast.UnaryOp):
+            val = evaluate(node.operand)
+            return -val if isinstance(node.op, ast.USub) and val != 0.0 else val
+        val = binary[type(node.op)](evaluate(node.left), evaluate(node.right))
+        return round(val, 2) if round_each else val
+
+    result = evaluate(ast.parse(python_src, mode="eval"))
+
+    return result if round_each else round(result, 2)
+
+
+def compute(formula: str, df: pd.DataFrame, exact_arithm: bool):
+    return microcalc.compute_micro(
+        df.copy(),
+        "cont",
+        formula,
+        cnst.MICRO_CALC_FIELDS_SPLIT_SEP,
+        cnst.MICRO_CALC_SUPLIM_CHARS,
+        True,
+        exact_arithm,
+    )
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_modes_match_their_reference(seed):
+    rnd = random.Random(seed)
+    df = make_frame(rnd)
+
+    for _ in range(50):
+        formula = make_formula(rnd)
+
+        exact_value, exact_error = compute(formula, df, True)
+        rounded_value, rounded_error = compute(formula, df, False)
+
+        assert (exact_error, rounded_error) == (None, None), formula
+        assert exact_value == reference_value(formula, df, round_each=False), formula
+        assert rounded_value == reference_value(formula, df, round_each=True), formula
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_modes_differ_by_the_rounding_of_the_sums(seed):
+    # Only additions and subtractions: each rounding moves the result by at most 0.005
+    rnd = random.Random(seed)
+    df = make_frame(rnd)
+
+    for _ in range(50):
+        n_terms = rnd.randint(2, 40)
+        formula = " + ".join(
+            f"{rnd.choice(COLUMNS)}{cnst.MICRO_CALC_FIELDS_SPLIT_SEP}{rnd.choice(CODES)} / 3"
+            for _ in range(n_terms)
+        )
+
+        exact_value, _ = compute(formula, df, True)
+        rounded_value, _ = compute(formula, df, False)
+
+        assert abs(exact_value - rounded_value) <= 0.005 * (2 * n_terms) + 1e-9, formula
+
+
+def test_exact_mode_rounds_once():
+    df = pd.DataFrame({"cont": ["401"], "sc": [0.004]})
+    formula = " + ".join(["sc@401"] * 10)
+
+    # 0.004 + 0.004 is rounded to 0.01, and each further 0.004 is rounded away
+    assert compute(formula, df, False) == (0.01, None)
+    assert compute(formula, df, True) == (0.04, None)
+
+
+def test_text_cell_is_not_rounded():
+    df = pd.DataFrame({"cont": ["401", "411"], "sc": [10.0, "abc"]})
+
+    for exact_arithm in (False, True):
+        assert microcalc.compute_micro(
+            df.copy(), "cont", "sc@411", "@", "._", False, exact_arithm
+        ) == ("abc", None)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_vectorized_exact_mode_matches_single_frames(seed):
+    rnd = random.Random(seed)
+    dfs = [make_frame(rnd) for _ in range(4)]
+    cube = vcalc.build_cube(dfs, "cont")
+
+    for _ in range(30):
+        formula = make_formula(rnd)
+        program, error = microcalc.compile_micro_formula(
+            formula,
+            cnst.MICRO_CALC_FIELDS_SPLIT_SEP,
+            cnst.MICRO_CALC_SUPLIM_CHARS,
+            cnst.MICRO_CALC_SHEET_SEP,
+        )
+        assert error is None, formula
+
+        for exact_arithm in (False, True):
+            values, errors = vcalc.compute_micro_vector(
+                cube, program, cnst.MICRO_CALC_FIELDS_SPLIT_SEP, True, exact_arithm
+            )
+            expected = [compute(formula, df, exact_arithm) for df in dfs]
+
+            assert list(zip(values, errors)) == expected, formula
@@ -0,0 +1,100 @@
+import random
+import pytest
+import constants as cnst
+import formulaparser as fp
+import microcalc
+
+pp = pytest.importorskip("pyparsing")
+
+# The reference grammar uses the pyparsing 2 names (ex. `oneOf`)
+pytestmark = pytest.mark.filterwarnings("ignore:.*deprecated")
+
+SUPLIM_CHARS = cnst.MICRO_CALC_FIELDS_SPLIT_SEP + cnst.MICRO_CALC_SUPLIM_CHARS
+# Chars inserted by the corruptions: the language of the pyparsing grammar
+# (without the comparisons and functions added later) and a few invalid chars
+NOISE_CHARS = "+-*/() @._a1#$"
+
+
+def make_formula(rnd: random.Random, depth: int = 0) -> str:
+    items = [make_operand(rnd, depth)]
+
+    for _ in range(rnd.randint(0, 4)):
+        items.append(rnd.choice("+-*/"))
+        items.append(make_operand(rnd, depth))
+
+    return rnd.choice(["", " "]).join(items)
+
+
+def make_operand(rnd: random.Random, depth: int) -> str:
+    choice = rnd.random()
+
+    if (choice < 0.2) and (depth < 4):
+        return f"({make_formula(rnd, depth + 1)})"
+    if choice < 0.35:
+        return rnd.choice("+-") + make_operand(rnd, depth)
+    if choice < 0.5:
+        return str(rnd.choice([rnd.randint(0, 999), rnd.randint(0, 99999) / 100]))
+    return f"{rnd.choice(['sd', 'sc', 'rd', 'rc'])}@{rnd.randint(100, 9999)}{rnd.choice(['', '.01', '_a'])}"
+
+
+def corrupt(rnd: random.Random, src: str) -> str:
+    chars = list(src)
+
+    for _ in range(rnd.randint(1, 3)):
+        pos = rnd.randint(0, len(chars))
+        action = rnd.random()
+
+        if (action < 0.4) and (pos < len(chars)):
+            del chars[pos]
+        elif action < 0.8:
+            chars.insert(pos, rnd.choice(NOISE_CHARS))
+        elif pos < len(chars):
+            chars[pos] = rnd.choice(NOISE_CHARS)
+
+    return "".join(chars)
+
+
+def parse_both(src: str):
+    try:
+        reference = ("ok", microcalc.parse_field(src, SUPLIM_CHARS))
+    except pp.ParseBaseException:
+        reference = ("error",)
+
+    try:
+        parsed = ("ok", fp.parse_formula(src, SUPLIM_CHARS))
+    except fp.FormulaParseError:
+        parsed = ("error",)
+
+    return (reference, parsed)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_same_result_as_pyparsing_grammar(seed):
+    rnd = random.Random(seed)
+
+    for _ in range(200):
+        src = make_formula(rnd)
+        reference, parsed = parse_both(src)
+
+        assert reference[0] == "ok", src
+        assert parsed == reference, src
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_same_rejections_as_pyparsing_grammar(seed):
+    # The corrupted formulas are accepted by both parsers with the same result,
+    # or rejected by both (the position reported by pyparsing depends on its backtracking)
+    rnd = random.Random(seed)
+
+    for _ in range(300):
+        src = corrupt(rnd, make_formula(rnd))
+        reference, parsed = parse_both(src)
+
+        assert parsed == reference, src
+
+
+def test_error_message_layout():
+    with pytest.raises(fp.FormulaParseError) as exc_info:
+        fp.parse_formula("sc@401 + * 2", SUPLIM_CHARS)
+
+    assert str(exc_info.value) == "Expected term, found '*'  (at char 9), (line:1, col:10)"
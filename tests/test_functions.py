@@ -0,0 +1,116 @@
+import json
+import pytest
+import computation
+import errorcodes as errcd
+from conftest import TRIAL_BALANCE_CSV
+
+# Formula -> expected value, from the trial balance of conftest:
+# sc@401 = 2500.75, sd@411 = 3200.1, rc@121 = 400.25, rd@121 = 150.5, sd@401 = 0
+FORMULAS = {
+    "max(sc@401, sd@411)": 3200.1,
+    "MIN(sc@401, sd@411, rc@121)": 400.25,
+    "abs(rd@121 - rc@121)": 249.75,
+    "max(sc@401 - sd@411, 0)": 0.0,
+    "sc@401 > sd@411": 0.0,
+    "sc@401 < sd@411": 1.0,
+    "sc@401 >= 2500.75": 1.0,
+    "sd@401 <= 0": 1.0,
+    "sd@401 = 0": 1.0,
+    "sd@401 <> 0": 0.0,
+    "sc@401 + 1 > sc@401": 1.0,
+    "if(sd@401, sc@999, rc@121)": 400.25,
+    "if(sc@401 > sd@411, 1, 2) * 10": 20.0,
+    "abs(if(sd@411 > 0, rd@121 - rc@121, 0))": 249.75,
+}
+
+# Formula -> expected error code
+FAILING_FORMULAS = {
+    # The condition selects the branch with the missing code
+    "if(sc@401, sc@999, rc@121)": "code_missing",
+    "if(sc@401 / sd@401 > 1, 1, 2)": "division_by_zero",
+    "max(sc@999, sc@401)": "code_missing",
+}
+
+
+@pytest.fixture
+def function_settings_path(tmp_path) -> str:
+    formulas = list(FORMULAS) + list(FAILING_FORMULAS)
+    settings = {
+        "micro_calculator": [
+            {"id": idx, "account_col_name": "cont", "micro_formula": formula}
+            for idx, formula in enumerate(formulas)
+        ]
+    }
+    path = tmp_path / "functions.json"
+    path.write_text(json.dumps(settings), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def company_paths(tmp_path) -> list[str]:
+    paths = []
+
+    # The same data twice, and with other values, for the vectorized path
+    for name, content in (
+        ("alfa", TRIAL_BALANCE_CSV),
+        ("beta", TRIAL_BALANCE_CSV.replace("401,0,2500.75", "401,5,9000")),
+    ):
+        path = tmp_path / f"{name}.csv"
+        path.write_text(content, encoding="utf-8")
+        paths.append(str(path))
+
+    return paths
+
+
+def test_scalar_functions_and_comparisons(function_settings_path, company_paths):
+    results = computation.compute_fields(
+        function_settings_path, company_paths[0], error_format=errcd.CODE_ERRORS
+    )
+
+    assert [record["value"] for record in results[: len(FORMULAS)]] == list(FORMULAS.values())
+    assert all(record["error"] is None for record in results[: len(FORMULAS)])
+    assert [record["error"]["code"] for record in results[len(FORMULAS) :]] == list(
+        FAILING_FORMULAS.values()
+    )
+
+
+def test_vector_results_match_the_scalar_results(function_settings_path, company_paths):
+    records = computation.compute_consolidated(function_settings_path, company_paths)
+
+    for index, path in enumerate(company_paths):
+        expected = computation.compute_fields(function_settings_path, path)
+
+        assert [
+            {"id": record["id"], **{key: record["companies"][index][key] for key in ("value", "error")}}
+            for record in records
+        ] == expected
+
+
+def test_if_collects_errors_only_of_the_selected_branch(function_settings_path, company_paths):
+    records = computation.compute_consolidated(
+        function_settings_path, company_paths, error_format=errcd.CODE_ERRORS
+    )
+    by_id = {record["id"]: record for record in records}
+    failing_id = len(FORMULAS) + 1
+
+    # if(sc@401 / sd@401 > 1, 1, 2): sd@401 is 0 only for the first company
+    assert by_id[failing_id]["companies"][0]["error"]["code"] == "division_by_zero"
+    assert by_id[failing_id]["companies"][1] == {"company": "beta", "value": 1.0, "error": None}
+
+
+@pytest.mark.parametrize(
+    "formula", ["max()", "abs(sc@401, sd@411)", "if(sc@401, 1)", "sum(sc@401)", "sc@401 >< 1"]
+)
+def test_invalid_calls_are_settings_errors(tmp_path, data_path, formula):
+    path = tmp_path / "invalid.json"
+    path.write_text(
+        json.dumps(
+            {"micro_calculator": [{"id": 1, "account_col_name": "cont", "micro_formula": formula}]}
+        ),
+        encoding="utf-8",
+    )
+
+    results = computation.compute_fields(str(path), data_path)
+
+    assert results[0]["value"] is None
+    assert len(results[0]["error"]) > 0
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import computation
+import jobs
+
+
+def test_stream_yields_the_results(settings_path, data_path):
+    expected = computation.compute_fields(settings_path, data_path)
+
+    async def run():
+        runner = jobs.JobRunner(max_workers=2)
+        job_id = runner.submit(settings_path, data_path)
+        streamed = [record async for record in runner.stream(job_id)]
+        results = await runner.wait(job_id)
+        status = runner.status(job_id)
+        runner.shutdown()
+        return (streamed, results, status)
+
+    streamed, results, status = asyncio.run(run())
+
+    assert streamed == expected
+    assert results == expected
+    assert (status["status"], status["computed_fields"]) == (jobs.DONE, len(expected))
+
+
+def test_global_error(settings_path, tmp_path):
+    async def run():
+        runner = jobs.JobRunner()
+        job_id = runner.submit(settings_path, str(tmp_path / "missing.csv"))
+        results = await runner.wait(job_id)
+        status = runner.status(job_id)
+        runner.shutdown()
+        return (results, status)
+
+    results, status = asyncio.run(run())
+
+    assert list(results[0]) == ["global_error"]
+    assert status["status"] == jobs.FAILED
+
+
+def test_cancel_stops_after_the_current_field(monkeypatch):
+    first_sent = threading.Event()
+    resume = threading.Event()
+
+    def slow_fields(*args, **kwargs):
+        yield {"id": 1, "value": 1.0, "error": None}
+        first_sent.set()
+        resume.wait(5)
+        yield {"id": 2, "value": 2.0, "error": None}
+        yield {"id": 3, "value": 3.0, "error": None}
+
+    monkeypatch.setattr(computation, "iter_computed_fields", slow_fields)
+
+    async def run():
+        runner = jobs.JobRunner()
+        job_id = runner.submit("fields.json", "data.csv")
+
+        await asyncio.get_running_loop().run_in_executor(None, first_sent.wait, 5)
+        cancelled = runner.cancel(job_id)
+        resume.set()
+
+        streamed = [record async for record in runner.stream(job_id)]
+        await runner.wait(job_id)
+        status = runner.status(job_id)
+        cancelled_again = runner.cancel(job_id)
+        partial = runner.partial_results(job_id)
+        runner.shutdown()
+        return (cancelled, streamed, status, cancelled_again, partial)
+
+    cancelled, streamed, status, cancelled_again, partial = asyncio.run(run())
+
+    assert cancelled is True
+    assert [record["id"] for record in streamed] == [1]
+    assert status["status"] == jobs.CANCELLED
+    assert cancelled_again is False
+    assert list(partial) == [1]
@@ -0,0 +1,54 @@
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import pytest
+
+MAIN_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+
+def run_main(*args) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, MAIN_PATH, *args],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "RFC_TEMPLATE_CACHE_DIR": "", "RFC_RESULT_CACHE_PATH": ""},
+    )
+
+
+def test_sqlite_output_rejects_the_error_codes(settings_path, data_path):
+    completed = run_main(settings_path, data_path, "sqlite", "code")
+
+    assert completed.returncode == 1
+    assert "`code`" in completed.stdout
+    assert not os.path.exists(settings_path.replace(".json", "_output.sqlite"))
+
+
+@pytest.mark.parametrize("error_args", [[], ["text"]])
+def test_sqlite_output_stores_the_error_texts(settings_path, data_path, error_args):
+    completed = run_main(settings_path, data_path, "sqlite", *error_args)
+
+    assert completed.returncode == 0, completed.stdout
+    with sqlite3.connect(settings_path.replace(".json", "_output.sqlite")) as connection:
+        errors = dict(connection.execute("SELECT field_id, error FROM rfc_results").fetchall())
+    connection.close()
+
+    assert errors["1"] is None
+    assert "999" in errors["4"]
+
+
+def test_json_output_of_the_error_codes_has_the_distinct_errors(settings_path, data_path):
+    completed = run_main(settings_path, data_path, "json", "code")
+
+    assert completed.returncode == 0, completed.stdout
+    with open(settings_path.replace(".json", "_output.json"), encoding="utf-8") as j_file:
+        output = json.load(j_file)
+
+    errors = [record["error"] for record in output["errors"]]
+    results = {record["id"]: record["error"] for record in output["results"]}
+
+    assert [record["error_id"] for record in output["errors"]] == list(range(len(errors)))
+    assert len(errors) == len({json.dumps(error, sort_keys=True) for error in errors})
+    assert results[1] is None
+    assert errors[results[4]]["code"] != "text"
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+import computation
+import numericvalues as nval
+
+
+def texts(*values) -> pd.Series:
+    return pd.Series(list(values), dtype="object")
+
+
+@pytest.mark.parametrize(
+    "decimal_sep, text, expected",
+    [
+        (",", "1.234,56", 1234.56),
+        (",", "1234,5", 1234.5),
+        (",", ",5", 0.5),
+        (",", "-1.234.567,89", -1234567.89),
+        (",", "(1.234,56)", -1234.56),
+        (",", "1,5E3", 1500.0),
+        (".", "1,234.56", 1234.56),
+        (".", "+12.5", 12.5),
+        (".", "(7)", -7.0),
+        (".", "1234", 1234.0),
+    ],
+)
+def test_parse_amounts(decimal_sep, text, expected):
+    assert nval.parse_amounts(texts(text), decimal_sep)[0] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("text", ["abc", "1.2.3,4", "12,34,5", "1 234", "--1", "", "()"])
+def test_parse_amounts_rejects_the_other_texts(text):
+    assert np.isnan(nval.parse_amounts(texts(text), ",")[0])
+
+
+@pytest.mark.parametrize(
+    "values, expected",
+    [
+        (["1,5", "1.234,56", "2"], ","),
+        (["1.5", "1,234.56", "2"], "."),
+        (["1234", "5"], "."),
+        # Amounts read both ways take the separator of the rest of the column
+        (["1.234", "12,5"], ","),
+        (["1,234", "12.5"], "."),
+        # Only dot-grouped (or comma-grouped) amounts: thousands separators
+        (["1.234", "12.500"], ","),
+        (["1,234", "12,500"], "."),
+    ],
+)
+def test_detect_decimal_sep(values, expected):
+    decimal_sep, _ = nval.detect_decimal_sep(texts(*values))
+
+    assert decimal_sep == expected
+
+
+def test_dot_grouped_amounts_are_thousands_and_reported():
+    converted, diagnostics = nval.convert_value_column(texts("1.234", "12.500", "7"))
+
+    assert converted.tolist() == [1234.0, 12500.0, 7.0]
+    assert diagnostics["decimal_sep"] == ","
+    assert (diagnostics["ambiguous"], diagnostics["ambiguous_rows"]) == (2, [0, 1])
+
+
+def test_convert_value_column_keeps_the_other_texts():
+    converted, diagnostics = nval.convert_value_column(
+        texts("1.234,56", " ", "n/a", 5.0, None, "(10,5)")
+    )
+
+    assert converted.dtype == object
+    assert converted[0] == 1234.56
+    assert np.isnan(converted[1])
+    assert converted[2] == "n/a"
+    assert (converted[3], converted[5]) == (5.0, -10.5)
+    assert {key: diagnostics[key] for key in ("parsed", "missing", "unparsed", "unparsed_rows")} == {
+        "parsed": 2,
+        "missing": 1,
+        "unparsed": 1,
+        "unparsed_rows": [2],
+    }
+
+
+def test_text_columns_are_not_converted():
+    assert nval.convert_value_column(texts("Furnizori", "Clienti", "1")) == (None, None)
+    assert nval.convert_value_column(pd.Series([1.5, 2.0])) == (None, None)
+
+
+def test_profile_reports_the_converted_columns(tmp_path, settings_path):
+    data_path = tmp_path / "balanta_text.csv"
+    data_path.write_text(
+        "cont;sd;sc;rd;rc\n"
+        "121;0;0;150,5;400,25\n"
+        "401;0;2.500,75;0;12,5\n"
+        "411;3.200,1;0;0;0\n",
+        encoding="utf-8",
+    )
+    profile = {}
+
+    results = computation.compute_fields(settings_path, str(data_path), profile=profile)
+
+    assert {record["id"]: record["value"] for record in results}[7] == 412.75
+    assert sorted(column["column"] for column in profile["numeric_columns"]) == ["rc", "rd", "sc", "sd"]
@@ -0,0 +1,41 @@
+import copy
+import io
+import pandas as pd
+import pytest
+import computation
+
+
+@pytest.fixture
+def file_results(settings_path, data_path):
+    return computation.compute_fields(settings_path, data_path)
+
+
+def test_bytes_inputs_match_the_file(fields_settings, data_path, file_results):
+    with open(data_path, "rb") as file:
+        content = file.read()
+
+    for data in (content, bytearray(content), memoryview(content), io.BytesIO(content)):
+        assert computation.compute_fields_from_objects(fields_settings, data, ".csv") == file_results
+
+
+def test_data_frame_input_is_not_modified(fields_settings, data_path, file_results):
+    df = pd.read_csv(data_path)
+    original = df.copy(deep=True)
+    settings = copy.deepcopy(fields_settings)
+
+    assert computation.compute_fields_from_objects(fields_settings, df) == file_results
+    pd.testing.assert_frame_equal(df, original)
+    assert fields_settings == settings
+
+
+def test_bytes_without_extension(fields_settings, data_path):
+    with open(data_path, "rb") as file:
+        results = computation.compute_fields_from_objects(fields_settings, file.read())
+
+    assert list(results[0]) == ["global_error"]
+
+
+def test_settings_error(data_path):
+    results = computation.compute_fields_from_objects([], pd.read_csv(data_path))
+
+    assert list(results[0]) == ["global_error"]
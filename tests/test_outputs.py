@@ -0,0 +1,135 @@
+import io
+import json
+import numpy as np
+import pytest
+import errorcodes as errcd
+import outputs as out
+
+RECORDS = [
+    {"id": 1, "value": 10.5, "error": None},
+    {"id": 2, "value": float("nan"), "error": None},
+    {"id": 3, "value": np.float64(2.25), "error": None},
+    {"id": 4, "value": np.int64(7), "error": "Valoarea lipsește din fișierul încărcat."},
+]
+
+EXPECTED = [
+    {"id": 1, "value": 10.5, "error": None},
+    {"id": 2, "value": None, "error": None},
+    {"id": 3, "value": 2.25, "error": None},
+    {"id": 4, "value": 7, "error": "Valoarea lipsește din fișierul încărcat."},
+]
+
+
+@pytest.fixture(params=["orjson", "json"])
+def fast(request, monkeypatch):
+    """
+    Run the test with the orjson serializer (if installed) and with the json module.
+    """
+    if request.param == "orjson":
+        if out.orjson is None:
+            pytest.skip("orjson is not installed")
+        return True
+
+    monkeypatch.setattr(out, "orjson", None)
+    return True
+
+
+def write(records, output_format: str, fast: bool) -> tuple[str, int]:
+    fp = io.StringIO()
+    count = out.write_results_stream(iter(records), fp, output_format, fast)
+    return (fp.getvalue(), count)
+
+
+def test_json_stream_is_an_array(fast):
+    text, count = write(RECORDS, out.JSON_STREAM_FORMAT, fast)
+
+    assert count == len(RECORDS)
+    assert text.startswith("[") and text.endswith("]")
+    assert json.loads(text) == EXPECTED
+
+
+def test_jsonl_is_an_object_per_line(fast):
+    text, count = write(RECORDS, out.JSONL_FORMAT, fast)
+
+    assert count == len(RECORDS)
+    assert text.endswith("\n")
+    assert [json.loads(line) for line in text.splitlines()] == EXPECTED
+
+
+def test_nan_is_null(fast):
+    # `json.loads` would accept the invalid `NaN` literal
+    text, _ = write(RECORDS, out.JSONL_FORMAT, fast)
+
+    assert "NaN" not in text
+    assert json.loads(text.splitlines()[1], parse_constant=pytest.fail)["value"] is None
+
+
+def test_empty_stream(fast):
+    assert write([], out.JSON_STREAM_FORMAT, fast) == ("[]", 0)
+    assert write([], out.JSONL_FORMAT, fast) == ("", 0)
+
+
+def test_global_error_after_partial_results(fast):
+    records = RECORDS[:1] + [{"global_error": "Eroare globală."}]
+    text, count = write(records, out.JSON_STREAM_FORMAT, fast)
+
+    assert count == 2
+    assert json.loads(text) == [EXPECTED[0], {"global_error": "Eroare globală."}]
+
+
+def test_periodic_flush(monkeypatch):
+    class CountingFile(io.StringIO):
+        flushes = 0
+
+        def flush(self):
+            self.flushes += 1
+            super().flush()
+
+    monkeypatch.setattr(out, "STREAM_FLUSH_RECORDS", 10)
+    fp = CountingFile()
+    out.write_results_stream(({"id": idx, "value": 1.0, "error": None} for idx in range(25)), fp)
+
+    # 2 full blocks of records and the end of the stream
+    assert fp.flushes == 3
+    assert len(json.loads(fp.getvalue())) == 25
+
+
+def test_distinct_errors_written_once():
+    missing = errcd.FieldError("code_missing", code="999").to_record()
+    records = [
+        {"id": 1, "value": None, "error": missing},
+        {"id": 2, "value": 3.5, "error": None},
+        # Equal to the first error, another object
+        {"id": 3, "value": None, "error": json.loads(json.dumps(missing))},
+        {"id": 4, "value": None, "error": {"code": "sum_codes_too_few", "params": {}}},
+        {"id": 5, "value": None, "error": missing},
+    ]
+
+    assert list(out.iter_error_references(records)) == [
+        {"error_id": 0, "error": missing},
+        {"id": 1, "value": None, "error": 0},
+        {"id": 2, "value": 3.5, "error": None},
+        {"id": 3, "value": None, "error": 0},
+        {"error_id": 1, "error": {"code": "sum_codes_too_few", "params": {}}},
+        {"id": 4, "value": None, "error": 1},
+        {"id": 5, "value": None, "error": 0},
+    ]
+    assert records[0]["error"] is missing
+
+
+def test_error_table_output(fast):
+    missing = errcd.FieldError("code_missing", code="999").to_record()
+    records = [{"id": idx, "value": None, "error": missing} for idx in range(3)]
+    output = out.error_table_output(records)
+
+    assert output == {
+        "errors": [{"error_id": 0, "error": missing}],
+        "results": [{"id": idx, "value": None, "error": 0} for idx in range(3)],
+    }
+    assert out.error_table_output([{"global_error": "Eroare globală."}]) == {
+        "errors": [],
+        "results": [{"global_error": "Eroare globală."}],
+    }
+
+    text, count = write(out.iter_error_references(records), out.JSONL_FORMAT, fast)
+    assert (count, text.count("code_missing")) == (4, 1)
@@ -0,0 +1,33 @@
+import gc
+import multiprocessing
+import pytest
+import computation
+import prefork
+
+pytestmark = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="requires the fork start method"
+)
+
+
+def test_pool_results_match_compute_fields(settings_path, data_path):
+    with prefork.PreforkPool(1, settings_paths=[settings_path]) as pool:
+        results = pool.compute(settings_path, data_path)
+
+    assert pool.preloaded_templates == 1
+    assert results == computation.compute_fields(settings_path, data_path)
+
+
+def test_freeze_is_kept_until_the_last_pool_is_stopped():
+    gc.unfreeze()
+    first = prefork.PreforkPool(1)
+    second = prefork.PreforkPool(1)
+
+    first.close()
+    assert gc.get_freeze_count() > 0
+
+    # Stopping a pool again does not release the freeze of the other one
+    first.terminate()
+    assert gc.get_freeze_count() > 0
+
+    second.terminate()
+    assert gc.get_freeze_count() == 0
@@ -0,0 +1,94 @@
+import pandas as pd
+import pytest
+import computation
+import compiler as cmpl
+import resultcache as rcache
+
+
+@pytest.fixture
+def result_cache(monkeypatch) -> rcache.ResultCache:
+    cache = rcache.ResultCache(None)
+    monkeypatch.setattr(rcache, "_default_cache", cache)
+    return cache
+
+
+def compile_field(formula: str) -> dict:
+    template, global_error = cmpl.compile_template(
+        {"micro_calculator": [{"id": 1, "account_col_name": "cont", "micro_formula": formula}]}
+    )
+    assert global_error is None
+    return cmpl.get_template_fields(template, False)[0]
+
+
+def test_cache_hits_return_the_computed_results(settings_path, data_path, result_cache):
+    expected = computation.compute_fields(settings_path, data_path)
+    first_profile = {}
+    second_profile = {}
+
+    first = computation.compute_fields(
+        settings_path, data_path, use_result_cache=True, profile=first_profile
+    )
+    second = computation.compute_fields(
+        settings_path, data_path, use_result_cache=True, profile=second_profile
+    )
+
+    assert first == second == expected
+    assert first_profile["result_cache_hits"] == 0
+    assert second_profile["result_cache_hits"] == first_profile["result_cache_misses"] > 0
+    assert second_profile["result_cache_misses"] == 0
+
+
+def test_changed_data_is_computed_again(settings_path, data_path, tmp_path, result_cache):
+    computation.compute_fields(settings_path, data_path, use_result_cache=True)
+
+    changed_path = tmp_path / "balanta_2.csv"
+    with open(data_path, encoding="utf-8") as data_file:
+        changed_path.write_text(data_file.read().replace("2500.75", "2600.75"), encoding="utf-8")
+    profile = {}
+
+    results = computation.compute_fields(
+        settings_path, str(changed_path), use_result_cache=True, profile=profile
+    )
+
+    assert results == computation.compute_fields(settings_path, str(changed_path))
+    assert profile["result_cache_hits"] == 0
+
+
+def test_data_hash_includes_the_dtypes():
+    as_int = pd.DataFrame({"cont": ["401"], "sc": [1]})
+    as_float = pd.DataFrame({"cont": ["401"], "sc": [1.0]})
+    as_text = pd.DataFrame({"cont": ["401"], "sc": ["1"]})
+
+    hashes = [rcache.hash_data(df) for df in (as_int, as_float, as_text)]
+
+    assert len(set(hashes)) == 3
+    assert rcache.hash_data(as_float) == rcache.hash_data(as_float.copy())
+
+
+def test_data_hash_includes_the_sheets():
+    df = pd.DataFrame({"cont": ["401"], "sc": [1.0]})
+    sheet = pd.DataFrame({"cont": ["401.01"], "sc": [1.0]})
+
+    assert rcache.hash_data(df) != rcache.hash_data(df, {"Detalii": sheet})
+    assert rcache.hash_data(df, {"Detalii": sheet}) != rcache.hash_data(df, {"Alta": sheet})
+
+
+def test_field_key_follows_the_parsed_formula():
+    data_hash = rcache.hash_data(pd.DataFrame({"cont": ["401"], "sc": [1.0]}))
+    key = rcache.field_cache_key(compile_field("sc@401 + sd@411"), data_hash, False)
+
+    # Whitespace and redundant parentheses do not change the parsed formula
+    assert rcache.field_cache_key(compile_field(" (sc@401) +sd@411 "), data_hash, False) == key
+    assert rcache.field_cache_key(compile_field("sc@401 - sd@411"), data_hash, False) != key
+    assert rcache.field_cache_key(compile_field("sc@401 + sd@411"), data_hash, True) != key
+    assert rcache.field_cache_key(compile_field("sc@401 + sd@411"), "other", False) != key
+
+
+def test_results_stored_in_the_sqlite_file(tmp_path):
+    db_path = str(tmp_path / "results.sqlite")
+    rcache.ResultCache(db_path).put_many({"a": (1.5, None), "b": (None, "eroare")})
+
+    assert rcache.ResultCache(db_path).get_many(["a", "b", "c"]) == {
+        "a": (1.5, None),
+        "b": (None, "eroare"),
+    }
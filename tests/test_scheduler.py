@@ -0,0 +1,121 @@
+import heapq
+import itertools
+import random
+import pytest
+import scheduler
+
+
+def makespan(costs: list[float], order: list[int], workers: int) -> float:
+    """
+    Time the last worker finishes, the tasks started in `order`,
+    each by the first worker that becomes free.
+    """
+    loads = [0.0] * workers
+
+    for idx in order:
+        heapq.heapreplace(loads, loads[0] + costs[idx])
+
+    return max(loads)
+
+
+def test_longest_first_order():
+    order, _ = scheduler.plan_longest_first([1.0, 5.0, 3.0, 2.0], 2)
+
+    assert order == [1, 2, 3, 0]
+
+
+def test_longest_first_makespan():
+    # 7 + 1 | 5 + 2 | 4 + 3
+    costs = [3.0, 7.0, 1.0, 5.0, 2.0, 4.0]
+    order, predicted = scheduler.plan_longest_first(costs, 3)
+
+    assert predicted == 8.0
+    assert predicted == makespan(costs, order, 3)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_longest_first_bound(seed):
+    # The longest first schedule is at most 4/3 of the optimal makespan
+    rnd = random.Random(seed)
+    costs = [float(rnd.randint(1, 20)) for _ in range(7)]
+    workers = 3
+
+    _, predicted = scheduler.plan_longest_first(costs, workers)
+    optimal = min(
+        max(
+            sum(cost for cost, worker in zip(costs, assignment) if worker == idx)
+            for idx in range(workers)
+        )
+        for assignment in itertools.product(range(workers), repeat=len(costs))
+    )
+
+    assert optimal <= predicted <= optimal * 4 / 3
+
+
+def test_longest_first_more_workers_than_tasks():
+    order, predicted = scheduler.plan_longest_first([2.0, 6.0], 8)
+
+    assert order == [1, 0]
+    assert predicted == 6.0
+
+
+def test_longest_first_no_tasks():
+    assert scheduler.plan_longest_first([], 4) == ([], 0.0)
+
+
+def test_bucket_small_jobs():
+    costs = [5.0, 0.4, 0.3, 2.0, 0.5, 0.2, 0.1]
+    buckets = scheduler.bucket_small_jobs(costs, 1.0)
+
+    # The expensive jobs alone, the small ones grouped up to about 1 second
+    assert buckets == [[0], [3], [4, 1, 2], [5, 6]]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_bucket_small_jobs_keeps_all_jobs(seed):
+    rnd = random.Random(seed)
+    costs = [rnd.uniform(0.0, 3.0) for _ in range(50)]
+    bucket_cost = 1.0
+
+    buckets = scheduler.bucket_small_jobs(costs, bucket_cost)
+
+    assert sorted(idx for bucket in buckets for idx in bucket) == list(range(len(costs)))
+
+    for bucket in buckets:
+        if len(bucket) > 1:
+            assert all(costs[idx] < bucket_cost for idx in bucket)
+            # A bucket is closed by the job reaching the bucket cost
+            assert sum(costs[idx] for idx in bucket[:-1]) < bucket_cost
+
+
+class FailingPool:
+    """
+    Stand-in for `prefork.PreforkPool`, whose jobs fail.
+    """
+
+    processes = 2
+
+    def __init__(self, *args, **kwargs):
+        self.calls = []
+        FailingPool.created = self
+
+    def submit_batch(self, jobs, **options):
+        return self
+
+    def get(self):
+        raise RuntimeError("job failed")
+
+    def close(self):
+        self.calls.append("close")
+
+    def terminate(self):
+        self.calls.append("terminate")
+
+
+def test_run_batch_terminates_own_pool_on_error(monkeypatch):
+    monkeypatch.setattr(scheduler.prefork, "PreforkPool", FailingPool)
+
+    with pytest.raises(RuntimeError):
+        scheduler.run_batch([("missing_fields.json", "missing_data.csv")])
+
+    assert FailingPool.created.calls == ["terminate"]
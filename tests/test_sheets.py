@@ -0,0 +1,67 @@
+import json
+import pandas as pd
+import pytest
+import computation
+import inputs as inp
+
+pytest.importorskip("openpyxl")
+
+SETTINGS = {
+    "micro_calculator": [
+        {"id": 1, "account_col_name": "cont", "micro_formula": "sc@401 + Detaliianalitice!sc@401.01"},
+        {"id": 2, "account_col_name": "cont", "micro_formula": "Lipsa!sc@401"},
+    ],
+}
+
+
+def write_workbook(path, sheets: dict[str, pd.DataFrame]):
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+
+
+@pytest.fixture
+def workbook_path(tmp_path) -> str:
+    path = tmp_path / "firma.xlsx"
+    write_workbook(
+        path,
+        {
+            "Balanta": pd.DataFrame({"cont": [401, 411], "sc": [100.5, 20.0]}),
+            "Detalii analitice": pd.DataFrame({"cont": ["401.01", "401.02"], "sc": [60.25, 40.25]}),
+        },
+    )
+    return str(path)
+
+
+def test_sheet_names_without_whitespace(workbook_path):
+    sheets, error = inp.read_data_sheets([workbook_path])
+
+    assert error == ""
+    assert list(sheets) == ["Balanta", "Detaliianalitice"]
+
+
+def test_workbook_sheets_prefixed_by_file(workbook_path, data_path):
+    sheets, error = inp.read_data_sheets([data_path, workbook_path], "*")
+
+    assert error == ""
+    assert list(sheets) == ["balanta", "firma.Balanta", "firma.Detaliianalitice"]
+
+
+def test_selected_sheets(workbook_path):
+    sheets, error = inp.read_data_sheets([workbook_path], ["Balanta"])
+    assert (list(sheets), error) == (["Balanta"], "")
+
+    sheets, error = inp.read_data_sheets([workbook_path], ["Lipsa"])
+    assert (sheets, len(error) > 0) == ({}, True)
+
+
+def test_terms_qualified_by_sheet(tmp_path, workbook_path):
+    settings_path = tmp_path / "fields.json"
+    settings_path.write_text(json.dumps(SETTINGS), encoding="utf-8")
+
+    results = computation.compute_fields(str(settings_path), workbook_path, sheet_names="*")
+
+    # The terms without a sheet name are read from the first sheet
+    assert results[0] == {"id": 1, "value": 160.75, "error": None}
+    assert results[1]["value"] is None
+    assert "`Lipsa`" in results[1]["error"]
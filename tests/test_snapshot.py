@@ -0,0 +1,87 @@
+import json
+import os
+import pandas as pd
+import computation
+import inputs as inp
+
+# Amounts exported as Romanian text, codes as Excel writes them, a text column
+ROMANIAN_CSV = (
+    "cont;denumire;sd;sc\n"
+    '0401;Furnizori;"0,00";"1.234,56"\n'
+    "411_1;Clienti;\"3.200,10\";\"10,5\"\n"
+    "4423;TVA;n/a;\"2,25\"\n"
+    "121.0;Profit;\"150,00\";\"0,00\"\n"
+)
+
+SETTINGS = {
+    "micro_calculator": [
+        {"id": 1, "account_col_name": "cont", "micro_formula": "sc@401 + sc@411.1"},
+        {"id": 2, "account_col_name": "cont", "micro_formula": "sd@4423 + 1"},
+        {"id": 3, "account_col_name": "cont", "micro_formula": "sd@121 - sc@4423"},
+    ],
+    "single_cell": [
+        {"id": 4, "account_col_name": "cont", "account_code": "401", "value_col_name": "sc"},
+    ],
+    "sum_many_rows_same_col": [
+        {"id": 5, "account_col_name": "cont", "account_code": "401,411.1,4423", "value_col_name": "sc"},
+    ],
+}
+
+
+def write_case(tmp_path) -> tuple[str, str, str]:
+    settings_path = tmp_path / "fields.json"
+    settings_path.write_text(json.dumps(SETTINGS), encoding="utf-8")
+    data_path = tmp_path / "balanta.csv"
+    data_path.write_text(ROMANIAN_CSV, encoding="utf-8")
+
+    df, error = inp.read_data_file(str(data_path))
+    assert error == ""
+
+    # Without the extension: ".npy" is added
+    snapshot_path = str(tmp_path / "balanta")
+    assert inp.export_data_snapshot(df, "cont", snapshot_path) == ""
+
+    return (str(settings_path), str(data_path), f"{snapshot_path}.npy")
+
+
+def test_snapshot_results_match_the_source_file(tmp_path):
+    settings_path, data_path, snapshot_path = write_case(tmp_path)
+
+    from_file = {record["id"]: record for record in computation.compute_fields(settings_path, data_path)}
+    from_snapshot = {
+        record["id"]: record for record in computation.compute_fields(settings_path, snapshot_path)
+    }
+
+    assert from_file[1]["value"] == 1245.06
+    assert from_snapshot == from_file
+
+
+def test_snapshot_keeps_the_columns_with_unparsed_cells(tmp_path):
+    settings_path, _, snapshot_path = write_case(tmp_path)
+
+    df, error = inp.read_data_snapshot(snapshot_path)
+
+    assert error == ""
+    assert df.columns.tolist() == ["cont", "sd", "sc"]
+    assert df["cont"].tolist() == ["401", "411.1", "4423", "121"]
+    assert pd.isna(df["sd"][2])
+
+    # The "n/a" cell is an error of its term, not a missing column
+    record = computation.compute_fields(settings_path, snapshot_path)[1]
+    assert record["value"] is None
+    assert "`sd`" in record["error"] and "4423" in record["error"]
+
+
+def test_export_does_not_modify_the_frame(tmp_path):
+    df = pd.DataFrame({"cont": [401, 411], "sc": ["1.234,56", "10,5"]})
+    original = df.copy(deep=True)
+
+    assert inp.export_data_snapshot(df, "cont", str(tmp_path / "snap.npy")) == ""
+    pd.testing.assert_frame_equal(df, original)
+    assert os.path.exists(tmp_path / "snap.npy.json")
+
+
+def test_unsupported_extension_lists_npy(tmp_path):
+    _, error = inp.read_data_file(str(tmp_path / "balanta.txt"))
+
+    assert ".npy" in error
@@ -0,0 +1,98 @@
+import json
+import os
+from collections import OrderedDict
+import pytest
+import compiler as cmpl
+import templatecache as tcache
+
+
+@pytest.fixture(autouse=True)
+def empty_memory(monkeypatch):
+    """
+    Each test starts without the templates kept in memory, as a new process.
+    """
+    monkeypatch.setattr(tcache, "_memory_templates", OrderedDict())
+
+
+def fail_compile(jsn_inp_obj):
+    raise AssertionError("the settings are compiled again")
+
+
+def test_template_reused_from_disk(monkeypatch, tmp_path, fields_settings):
+    template, error = tcache.get_compiled_template(fields_settings, str(tmp_path))
+    key = tcache.template_cache_key(fields_settings)
+
+    assert error is None
+    assert os.listdir(tmp_path) == [f"{key}.json"]
+
+    # Another process: nothing in memory, the template is read from the disk
+    monkeypatch.setattr(tcache, "_memory_templates", OrderedDict())
+    monkeypatch.setattr(cmpl, "compile_template", fail_compile)
+
+    assert tcache.get_compiled_template(fields_settings, str(tmp_path)) == (template, None)
+
+
+def test_template_reused_from_memory(monkeypatch, fields_settings):
+    template, _ = tcache.get_compiled_template(fields_settings, None)
+    monkeypatch.setattr(cmpl, "compile_template", fail_compile)
+
+    assert tcache.get_compiled_template(fields_settings, None) == (template, None)
+
+
+def test_key_changes_with_the_settings(fields_settings):
+    key = tcache.template_cache_key(fields_settings)
+    fields_settings["micro_calculator"][0]["micro_formula"] = "sc@401 + sd@411 * 3"
+
+    assert tcache.template_cache_key(fields_settings) != key
+
+
+def test_special_rfc_flag_shares_the_entry(fields_settings):
+    normal = {**fields_settings, "special_rfc": False}
+    special = {**fields_settings, "special_rfc": True}
+
+    assert tcache.template_cache_key(normal) == tcache.template_cache_key(special)
+    assert tcache.template_cache_key(normal) != tcache.template_cache_key(fields_settings)
+
+    assert tcache.get_compiled_template(normal, None)[0]["special_rfc"] is False
+    assert tcache.get_compiled_template(special, None)[0]["special_rfc"] is True
+
+
+@pytest.mark.parametrize(
+    "corrupt",
+    [
+        lambda entry: {**entry, "cache_version": tcache.TEMPLATE_CACHE_VERSION + 1},
+        lambda entry: {**entry, "key": "other"},
+        lambda entry: {**entry, "template": {**entry["template"], "version": -1}},
+        lambda entry: "{",
+    ],
+)
+def test_invalid_entries_are_compiled_again(monkeypatch, tmp_path, fields_settings, corrupt):
+    template, _ = tcache.get_compiled_template(fields_settings, str(tmp_path))
+    entry_path = tmp_path / f"{tcache.template_cache_key(fields_settings)}.json"
+
+    entry = corrupt(json.loads(entry_path.read_text(encoding="utf-8")))
+    entry_path.write_text(entry if isinstance(entry, str) else json.dumps(entry), encoding="utf-8")
+    monkeypatch.setattr(tcache, "_memory_templates", OrderedDict())
+
+    compiled = []
+    compile_template = cmpl.compile_template
+
+    def counting_compile(jsn_inp_obj):
+        compiled.append(True)
+        return compile_template(jsn_inp_obj)
+
+    monkeypatch.setattr(cmpl, "compile_template", counting_compile)
+
+    assert tcache.get_compiled_template(fields_settings, str(tmp_path)) == (template, None)
+    assert compiled == [True]
+    # The entry is written again
+    assert tcache.load_cached_template(str(tmp_path), tcache.template_cache_key(fields_settings)) == template
+
+
+def test_settings_errors_are_not_cached(tmp_path, fields_settings):
+    fields_settings["single_cell"] = []
+
+    template, error = tcache.get_compiled_template(fields_settings, str(tmp_path))
+
+    assert (template, error is not None) == ({}, True)
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,94 @@
+import pandas as pd
+import computation
+import compiler as cmpl
+import constants as cnst
+import microcalc
+
+FORMULAS = [
+    "sc@401 + sd@411",
+    "sd@411 * 2 - sc@401",
+    "sc@401 / sd@401",
+    "sc@999 + 1",
+    "sc@999 + sc@401",
+]
+
+
+def compile_programs(procedure: str) -> list:
+    template, global_error = cmpl.compile_template(
+        {
+            procedure: [
+                {"id": idx, "account_col_name": "cont", "micro_formula": formula}
+                for idx, formula in enumerate(FORMULAS)
+            ]
+        }
+    )
+    assert global_error is None
+    return [field["program"] for field in cmpl.get_template_fields(template, False)]
+
+
+def trial_balance() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "cont": ["401", "411", "4423"],
+            "sd": [0.0, 3200.1, 0.0],
+            "sc": [2500.75, 0.0, 310.4],
+        }
+    )
+
+
+def compute_all(programs: list, strict: bool, term_memo: dict | None) -> list:
+    return [
+        microcalc.compute_micro_program(
+            trial_balance(),
+            "cont",
+            program,
+            cnst.MICRO_CALC_FIELDS_SPLIT_SEP,
+            strict_data_query=strict,
+            term_memo=term_memo,
+        )
+        for program in programs
+    ]
+
+
+def test_memo_gives_the_same_results():
+    for procedure, strict in ((cnst.MICRO_CALC, True), (cnst.MICRO_CALC_FLEXI, False)):
+        programs = compile_programs(procedure)
+        without_memo = compute_all(programs, strict, None)
+        with_memo = compute_all(programs, strict, microcalc.new_term_memo())
+
+        assert [(value, str(error)) for value, error in with_memo] == [
+            (value, str(error)) for value, error in without_memo
+        ]
+
+
+def test_repeated_terms_are_read_once():
+    term_memo = microcalc.new_term_memo()
+
+    compute_all(compile_programs(cnst.MICRO_CALC), True, term_memo)
+
+    # Distinct terms: sc@401, sd@411, sd@401, sc@999
+    assert term_memo["misses"] == 4
+    assert term_memo["hits"] == 5
+    # The cached error of a term is reported by every formula using it
+    assert term_memo["values"][("sc@999", "cont", True)][1].code == "code_missing"
+
+
+def test_memo_keeps_strict_and_flexi_apart():
+    term_memo = microcalc.new_term_memo()
+    programs = compile_programs(cnst.MICRO_CALC)
+
+    strict = compute_all(programs[3:4], True, term_memo)
+    flexi = compute_all(programs[3:4], False, term_memo)
+
+    assert strict[0][0] is None
+    assert flexi[0] == (1.0, None)
+
+
+def test_profile_counts_the_memo_hits(settings_path, data_path):
+    profile = {}
+
+    computation.compute_fields(settings_path, data_path, profile=profile)
+
+    # sc@401 is read once by the strict formulas 1 and 3; the flexi formula 5
+    # reads its terms apart (sc@999, sc@401)
+    assert (profile["term_memo_hits"], profile["term_memo_misses"]) == (1, 8)
@@ -0,0 +1,81 @@
+import pytest
+import computation
+from conftest import TRIAL_BALANCE_CSV
+
+# Monthly trial balances; the file names give the order of the periods
+PERIODS = {
+    "2024-01": TRIAL_BALANCE_CSV,
+    "2024-02": (
+        "cont,sd,sc,rd,rc\n"
+        "121,0,0,200,450\n"
+        "401,1.5,2600,0,20\n"
+        "411,3000,0,0,0\n"
+    ),
+    "2024-03": (
+        "cont,sd,sc,rd,rc\n"
+        "401,0,2700.25,0,0\n"
+        "411,3300.35,0,0,0\n"
+        "121,0,0,210,470.5\n"
+    ),
+}
+
+
+@pytest.fixture
+def periods_dir(tmp_path) -> str:
+    folder = tmp_path / "balante"
+    folder.mkdir()
+
+    # Written out of order, and with a file which is not data
+    for name in reversed(list(PERIODS)):
+        (folder / f"{name}.csv").write_text(PERIODS[name], encoding="utf-8")
+
+    (folder / "note.txt").write_text("nu este un fisier de date", encoding="utf-8")
+
+    return str(folder)
+
+
+def test_series_values_match_each_period_file(settings_path, periods_dir):
+    records = computation.compute_time_series(settings_path, periods_dir)
+    per_period = [
+        computation.compute_fields(settings_path, f"{periods_dir}/{name}.csv") for name in PERIODS
+    ]
+
+    assert [record["id"] for record in records] == [record["id"] for record in per_period[0]]
+
+    for index, record in enumerate(records):
+        assert record["periods"] == list(PERIODS)
+        assert record["values"] == [results[index]["value"] for results in per_period]
+        assert record["errors"] == [results[index]["error"] for results in per_period]
+        assert "deltas" not in record
+
+
+def test_deltas_between_periods(settings_path, periods_dir):
+    records = computation.compute_time_series(settings_path, periods_dir, deltas=True)
+    by_id = {record["id"]: record for record in records}
+
+    # id 7: rc of 401, 411 and 121
+    assert by_id[7]["values"] == [412.75, 470.0, 470.5]
+    assert by_id[7]["deltas"] == [None, 57.25, 0.5]
+    # id 3 divides by sd@401: no value for the first and the last period
+    assert by_id[3]["values"][0] is None and by_id[3]["values"][2] is None
+    assert by_id[3]["deltas"] == [None, None, None]
+
+
+def test_period_names_and_file_list(settings_path, periods_dir):
+    paths = [f"{periods_dir}/{name}.csv" for name in PERIODS]
+    records = computation.compute_time_series(
+        settings_path, paths, period_names=["ian", "feb", "mar"], max_workers=2
+    )
+
+    assert records[0]["periods"] == ["ian", "feb", "mar"]
+    assert records == [
+        {**record, "periods": ["ian", "feb", "mar"]}
+        for record in computation.compute_time_series(settings_path, periods_dir)
+    ]
+
+
+def test_folder_without_data_files_is_a_global_error(settings_path, tmp_path):
+    records = computation.compute_time_series(settings_path, str(tmp_path))
+
+    assert len(records) == 1
+    assert "nu conține fișiere de date" in records[0]["global_error"]
@@ -0,0 +1,946 @@
+import numpy as np
+import pandas as pd
+import microcalc
+import accountcodes as acc
+import errorcodes as errcd
+
+# Status of a (account code, value column) cell for each data frame of a cube
+CELL_OK = 0
+CODE_MISSING = 1
+COL_MISSING = 2
+VALUE_MISSING = 3
+NOT_NUMERIC = 4
+DUPLICATE_CODE = 5
+# A text cell that can be converted to a number (ex. in a column with text values)
+TEXT_VALUE = 6
+
+# Rank of the statuses of the duplicated rows of a code (the max. is kept):
+# a missing value is reported before a not numeric one, as the single frame sum does
+_DUP_STATUS_RANK = np.array([0, 0, 0, 3, 2, 0, 1], dtype="int8")
+_DUP_RANK_STATUS = np.array([CELL_OK, TEXT_VALUE, NOT_NUMERIC, VALUE_MISSING], dtype="int8")
+
+ZERO_DIVISION_ERROR = microcalc.computation_error(ZeroDivisionError())
+PROCESSING_ERROR = microcalc.computation_error(Exception())
+
+
+# ========= Code x frame matrices
+
+
+def build_cube(dfs: list[pd.DataFrame], account_col_name: str) -> dict:
+    """
+    Align many data frames (ex. the trial balances of many companies or periods)
+    on the account column: each value column becomes a matrix
+    with a row per account code and a column per data frame.
+
+    Parameters:
+    ----------
+    dfs (list[pd.DataFrame]):
+        Data frames to align.
+
+    account_col_name (str):
+        Name of the column containing the accounting codes.
+
+    Returns:
+    ----------
+    A dictionary with the keys:
+        - `size` (int): the number of data frames
+        - `account_col_name` (str)
+        - `has_account_col` (np.ndarray[bool]): per data frame
+        - `codes` (dict[str, int]): matrix row of each account code
+        - `code_present` (np.ndarray[bool], codes x frames)
+        - `positions` (np.ndarray[int64], codes x frames): position of the (first)
+        row of each code in each data frame, -1 if missing
+        - `frames` and `frames_codes`: the data frames and their account columns as strings,
+        for the rollups of the codes missing from a frame (see `lookup_rollup_cells`)
+        - `columns` (dict[str, dict]): per value column, the `values` (float64)
+        and `status` (int8) matrices, codes x frames; for duplicated codes the value
+        is the sum of the duplicated rows, `dup_status` keeps the worst status
+        of the duplicated rows and `dup_rows` ((code row, frame) -> [(position, value)])
+        their individual values
+    """
+    size = len(dfs)
+    has_account_col = np.array(
+        [account_col_name in df.columns.values.tolist() for df in dfs], dtype=bool
+    )
+
+    # Cast all values in "account_col_name" to strings, as the single frame procedures do,
+    # unless already done when the data was loaded
+    frames_codes = [
+        (
+            df[account_col_name]
+            if acc.is_canonical_column(df[account_col_name])
+            else df[account_col_name].astype("str")
+        )
+        if has_account_col[idx]
+        else None
+        for idx, df in enumerate(dfs)
+    ]
+
+    all_codes = pd.unique(
+        pd.concat([codes for codes in frames_codes if codes is not None], ignore_index=True)
+        if has_account_col.any()
+        else pd.Series([], dtype="object")
+    )
+    codes = {code: row for row, code in enumerate(all_codes.tolist())}
+    n_codes = len(codes)
+
+    code_present = np.zeros((n_codes, size), dtype=bool)
+    positions = np.full((n_codes, size), -1, dtype="int64")
+    columns: dict[str, dict] = {}
+
+    for frame_idx, df in enumerate(dfs):
+        frame_codes = frames_codes[frame_idx]
+        if frame_codes is None:
+            continue
+
+        rows = frame_codes.map(codes).to_numpy(dtype="int64")
+        code_present[rows, frame_idx] = True
+        # reversed, so the first row of a duplicated code is kept
+        positions[rows[::-1], frame_idx] = np.arange(len(rows) - 1, -1, -1)
+
+        duplicated = frame_codes.duplicated(keep=False).to_numpy()
+
+        for col_name in df.columns.values.tolist():
+            if col_name == account_col_name:
+                continue
+
+            if col_name not in columns:
+                columns[col_name] = {
+                    "values": np.full((n_codes, size), np.nan, dtype="float64"),
+                    "status": np.full((n_codes, size), COL_MISSING, dtype="int8"),
+                    "dup_status": np.full((n_codes, size), CELL_OK, dtype="int8"),
+                    "dup_rows": {},
+                }
+            col_values = columns[col_name]["values"]
+            col_status = columns[col_name]["status"]
+
+            raw = df[col_name]
+            numeric = pd.to_numeric(raw, errors="coerce").to_numpy(dtype="float64")
+            is_text = (
+                np.zeros(len(raw), dtype=bool)
+                if pd.api.types.is_numeric_dtype(raw)
+                else raw.map(lambda val: isinstance(val, str)).to_numpy(dtype=bool)
+            )
+            status = np.select(
+                [raw.isna().to_numpy(), np.isnan(numeric), is_text],
+                [VALUE_MISSING, NOT_NUMERIC, TEXT_VALUE],
+                CELL_OK,
+            ).astype("int8")
+
+            # The codes not present in this frame keep CODE_MISSING
+            col_status[:, frame_idx] = CODE_MISSING
+
+            unique_mask = ~duplicated
+            col_values[rows[unique_mask], frame_idx] = numeric[unique_mask]
+            col_status[rows[unique_mask], frame_idx] = status[unique_mask]
+
+            if duplicated.any():
+                # NaN if any of the duplicated rows has no numeric value
+                dup_values = pd.Series(numeric[duplicated])
+                dup_groups = dup_values.groupby(rows[duplicated])
+                dup_sums = dup_groups.sum().where(~dup_groups.apply(lambda vals: vals.isna().any()))
+                dup_rows = dup_sums.index.to_numpy()
+                col_values[dup_rows, frame_idx] = dup_sums.to_numpy()
+                col_status[dup_rows, frame_idx] = DUPLICATE_CODE
+
+                # The worst status of the duplicated rows (missing, then not numeric)
+                dup_rank = pd.Series(_DUP_STATUS_RANK[status[duplicated]])
+                worst_rank = dup_rank.groupby(rows[duplicated]).max()
+                columns[col_name]["dup_status"][worst_rank.index.to_numpy(), frame_idx] = (
+                    _DUP_RANK_STATUS[worst_rank.to_numpy()]
+                )
+
+                dup_rows_store = columns[col_name]["dup_rows"]
+                for position in np.flatnonzero(duplicated).tolist():
+                    dup_rows_store.setdefault((rows[position], frame_idx), []).append(
+                        (position, numeric[position])
+                    )
+
+    return {
+        "size": size,
+        "account_col_name": account_col_name,
+        "has_account_col": has_account_col,
+        "codes": codes,
+        "code_present": code_present,
+        "positions": positions,
+        "frames": dfs,
+        "frames_codes": frames_codes,
+        "rollups": {},
+        "columns": columns,
+    }
+
+
+def lookup_cells(cube: dict, value_col_name: str, accounting_code: str):
+    """
+    Returns the values (float64, NaN if not usable) and the statuses (int8)
+    of a cell for all the frames of the cube.
+    """
+    size = cube["size"]
+    row = cube["codes"].get(accounting_code)
+
+    if row is None:
+        return (
+            np.full(size, np.nan, dtype="float64"),
+            np.full(size, CODE_MISSING, dtype="int8"),
+        )
+
+    code_present = cube["code_present"][row]
+    col = cube["columns"].get(value_col_name)
+
+    if col is None:
+        status = np.where(code_present, COL_MISSING, CODE_MISSING).astype("int8")
+        return (np.full(size, np.nan, dtype="float64"), status)
+
+    status = np.where(code_present, col["status"][row], CODE_MISSING).astype("int8")
+
+    return (col["values"][row].copy(), status)
+
+
+def lookup_rollup_cells(cube: dict, value_col_name: str, accounting_code: str):
+    """
+    Vectorized rollups (see `accountcodes.build_rollup_index`): the totals
+    of the rows under an account code, for the frames without a row of the code.
+    The rollup indexes and totals are computed once per frame and value column.
+
+    Returns:
+    ----------
+    A tuple of arrays, by frame:
+        - the totals (float64), the missing values counting as 0.0
+        - the statuses (int8): CELL_OK, COL_MISSING or CODE_MISSING (no rows under the code)
+        - if any of the values is missing (bool)
+        - if any of the values is not numeric (bool)
+    """
+    size = cube["size"]
+    rollups = cube["rollups"]
+
+    values = np.full(size, np.nan, dtype="float64")
+    status = np.full(size, CODE_MISSING, dtype="int8")
+    has_missing = np.zeros(size, dtype=bool)
+    has_text = np.zeros(size, dtype=bool)
+
+    for frame_idx, frame_codes in enumerate(cube["frames_codes"]):
+        if frame_codes is None:
+            continue
+
+        if frame_idx not in rollups:
+            rollups[frame_idx] = acc.build_rollup_index(frame_codes)
+
+        rollup_label = rollups[frame_idx]["codes"].get(accounting_code)
+
+        if rollup_label is None:
+            continue
+
+        df = cube["frames"][frame_idx]
+
+        if value_col_name not in df.columns.values.tolist():
+            status[frame_idx] = COL_MISSING
+            continue
+
+        totals_key = (frame_idx, value_col_name)
+
+        if totals_key not in rollups:
+            rollups[totals_key] = acc.rollup_totals(rollups[frame_idx], df[value_col_name])
+
+        totals, totals_missing, totals_text = rollups[totals_key]
+
+        values[frame_idx] = totals[rollup_label]
+        status[frame_idx] = CELL_OK
+        has_missing[frame_idx] = totals_missing[rollup_label]
+        has_text[frame_idx] = totals_text[rollup_label]
+
+    return (values, status, has_missing, has_text)
+
+
+def lookup_rows(cube: dict, value_col_name: str, accounting_code: str):
+    """
+    `lookup_cells`, plus the worst status of the duplicated rows of the code
+    and the (position, value) of its rows, for all the frames of the cube.
+    """
+    size = cube["size"]
+    values, status = lookup_cells(cube, value_col_name, accounting_code)
+    row = cube["codes"].get(accounting_code)
+    col = cube["columns"].get(value_col_name)
+
+    if (row is None) or (col is None):
+        return (values, status, np.full(size, CELL_OK, dtype="int8"), [[] for _ in range(size)])
+
+    rows = [
+        col["dup_rows"].get((row, frame_idx), [(cube["positions"][row, frame_idx], values[frame_idx])])
+        for frame_idx in range(size)
+    ]
+
+    return (values, status, col["dup_status"][row].copy(), rows)
+
+
+# ========= Vectorized arithm
+
+
+def round2(values: np.ndarray) -> np.ndarray:
+    """
+    Round to 2 decimals with the same result as python's `round(x, 2)`.
+    `np.round` may differ from it only on values close to a half cent,
+    which are rounded again with `round`.
+    """
+    rounded = np.round(values, 2)
+    scaled = values * 100.0
+
+    with np.errstate(invalid="ignore"):
+        tolerance = np.maximum(np.abs(scaled) * 1e-15, 1e-9)
+        close_to_half = np.abs(scaled - np.floor(scaled) - 0.5) <= tolerance
+
+    for idx in np.flatnonzero(close_to_half):
+        rounded[idx] = round(float(values[idx]), 2)
+
+    return rounded
+
+
+def add(a: np.ndarray, b: np.ndarray):
+    return round2(a + b)
+
+
+def subtr(a: np.ndarray, b: np.ndarray):
+    return round2(a - b)
+
+
+def mult(a: np.ndarray, b: np.ndarray):
+    return round2(a * b)
+
+
+def div(a: np.ndarray, b: np.ndarray):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return round2(a / b)
+
+
+def add_exact(a: np.ndarray, b: np.ndarray):
+    return a + b
+
+
+def subtr_exact(a: np.ndarray, b: np.ndarray):
+    return a - b
+
+
+def mult_exact(a: np.ndarray, b: np.ndarray):
+    return a * b
+
+
+def div_exact(a: np.ndarray, b: np.ndarray):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return a / b
+
+
+def lt(a: np.ndarray, b: np.ndarray):
+    return (a < b).astype("float64")
+
+
+def gt(a: np.ndarray, b: np.ndarray):
+    return (a > b).astype("float64")
+
+
+def le(a: np.ndarray, b: np.ndarray):
+    return (a <= b).astype("float64")
+
+
+def ge(a: np.ndarray, b: np.ndarray):
+    return (a >= b).astype("float64")
+
+
+def eq(a: np.ndarray, b: np.ndarray):
+    return (a == b).astype("float64")
+
+
+def ne(a: np.ndarray, b: np.ndarray):
+    return (a != b).astype("float64")
+
+
+def unary_minus(x: np.ndarray):
+    return np.where(x == 0.0, x, -x)
+
+
+def unary_plus(x: np.ndarray):
+    return x
+
+
+def _add_errors(ctx: dict, mask: np.ndarray, error: errcd.FieldError):
+    """
+    Append the error to the errors of each frame selected by the mask;
+    the frames share the same error, rendered only on request.
+    """
+    for frame_idx in np.flatnonzero(mask):
+        ctx["errors"][frame_idx].append(error)
+
+
+def _set_exception(ctx: dict, mask: np.ndarray, error: errcd.FieldError):
+    """
+    Stop the computation of the frames selected by the mask with a single error,
+    as the exceptions raised by `microcalc.compute_arithm` do.
+    """
+    for frame_idx in np.flatnonzero(mask):
+        ctx["exception"][frame_idx] = error
+    ctx["alive"] &= ~mask
+
+
+def eval_term(ctx: dict, term: str, active: np.ndarray):
+    """
+    Vectorized `microcalc.get_val_from_df`. Returns:
+    - the values (NaN for the frames without a value),
+    - the mask of the frames for which the term has a value,
+    - the mask of the frames for which the value is a text: the scalar computation
+    cannot use it in arithmetic operations.
+    """
+    size = ctx["cube"]["size"]
+    active = active & ctx["alive"]
+    no_text = np.zeros(size, dtype=bool)
+
+    if term.replace(".", "", 1).isdigit():
+        return (np.full(size, float(term)), np.ones(size, dtype=bool), no_text)
+
+    term_sep = ctx["label_sep"]
+
+    if ctx["sheet_sep"] in term:
+        sheet_name = term.split(ctx["sheet_sep"], 1)[0]
+        _add_errors(ctx, active, errcd.FieldError("sheet_missing", sheet=sheet_name, term=term))
+        return (np.full(size, np.nan), np.zeros(size, dtype=bool), no_text)
+
+    if term_sep not in term:
+        _add_errors(
+            ctx, active, errcd.FieldError("term_separator_missing", separator=term_sep, term=term)
+        )
+        return (np.full(size, np.nan), np.zeros(size, dtype=bool), no_text)
+
+    value_col_name, accounting_code = term.split(term_sep, 1)
+    values, status = lookup_cells(ctx["cube"], value_col_name, accounting_code)
+
+    # The frames without a row of the code, but with rows under it in the account tree,
+    # get their total (see `microcalc.query_strict`)
+    rollup = np.zeros(size, dtype=bool)
+    rollup_missing = np.zeros(size, dtype=bool)
+    rollup_text = np.zeros(size, dtype=bool)
+
+    if (status == CODE_MISSING).any():
+        rollup_values, rollup_status, has_missing, has_text = lookup_rollup_cells(
+            ctx["cube"], value_col_name, accounting_code
+        )
+        rollup = (status == CODE_MISSING) & (rollup_status != CODE_MISSING)
+        status = np.where(rollup, rollup_status, status).astype("int8")
+        values = np.where(rollup, rollup_values, values)
+        rollup_missing = rollup & (status == CELL_OK) & has_missing
+        rollup_text = rollup & (status == CELL_OK) & has_text
+
+    def term_error(error_code: str) -> errcd.FieldError:
+        return errcd.FieldError(error_code, term=term, column=value_col_name, code=accounting_code)
+
+    if ctx["strict"]:
+        # The text values are converted to numbers, if possible
+        text = status == NOT_NUMERIC
+        rollup_text = rollup_text & ~rollup_missing
+        valid = ((status == CELL_OK) | (status == TEXT_VALUE) | text) & ~rollup_missing & ~rollup_text
+
+        _add_errors(
+            ctx,
+            active & (status == CODE_MISSING),
+            errcd.FieldError("code_missing", code=accounting_code),
+        )
+        _add_errors(
+            ctx,
+            active & (status == COL_MISSING),
+            errcd.FieldError("term_column_missing", column=value_col_name),
+        )
+        _add_errors(ctx, active & (status == DUPLICATE_CODE), term_error("term_read_failed"))
+        _add_errors(ctx, active & (status == VALUE_MISSING), term_error("term_value_missing"))
+        _add_errors(ctx, active & text, term_error("term_value_not_numeric"))
+
+        _add_errors(ctx, active & rollup_missing, term_error("rollup_values_missing"))
+        _add_errors(ctx, active & rollup_text, term_error("rollup_values_not_numeric"))
+
+        return (np.where(valid & ~text, values, np.nan), valid, text)
+
+    # Flexible query: the missing cells count as 0.0, the duplicated codes as 0.0 with an error;
+    # the text values are not converted
+    _add_errors(ctx, active & (status == DUPLICATE_CODE), term_error("term_read_failed"))
+    _add_errors(ctx, active & rollup_text, term_error("rollup_values_not_numeric"))
+    text = (status == NOT_NUMERIC) | (status == TEXT_VALUE)
+    values = np.where((status == CELL_OK) & ~rollup_text, values, 0.0)
+
+    return (values, np.ones(size, dtype=bool), text)
+
+
+def eval_node(ctx: dict, node: str | list, active: np.ndarray):
+    """
+    Vectorized `microcalc.compute_arithm`: the same traversal of the parser result,
+    done once for all the frames. The errors are collected only for the frames
+    that the scalar computation would still be evaluating (`active`).
+
+    As in `microcalc.compute_arithm`, the traversal does not recurse:
+    the nodes in progress are step generators kept on an explicit stack.
+
+    Returns the values, the mask of the frames with a result
+    and the mask of the frames whose result is a text (see `eval_term`).
+    """
+    if not isinstance(node, (list, dict)):
+        return eval_term(ctx, node, active)
+
+    stack = [node_steps(ctx, node, active)]
+    evaluated = None
+
+    while True:
+        try:
+            # resume the innermost node with the evaluation of its last sub-node
+            sub_node, sub_active = stack[-1].send(evaluated)
+        except StopIteration as stop:
+            stack.pop()
+            evaluated = stop.value
+
+            if len(stack) == 0:
+                return evaluated
+
+            continue
+
+        stack.append(node_steps(ctx, sub_node, sub_active))
+        evaluated = None
+
+
+def node_steps(ctx: dict, node: list | dict, active: np.ndarray):
+    """
+    Returns the step generator evaluating a node of the parser result.
+    """
+    if isinstance(node, dict):
+        return function_steps(ctx, node, active)
+
+    return arithm_steps(ctx, node, active)
+
+
+def arithm_steps(ctx: dict, node: list, active: np.ndarray):
+    """
+    Step generator evaluating a list of the parser result (see `eval_node`):
+    it yields each sub-list or function call with its active frames
+    and receives its evaluation; the terms are evaluated directly.
+    """
+    size = ctx["cube"]["size"]
+    operators = ctx["operators"]
+
+    def evaluate(sub_node, sub_active):
+        if isinstance(sub_node, (list, dict)):
+            return (yield (sub_node, sub_active))
+        return eval_term(ctx, sub_node, sub_active)
+
+    ls_len = len(node)
+
+    if ls_len == 0:
+        return (np.full(size, np.nan), np.zeros(size, dtype=bool), np.zeros(size, dtype=bool))
+
+    if ls_len == 1:
+        return (yield from evaluate(node[0], active))
+
+    if ls_len == 2:
+        first_elem, second_elem = node
+
+        if isinstance(first_elem, (list, dict)) or (first_elem not in UNARY_MAP):
+            raise microcalc.NotUnaryOpError
+
+        if (not isinstance(second_elem, (list, dict))) and (second_elem in operators):
+            raise microcalc.NeighbourOpsError
+
+        values, valid, text = yield from evaluate(second_elem, active)
+
+        if first_elem == "-":
+            # A text cannot be negated
+            _set_exception(ctx, active & ctx["alive"] & valid & text, PROCESSING_ERROR)
+
+        return (UNARY_MAP[first_elem](values), valid, text)
+
+    result = None
+    valid = np.ones(size, dtype=bool)
+    text = np.zeros(size, dtype=bool)
+    active = active.copy()
+
+    for idx in range(1, ls_len, 2):
+        item = node[idx]
+
+        if isinstance(item, (list, dict)) or (item not in operators):
+            raise microcalc.NeighbourOpsError
+
+        # ==== left hand argument: accumulation of previous computations
+        if result is None:
+            lh = node[idx - 1]
+            if (not isinstance(lh, (list, dict))) and (lh in operators):
+                raise microcalc.NeighbourOpsError
+            result, valid, text = yield from evaluate(lh, active)
+
+        # ==== right hand argument
+        if idx + 1 >= ls_len:
+            raise microcalc.ArgumentOpsError
+
+        rh = node[idx + 1]
+        if (not isinstance(rh, (list, dict))) and (rh in operators):
+            raise microcalc.NeighbourOpsError
+
+        rh_values, rh_valid, rh_text = yield from evaluate(rh, active)
+
+        valid = valid & rh_valid
+        operated = active & ctx["alive"] & valid
+
+        # No arithmetic operations with texts
+        _set_exception(ctx, operated & (text | rh_text), PROCESSING_ERROR)
+
+        if item == "/":
+            _set_exception(ctx, operated & ctx["alive"] & (rh_values == 0.0), ZERO_DIVISION_ERROR)
+
+        result = np.where(valid, operators[item](result, rh_values), np.nan)
+        text = np.zeros(size, dtype=bool)
+
+        # The scalar computation stops at the first operation without a result
+        active &= valid
+
+    return (result, valid, text)
+
+
+def function_steps(ctx: dict, fn_node: dict, active: np.ndarray):
+    """
+    Vectorized `microcalc.function_steps`. For `if(cond, a, b)` each argument
+    is evaluated once for all the frames, but its errors are collected only for
+    the frames whose condition selects it.
+    """
+    size = ctx["cube"]["size"]
+    args = fn_node["args"]
+    fn_name = fn_node["fn"]
+    no_text = np.zeros(size, dtype=bool)
+
+    def evaluate(sub_node, sub_active):
+        if isinstance(sub_node, (list, dict)):
+            return (yield (sub_node, sub_active))
+        return eval_term(ctx, sub_node, sub_active)
+
+    if fn_name == "if":
+        cond_values, cond_valid, cond_text = yield from evaluate(args[0], active)
+        _set_exception(ctx, active & ctx["alive"] & cond_valid & cond_text, PROCESSING_ERROR)
+
+        usable = cond_valid & ~cond_text
+        take_first = usable & (cond_values != 0)
+        take_second = usable & (cond_values == 0)
+
+        first_values, first_valid, first_text = yield from evaluate(args[1], active & take_first)
+        second_values, second_valid, second_text = yield from evaluate(
+            args[2], active & take_second
+        )
+
+        return (
+            np.where(take_first, first_values, second_values),
+            (take_first & first_valid) | (take_second & second_valid),
+            (take_first & first_text) | (take_second & second_text),
+        )
+
+    values = []
+    valid = np.ones(size, dtype=bool)
+    active = active.copy()
+
+    for arg in args:
+        arg_values, arg_valid, arg_text = yield from evaluate(arg, active)
+        _set_exception(ctx, active & ctx["alive"] & arg_valid & arg_text, PROCESSING_ERROR)
+
+        values.append(arg_values)
+        valid &= arg_valid
+
+        # The scalar computation stops at the first argument without a value
+        active &= arg_valid
+
+    result = FUNCTIONS_MAP[fn_name](values)
+
+    return (np.where(valid, result, np.nan), valid, no_text)
+
+
+def compute_micro_vector(
+    cube: dict,
+    operations_nested: list,
+    label_fields_sep: str,
+    strict_data_query: bool,
+    exact_arithm: bool = False,
+    sheet_sep: str = "!",
+) -> tuple[list[float | None], list[errcd.FieldError | None]]:
+    """
+    Vectorized `microcalc.compute_micro_program`: compute a parsed micro formula
+    for all the frames of a cube at once.
+
+    Returns:
+    ----------
+    A tuple with the results (float or None) and the errors
+    (`errorcodes.FieldError` or None) per frame.
+    """
+    size = cube["size"]
+    results: list[float | None] = [None] * size
+    errors: list[errcd.FieldError | None] = [None] * size
+
+    ctx = {
+        "cube": cube,
+        "label_sep": label_fields_sep,
+        "sheet_sep": sheet_sep,
+        "strict": strict_data_query,
+        "operators": OPERATORS_MAP_EXACT if exact_arithm else OPERATORS_MAP,
+        "errors": [[] for _ in range(size)],
+        "exception": [None] * size,
+        "alive": cube["has_account_col"].copy(),
+    }
+
+    account_col_errors = _account_col_errors(cube)
+
+    try:
+        with np.errstate(all="ignore"):
+            values, valid, text = eval_node(ctx, operations_nested, ctx["alive"].copy())
+    except Exception as ex:
+        # Errors of the formula structure, the same for all the frames
+        error = microcalc.computation_error(ex)
+        return (
+            results,
+            [col_error or error for col_error in account_col_errors],
+        )
+
+    if exact_arithm:
+        values = round2(values)
+
+    for frame_idx in range(size):
+        if account_col_errors[frame_idx] is not None:
+            errors[frame_idx] = account_col_errors[frame_idx]
+            continue
+
+        if ctx["exception"][frame_idx] is not None:
+            errors[frame_idx] = ctx["exception"][frame_idx]
+            continue
+
+        frame_errors = ctx["errors"][frame_idx]
+
+        if text[frame_idx]:
+            # A text is never returned as the result of a formula
+            errors[frame_idx] = errcd.join_errors(frame_errors) or PROCESSING_ERROR
+            continue
+
+        if valid[frame_idx]:
+            results[frame_idx] = float(values[frame_idx])
+
+        if len(frame_errors) > 0:
+            errors[frame_idx] = errcd.join_errors(frame_errors)
+        elif results[frame_idx] is None:
+            errors[frame_idx] = errcd.FieldError("formula_incomplete")
+
+    return (results, errors)
+
+
+# ========= Vectorized multi formulas
+
+
+def _account_col_errors(cube: dict) -> list[errcd.FieldError | None]:
+    error = errcd.FieldError("column_missing", column=cube["account_col_name"])
+    return [None if has_col else error for has_col in cube["has_account_col"]]
+
+
+def get_single_value_vector(
+    cube: dict,
+    accounting_code: str,
+    value_col_name: str,
+    fields_sep: str,
+) -> tuple[list[float | None], list[errcd.FieldError | None]]:
+    """
+    Vectorized `multiformulas.get_single_value`, for settings already validated.
+    """
+    errors = _account_col_errors(cube)
+    results: list[float | None] = [None] * cube["size"]
+    values, status = lookup_cells(cube, value_col_name, accounting_code)
+
+    for frame_idx in range(cube["size"]):
+        if errors[frame_idx] is not None:
+            continue
+
+        frame_status = status[frame_idx]
+
+        if frame_status == CODE_MISSING:
+            results[frame_idx] = 0.0
+        elif frame_status == COL_MISSING:
+            errors[frame_idx] = errcd.FieldError("column_missing", column=value_col_name)
+        elif frame_status == DUPLICATE_CODE:
+            errors[frame_idx] = errcd.FieldError(
+                "cell_value_unreadable", code=accounting_code, column=value_col_name
+            )
+        elif frame_status in (VALUE_MISSING, NOT_NUMERIC, TEXT_VALUE):
+            errors[frame_idx] = errcd.FieldError(
+                "cell_value_not_numeric", code=accounting_code, column=value_col_name
+            )
+        else:
+            results[frame_idx] = float(values[frame_idx])
+
+    return (results, errors)
+
+
+def sum_many_rows_same_col_vector(
+    cube: dict,
+    accounting_codes: str,
+    value_col_name: str,
+    fields_sep: str,
+) -> tuple[list[float | None], list[errcd.FieldError | None]]:
+    """
+    Vectorized `multiformulas.sum_many_rows_same_col`, for settings already validated.
+    """
+    errors = _account_col_errors(cube)
+    results: list[float | None] = [None] * cube["size"]
+    accounting_codes_list = accounting_codes.split(fields_sep)
+
+    cells = [
+        lookup_rows(cube, value_col_name, accounting_code)
+        for accounting_code in accounting_codes_list
+    ]
+
+    for frame_idx in range(cube["size"]):
+        if errors[frame_idx] is not None:
+            continue
+
+        # filter only the accounting codes that exists in the frame
+        found = [
+            (code, values[frame_idx], status[frame_idx], dup_status[frame_idx], rows[frame_idx])
+            for code, (values, status, dup_status, rows) in zip(accounting_codes_list, cells)
+            if status[frame_idx] != CODE_MISSING
+        ]
+        found_codes = [item[0] for item in found]
+        # the statuses of the duplicated codes are the worst of their rows
+        found_status = [
+            dup_status if status == DUPLICATE_CODE else status
+            for _, _, status, dup_status, _ in found
+        ]
+
+        if len(found) == 0:
+            results[frame_idx] = 0.0
+            continue
+
+        if any(status == COL_MISSING for status in found_status):
+            errors[frame_idx] = errcd.FieldError("column_missing", column=value_col_name)
+            continue
+
+        if any(status == VALUE_MISSING for status in found_status):
+            errors[frame_idx] = errcd.FieldError(
+                "sum_values_missing", codes=found_codes, column=value_col_name
+            )
+            continue
+
+        if any(status in (NOT_NUMERIC, TEXT_VALUE) for status in found_status):
+            errors[frame_idx] = errcd.FieldError(
+                "sum_values_not_numeric", codes=found_codes, column=value_col_name
+            )
+            continue
+
+        # a code listed twice is summed once, and the rows are summed
+        # in the order of the data, as the single frame sum does
+        unique_rows = {code: rows for code, _, _, _, rows in found}
+        ordered_values = [value for _, value in sorted(row for rows in unique_rows.values() for row in rows)]
+        results[frame_idx] = float(np.sum(np.array(ordered_values, dtype="float64")))
+
+    return (results, errors)
+
+
+def subtract_two_single_values_vector(
+    cube: dict,
+    accounting_codes: str,
+    value_col_names: str,
+    fields_sep: str,
+) -> tuple[list[float | None], list[errcd.FieldError | None]]:
+    """
+    Vectorized `multiformulas.subtract_two_single_values`, for settings already validated.
+    """
+    errors = _account_col_errors(cube)
+    results: list[float | None] = [None] * cube["size"]
+
+    accounting_codes_list = accounting_codes.split(fields_sep)
+    value_col_names_list = value_col_names.split(fields_sep)
+
+    accounting_code_first = accounting_codes_list[0]
+    accounting_code_second = (
+        accounting_codes_list[1]
+        if len(accounting_codes_list) > 1
+        else accounting_codes_list[0]
+    )
+    value_col_name_first = value_col_names_list[0]
+    value_col_name_second = (
+        value_col_names_list[1]
+        if len(value_col_names_list) > 1
+        else value_col_names_list[0]
+    )
+
+    terms = [
+        (accounting_code_first, value_col_name_first)
+        + lookup_cells(cube, value_col_name_first, accounting_code_first),
+        (accounting_code_second, value_col_name_second)
+        + lookup_cells(cube, value_col_name_second, accounting_code_second),
+    ]
+
+    for frame_idx in range(cube["size"]):
+        if errors[frame_idx] is not None:
+            continue
+
+        frame_terms = []
+
+        for accounting_code, value_col_name, values, status in terms:
+            frame_status = status[frame_idx]
+
+            if frame_status == CODE_MISSING:
+                frame_terms.append(0.0)
+            elif frame_status == COL_MISSING:
+                errors[frame_idx] = errcd.FieldError(
+                    "term_cell_column_missing", column=value_col_name, code=accounting_code
+                )
+            elif frame_status == DUPLICATE_CODE:
+                errors[frame_idx] = errcd.FieldError(
+                    "subtract_values_unreadable",
+                    code_first=accounting_code_first,
+                    code_second=accounting_code_second,
+                    column_first=value_col_name_first,
+                    column_second=value_col_name_second,
+                )
+            elif frame_status == VALUE_MISSING:
+                errors[frame_idx] = errcd.FieldError(
+                    "term_cell_missing", code=accounting_code, column=value_col_name
+                )
+            elif frame_status in (NOT_NUMERIC, TEXT_VALUE):
+                errors[frame_idx] = errcd.FieldError(
+                    "term_cell_not_numeric", code=accounting_code, column=value_col_name
+                )
+            else:
+                frame_terms.append(float(values[frame_idx]))
+
+            if errors[frame_idx] is not None:
+                break
+
+        if errors[frame_idx] is None:
+            results[frame_idx] = round(frame_terms[0] - frame_terms[1], 2)
+
+    return (results, errors)
+
+
+# ======= Operations maps
+
+COMPARISONS_MAP = {
+    "<": lt,
+    ">": gt,
+    "<=": le,
+    ">=": ge,
+    "=": eq,
+    "<>": ne,
+}
+
+OPERATORS_MAP = {
+    "+": add,
+    "-": subtr,
+    "*": mult,
+    "/": div,
+    **COMPARISONS_MAP,
+}
+
+OPERATORS_MAP_EXACT = {
+    "+": add_exact,
+    "-": subtr_exact,
+    "*": mult_exact,
+    "/": div_exact,
+    **COMPARISONS_MAP,
+}
+
+UNARY_MAP = {"+": unary_plus, "-": unary_minus}
+
+FUNCTIONS_MAP = {
+    "max": lambda values: np.maximum.reduce(values),
+    "min": lambda values: np.minimum.reduce(values),
+    "abs": lambda values: np.abs(values[0]),
+}